@@ -2,7 +2,7 @@ from django.urls import path, include
 
 from rest_framework import routers
 
-from accounts.api.views import UserViewSet
+from accounts.api.views import UserViewSet, AsyncCurrentUserView
 
 
 app_name = 'accounts'
@@ -13,3 +13,8 @@ router.register(r'users', UserViewSet, basename='users')
 urlpatterns = [
     path('', include(router.urls), name='accounts_routes'),
 ]
+
+# Served ahead of the router under ASGI, see ``core.urls_asgi``
+async_urlpatterns = [
+    path('users/me/', AsyncCurrentUserView.as_view()),
+]
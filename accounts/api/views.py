@@ -1,8 +1,9 @@
 from rest_framework.decorators import action
 from rest_framework.viewsets import ModelViewSet
 from rest_framework.permissions import AllowAny
-from rest_framework.authentication import BasicAuthentication
 
+from core.api.views import AsyncReadOnlyAPIView
+from core.api.authentication import TimedBasicAuthentication
 from accounts.models import User
 from accounts.api.permissions import IsOwner
 from accounts.api.serializers import UserSerializer
@@ -10,7 +11,7 @@ from accounts.api.serializers import UserSerializer
 
 class UserViewSet(ModelViewSet):
     queryset = User.objects.all()
-    authentication_classes = [BasicAuthentication]
+    authentication_classes = [TimedBasicAuthentication]
     permission_classes = [IsOwner]
     serializer_class = UserSerializer
 
@@ -26,3 +27,13 @@ class UserViewSet(ModelViewSet):
     def me(self, request, *args, **kwargs):
         self.get_object = self.get_current_user
         return self.retrieve(request,*args, **kwargs)
+
+
+class AsyncCurrentUserView(AsyncReadOnlyAPIView):
+    fallback_view = UserViewSet.as_view({'get': 'me'})
+    permission_classes = UserViewSet.permission_classes
+    serializer_class = UserSerializer
+
+    async def get(self, request, *args, **kwargs):
+        # The authenticated user is already loaded, serializing it runs no query
+        return self.render(self.serializer_class(request.user, context={'request': request}).data)
@@ -13,11 +13,12 @@ class UserFactory(factory.django.DjangoModelFactory):
     is_active = True
     role = factory.Iterator([role.value for role in UserRole if role != UserRole.ADMIN])
     password = factory.PostGenerationMethodCall('set_password', 'defaultpassword')
+    username = factory.Sequence(lambda n: f'user_{n}')
 
-    @factory.lazy_attribute_sequence
-    def username(self, n):
-        max_pk = User.objects.aggregate(max_pk=models.Max('pk'))['max_pk'] or 0
-        return f'user_{max(max_pk, n) + 1}'
+    @classmethod
+    def _setup_next_sequence(cls):
+        # Start after the existing users once, instead of a query for every instance
+        return (User.objects.aggregate(max_pk=models.Max('pk'))['max_pk'] or 0) + 1
 
     class Meta:
         model = User
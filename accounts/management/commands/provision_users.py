@@ -0,0 +1,51 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from accounts.provisioning import UserProvisioner
+
+
+class Command(BaseCommand):
+    help = 'Create customer and provider accounts in bulk from a CSV file and report the rejected rows.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('file', help='CSV file with the columns username,email,password,role,first_name,last_name')
+        parser.add_argument('--report', help='Write the rejected rows report to this file instead of stdout')
+        parser.add_argument('--batch-size', type=int, default=1000, help='Users validated and inserted per query')
+        parser.add_argument('--processes', type=int, default=None,
+                            help='Password hashing processes, every core by default')
+        parser.add_argument('--dry-run', action='store_true', help='Validate the file without creating anyone')
+
+    def handle(self, *args, **options):
+        if options['batch_size'] < 1:
+            raise CommandError('--batch-size must be a positive number')
+        if options['processes'] is not None and options['processes'] < 1:
+            raise CommandError('--processes must be a positive number')
+
+        report = open(options['report'], 'w', newline='') if options['report'] else self.stdout
+        try:
+            with open(options['file'], newline='') as users:
+                provisioner = UserProvisioner(
+                    report=report,
+                    batch_size=options['batch_size'],
+                    processes=options['processes'],
+                    dry_run=options['dry_run']
+                )
+                started = time.perf_counter()
+                provisioner.provision(users)
+                elapsed = time.perf_counter() - started
+        except (OSError, ValueError) as error:
+            raise CommandError(error)
+        finally:
+            if report is not self.stdout:
+                report.close()
+
+        summary = (
+            f'{provisioner.lines} rows, {provisioner.created} created, {provisioner.failed} rejected '
+            f'in {elapsed:.2f}s{" (dry run)" if options["dry_run"] else ""}'
+        )
+        # Keep stdout a valid CSV report when no report file is given
+        if options['report']:
+            self.stdout.write(self.style.SUCCESS(summary))
+        else:
+            self.stderr.write(summary, style_func=self.style.SUCCESS)
@@ -0,0 +1,163 @@
+import os
+import csv
+from concurrent.futures import ProcessPoolExecutor
+
+import django
+from django.db import transaction, IntegrityError
+from django.core.exceptions import ValidationError
+from django.core.validators import validate_email
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.password_validation import get_default_password_validators, validate_password
+
+from accounts.enums import UserRole
+from accounts.models import User
+
+
+REQUIRED_COLUMNS = ('username', 'password', 'role')
+REPORT_COLUMNS = ('line', 'username', 'email', 'role', 'error')
+
+# Roles a provisioning file may grant, by the name used in its ``role`` column
+PROVISIONING_ROLES = {
+    'customer': UserRole.LOAN_CUSTOMER,
+    'provider': UserRole.LOAN_PROVIDER,
+}
+
+
+def setup_worker():
+    # Spawned workers start without Django, forked ones already have it and return early
+    django.setup()
+
+
+class UserProvisioner:
+    """
+    Create customer and provider accounts from a CSV file with the columns
+    ``username,email,password,role,first_name,last_name``.
+
+    Rows are read lazily and handled in batches. Each batch is validated as the user API
+    would, with ``AUTH_PASSWORD_VALIDATORS`` built once. Its passwords are hashed across
+    ``processes`` worker processes and the users are inserted with one ``bulk_create``.
+    Rejected rows are written to ``report`` with the reason as they are found.
+    """
+
+    def __init__(self, report, batch_size=1000, processes=None, dry_run=False):
+        self.report = csv.DictWriter(report, fieldnames=REPORT_COLUMNS)
+        self.report.writeheader()
+        self.batch_size = batch_size
+        self.processes = processes or os.cpu_count() or 1
+        self.dry_run = dry_run
+        self.password_validators = get_default_password_validators()
+        self.username_field = User._meta.get_field('username')
+        self.seen_usernames = set()
+        self.executor = None
+        self.lines = 0
+        self.created = 0
+        self.failed = 0
+
+    def provision(self, stream):
+        reader = csv.DictReader(stream)
+        missing = set(REQUIRED_COLUMNS) - set(reader.fieldnames or ())
+        if missing:
+            raise ValueError(f"File is missing the columns: {', '.join(sorted(missing))}")
+
+        if self.processes > 1:
+            self.executor = ProcessPoolExecutor(max_workers=self.processes, initializer=setup_worker)
+        try:
+            batch = []
+            for line_number, row in enumerate(reader, start=2):
+                batch.append((line_number, row))
+                if len(batch) == self.batch_size:
+                    self.provision_batch(batch)
+                    batch = []
+            if batch:
+                self.provision_batch(batch)
+        finally:
+            if self.executor is not None:
+                self.executor.shutdown()
+                self.executor = None
+        return self
+
+    def add_error(self, line_number, row, error):
+        self.failed += 1
+        self.report.writerow({'line': line_number, **{key: row.get(key) for key in REPORT_COLUMNS[1:-1]},
+                              'error': error})
+
+    def validate_row(self, row):
+        username = (row.get('username') or '').strip()
+        email = (row.get('email') or '').strip()
+        role = PROVISIONING_ROLES.get((row.get('role') or '').strip().lower())
+        if role is None:
+            raise ValidationError(f"Role should be one of {', '.join(PROVISIONING_ROLES)}")
+
+        self.username_field.clean(username, None)
+        if email:
+            validate_email(email)
+
+        user = User(
+            username=username,
+            email=email,
+            first_name=(row.get('first_name') or '').strip(),
+            last_name=(row.get('last_name') or '').strip(),
+            role=role
+        )
+        validate_password(row.get('password') or '', user, password_validators=self.password_validators)
+        return user
+
+    def get_existing_usernames(self, usernames):
+        return set(User.objects.filter(username__in=usernames).values_list('username', flat=True))
+
+    def parse_batch(self, batch):
+        existing = self.get_existing_usernames({(row.get('username') or '').strip() for _, row in batch})
+        users = []
+        for line_number, row in batch:
+            try:
+                user = self.validate_row(row)
+            except ValidationError as error:
+                self.add_error(line_number, row, ' '.join(error.messages))
+                continue
+            if user.username in existing:
+                self.add_error(line_number, row, 'A user with that username already exists.')
+                continue
+            if user.username in self.seen_usernames:
+                self.add_error(line_number, row, 'Duplicate username in the file.')
+                continue
+            self.seen_usernames.add(user.username)
+            users.append((line_number, row, user))
+        return users
+
+    def hash_passwords(self, passwords):
+        if self.executor is None:
+            return [make_password(password) for password in passwords]
+        # Large chunks keep the pickling overhead negligible next to the hashing
+        chunksize = max(len(passwords) // (self.processes * 4), 1)
+        return list(self.executor.map(make_password, passwords, chunksize=chunksize))
+
+    def provision_batch(self, batch):
+        self.lines += len(batch)
+        users = self.parse_batch(batch)
+        if not users:
+            return
+
+        if self.dry_run:
+            self.created += len(users)
+            return
+
+        hashed = self.hash_passwords([row.get('password') for _, row, _ in users])
+        for (_, _, user), password in zip(users, hashed):
+            user.password = password
+
+        try:
+            self.insert(users)
+        except IntegrityError:
+            # Usernames taken meanwhile through the API, the rest of the batch is inserted again
+            existing = self.get_existing_usernames([user.username for _, _, user in users])
+            for line_number, row, user in users:
+                if user.username in existing:
+                    self.add_error(line_number, row, 'A user with that username already exists.')
+            users = [(line_number, row, user) for line_number, row, user in users if user.username not in existing]
+            if users:
+                self.insert(users)
+        self.created += len(users)
+
+    @transaction.atomic
+    def insert(self, users):
+        User.objects.bulk_create([user for _, _, user in users])
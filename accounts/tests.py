@@ -1,5 +1,13 @@
+import os
+import csv
+import tempfile
+from io import StringIO
+from unittest.mock import patch
+
 from django.urls import reverse
-from django.test import TestCase
+from django.test import TestCase, override_settings
+from django.core.management import call_command
+from django.core.management.base import CommandError
 
 from rest_framework import status
 from rest_framework.test import APIClient, APITestCase
@@ -8,6 +16,7 @@ from accounts.enums import UserRole
 from accounts.models import User
 from accounts.factories import UserFactory
 from accounts.api.permissions import IsOwner
+from accounts.views import get_index_page
 
 
 class UserViewSetTestCase(APITestCase):
@@ -246,3 +255,120 @@ class IsOwnerPermissionTest(TestCase):
             self.assertTrue(user.is_active)
             # Verify password was set correctly
             self.assertTrue(user.check_password('defaultpassword'))
+
+
+class ProvisionUsersTestCase(TestCase):
+
+    def setUp(self):
+        UserFactory(username='taken', role=UserRole.LOAN_CUSTOMER.value)
+
+    def write_users(self, rows):
+        handle, path = tempfile.mkstemp(suffix='.csv')
+        with os.fdopen(handle, 'w', newline='') as users:
+            writer = csv.writer(users)
+            writer.writerow(['username', 'email', 'password', 'role', 'first_name', 'last_name'])
+            writer.writerows(rows)
+        self.addCleanup(os.remove, path)
+        return path
+
+    def provision(self, rows, *args):
+        report, summary = StringIO(), StringIO()
+        call_command('provision_users', self.write_users(rows), *args, stdout=report, stderr=summary)
+        return list(csv.DictReader(StringIO(report.getvalue())))
+
+    def test_provision_users(self):
+        """
+        Test valid rows are created with their role and a usable password
+        """
+        errors = self.provision([
+            ['alice', 'alice@example.com', 'Sturdy-Pass-101', 'customer', 'Alice', 'Smith'],
+            ['bank', '', 'Sturdy-Pass-102', 'Provider', '', ''],
+        ])
+
+        self.assertEqual(errors, [])
+        alice = User.objects.get(username='alice')
+        self.assertEqual(alice.role, UserRole.LOAN_CUSTOMER)
+        self.assertEqual(alice.last_name, 'Smith')
+        self.assertTrue(alice.check_password('Sturdy-Pass-101'))
+        self.assertEqual(User.objects.get(username='bank').role, UserRole.LOAN_PROVIDER)
+
+    def test_provision_reports_rejected_rows(self):
+        """
+        Test each invalid row is reported with its line and reason, and the others are created
+        """
+        errors = self.provision([
+            ['taken', '', 'Sturdy-Pass-101', 'customer', '', ''],
+            ['weak', '', '12345678', 'customer', '', ''],
+            ['admin', '', 'Sturdy-Pass-102', 'admin', '', ''],
+            ['mail', 'not-an-email', 'Sturdy-Pass-103', 'customer', '', ''],
+            ['bob', '', 'Sturdy-Pass-104', 'customer', '', ''],
+            ['bob', '', 'Sturdy-Pass-105', 'customer', '', ''],
+        ], '--batch-size', '2')
+
+        self.assertEqual([(error['line'], error['username']) for error in errors],
+                         [('2', 'taken'), ('3', 'weak'), ('4', 'admin'), ('5', 'mail'), ('7', 'bob')])
+        self.assertIn('too common', errors[1]['error'])
+        self.assertIn('Duplicate username', errors[4]['error'])
+        self.assertTrue(User.objects.get(username='bob').check_password('Sturdy-Pass-104'))
+        self.assertFalse(User.objects.filter(username__in=['weak', 'admin', 'mail']).exists())
+
+    def test_provision_constant_queries(self):
+        """
+        Test a batch costs one lookup and one INSERT regardless of its size
+        """
+        rows = [[f'user{number}', '', f'Sturdy-Pass-{number}', 'customer', '', ''] for number in range(20)]
+        # existing usernames, savepoint, insert, release
+        with self.assertNumQueries(4):
+            self.provision(rows, '--processes', '1')
+        self.assertEqual(User.objects.filter(username__startswith='user').count(), 20)
+
+    def test_provision_process_pool(self):
+        """
+        Test passwords hashed by worker processes are checked by the main one
+        """
+        rows = [[f'pool{number}', '', f'Sturdy-Pass-{number}', 'provider', '', ''] for number in range(4)]
+        self.assertEqual(self.provision(rows, '--processes', '2'), [])
+        self.assertTrue(User.objects.get(username='pool3').check_password('Sturdy-Pass-3'))
+
+    def test_provision_dry_run_and_errors(self):
+        """
+        Test a dry run creates nothing and a malformed file is a command error
+        """
+        self.provision([['carol', '', 'Sturdy-Pass-101', 'customer', '', '']], '--dry-run')
+        self.assertFalse(User.objects.filter(username='carol').exists())
+
+        handle, path = tempfile.mkstemp(suffix='.csv')
+        with os.fdopen(handle, 'w') as users:
+            users.write('username,email\n')
+        self.addCleanup(os.remove, path)
+        with self.assertRaises(CommandError):
+            call_command('provision_users', path, stdout=StringIO(), stderr=StringIO())
+
+
+@override_settings(DEBUG=False)
+class HomeViewTestCase(TestCase):
+
+    def setUp(self):
+        get_index_page.cache_clear()
+        self.addCleanup(get_index_page.cache_clear)
+
+    def test_index_rendered_once(self):
+        """
+        Test the index page is rendered on the first hit and then served from memory
+        """
+        with patch('accounts.views.render_to_string', return_value='<html></html>') as render_to_string:
+            first = self.client.get('/')
+            second = self.client.get('/loans/42/')
+
+        render_to_string.assert_called_once()
+        self.assertEqual(first.content, b'<html></html>')
+        self.assertEqual(first['ETag'], second['ETag'])
+
+    def test_index_not_modified(self):
+        """
+        Test a client holding the current index page is answered with a 304
+        """
+        etag = self.client.get('/')['ETag']
+        response = self.client.get('/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.content, b'')
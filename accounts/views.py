@@ -1,5 +1,30 @@
-from django.views.generic import TemplateView
+from functools import lru_cache
 
+from django.conf import settings
+from django.template.loader import render_to_string
+from django.views import View
 
-class HomeView(TemplateView):
+from core.utils import get_etag, get_etag_response
+
+
+@lru_cache
+def get_index_page(template_name):
+    content = render_to_string(template_name).encode()
+    return content, get_etag(content)
+
+
+class HomeView(View):
+    """
+    The front end's ``index.html``, answered for every path nothing else routes. It only
+    changes with the static files of a deploy, so it is rendered on the first hit of each
+    process and then served from memory with an ``ETag``, except under ``DEBUG``.
+    """
     template_name = 'index.html'
+
+    def get(self, request, *args, **kwargs):
+        if settings.DEBUG:
+            content = render_to_string(self.template_name, request=request).encode()
+            etag = get_etag(content)
+        else:
+            content, etag = get_index_page(self.template_name)
+        return get_etag_response(request, content, etag, content_type='text/html; charset=utf-8')
@@ -0,0 +1,91 @@
+"""
+Run the micro benchmarks, write their timings as JSON and compare them with a baseline,
+exiting with status 1 when one got slower than the threshold allows.
+
+    python -m benchmarks --output baseline.json
+    python -m benchmarks --baseline baseline.json --threshold 0.1
+"""
+import sys
+import json
+import argparse
+import platform
+
+from benchmarks.utils import setup_django, best_of
+
+
+def run(names, repeat):
+    from benchmarks.micro import BENCHMARKS, Fixtures
+
+    fixtures = Fixtures()
+    results = {}
+    for name in names:
+        setup, loops = BENCHMARKS[name]
+        func = setup(fixtures)
+
+        def sample():
+            for _ in range(loops):
+                func()
+
+        seconds = best_of(sample, repeat=repeat) / loops
+        results[name] = {'seconds': seconds, 'ops_per_second': 1 / seconds, 'loops': loops}
+        print(f'{name:<34} {seconds * 1e6:>12,.2f} us/op  {1 / seconds:>12,.0f} ops/s', file=sys.stderr)
+    return results
+
+
+def compare(baseline, results, threshold):
+    # Names of the benchmarks slower than their baseline by more than ``threshold``
+    regressions = []
+    for name, result in results.items():
+        before = baseline['benchmarks'].get(name)
+        if before is None:
+            continue
+        change = result['seconds'] / before['seconds'] - 1
+        regressed = change > threshold
+        print(f'{name:<34} {before["seconds"] * 1e6:>12,.2f} -> {result["seconds"] * 1e6:>12,.2f} us/op  '
+              f'{change:>+8.1%}{"  REGRESSION" if regressed else ""}', file=sys.stderr)
+        if regressed:
+            regressions.append(name)
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('names', nargs='*', help='Benchmarks to run, all of them by default')
+    parser.add_argument('--repeat', type=int, default=5, help='Samples per benchmark, the best one is kept')
+    parser.add_argument('--output', help='Write the results to this JSON file instead of stdout')
+    parser.add_argument('--baseline', help='JSON results of an earlier run to compare with')
+    parser.add_argument('--threshold', type=float, default=0.1,
+                        help='Slowdown over the baseline counted as a regression, 0.1 is 10%%')
+    args = parser.parse_args()
+
+    baseline = None
+    if args.baseline:
+        with open(args.baseline) as file:
+            baseline = json.load(file)
+
+    setup_django()
+
+    from benchmarks.micro import BENCHMARKS
+
+    unknown = set(args.names) - set(BENCHMARKS)
+    if unknown:
+        parser.error(f"unknown benchmarks: {', '.join(sorted(unknown))}, choose from {', '.join(BENCHMARKS)}")
+
+    results = {
+        'python': platform.python_version(),
+        'machine': platform.machine(),
+        'benchmarks': run(args.names or list(BENCHMARKS), args.repeat),
+    }
+    if args.output:
+        with open(args.output, 'w') as file:
+            json.dump(results, file, indent=2)
+    else:
+        json.dump(results, sys.stdout, indent=2)
+        print()
+
+    if baseline is not None and compare(baseline, results['benchmarks'], args.threshold):
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,177 @@
+"""
+Throughput and latency of the loan list under many concurrent clients, served by a thread
+pool WSGI server running the DRF viewset and by uvicorn running the async view.
+
+    python -m benchmarks.bench_asgi --clients 500 --duration 10 --threads 32
+"""
+import os
+import sys
+import time
+import base64
+import socket
+import asyncio
+import argparse
+import tempfile
+import subprocess
+from statistics import quantiles
+from concurrent.futures import ThreadPoolExecutor
+from socketserver import ThreadingMixIn
+from wsgiref.simple_server import WSGIServer, WSGIRequestHandler, make_server
+
+USERNAME = 'benchmark'
+PASSWORD = 'benchmark'
+PATH = '/api/loans/'
+
+
+class PooledWSGIServer(ThreadingMixIn, WSGIServer):
+    # At most ``threads`` requests run at once, like a threaded WSGI worker
+    request_queue_size = 1024
+    pool = None
+
+    def process_request(self, request, client_address):
+        self.pool.submit(self.process_request_thread, request, client_address)
+
+
+class QuietHandler(WSGIRequestHandler):
+    def log_message(self, *args):
+        pass
+
+
+def serve_wsgi(port, threads):
+    from django.core.wsgi import get_wsgi_application
+
+    PooledWSGIServer.pool = ThreadPoolExecutor(max_workers=threads)
+    server = make_server('127.0.0.1', port, get_wsgi_application(), PooledWSGIServer, QuietHandler)
+    server.serve_forever()
+
+
+def seed():
+    import django
+    django.setup()
+
+    from django.core.management import call_command
+    call_command('migrate', verbosity=0)
+
+    from accounts.models import CustomerUser
+    from loans.enums import LoanStatus
+    from loans.factories import LoanTypeFactory, LoanFactory
+
+    customer = CustomerUser.objects.create_user(username=USERNAME, email='benchmark@example.com',
+                                                password=PASSWORD, role=CustomerUser.base_role)
+    loan_type = LoanTypeFactory()
+    for _ in range(25):
+        LoanFactory(customer=customer, loan_type=loan_type, status=LoanStatus.ACTIVE)
+
+
+def wait_for_port(port, timeout=30):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            socket.create_connection(('127.0.0.1', port), timeout=1).close()
+            return
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError(f'Nothing listens on port {port}')
+
+
+async def fetch(port, request):
+    reader, writer = await asyncio.open_connection('127.0.0.1', port)
+    try:
+        writer.write(request)
+        await writer.drain()
+        response = await reader.read()
+    finally:
+        writer.close()
+    return int(response.split(b' ', 2)[1])
+
+
+async def load(port, clients, duration):
+    credentials = base64.b64encode(f'{USERNAME}:{PASSWORD}'.encode()).decode()
+    request = (
+        f'GET {PATH} HTTP/1.1\r\nHost: 127.0.0.1\r\nAuthorization: Basic {credentials}\r\n'
+        f'Accept: application/json\r\nConnection: close\r\n\r\n'
+    ).encode()
+    latencies, errors = [], 0
+    deadline = time.perf_counter() + duration
+
+    async def client():
+        nonlocal errors
+        while time.perf_counter() < deadline:
+            start = time.perf_counter()
+            try:
+                status = await fetch(port, request)
+            except (OSError, IndexError, ValueError):
+                status = None
+            if status == 200:
+                latencies.append(time.perf_counter() - start)
+            else:
+                errors += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(clients)))
+    return latencies, errors, time.perf_counter() - start
+
+
+def read_process_status(pid):
+    # Threads and resident memory of the server, Linux only
+    try:
+        with open(f'/proc/{pid}/status') as status:
+            fields = dict(line.split(':', 1) for line in status)
+    except OSError:
+        return '-', '-'
+    return fields['Threads'].strip(), fields['VmRSS'].strip()
+
+
+async def load_and_sample(pid, port, clients, duration):
+    task = asyncio.ensure_future(load(port, clients, duration))
+    await asyncio.sleep(duration / 2)
+    sample = read_process_status(pid)
+    return *(await task), sample
+
+
+def run(name, command, port, args, env):
+    server = subprocess.Popen(command, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        wait_for_port(port)
+        latencies, errors, seconds, (threads, memory) = asyncio.run(
+            load_and_sample(server.pid, port, args.clients, args.duration)
+        )
+    finally:
+        server.terminate()
+        server.wait()
+
+    percentiles = quantiles(latencies, n=100) if len(latencies) > 1 else [0] * 99
+    print(f'{name:<6} {len(latencies) / seconds:>8,.0f} req/s  p50 {percentiles[49] * 1000:>7.1f} ms  '
+          f'p99 {percentiles[98] * 1000:>7.1f} ms  {errors} errors  {threads} threads  {memory} RSS  '
+          f'({args.clients} clients)')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--clients', type=int, default=500)
+    parser.add_argument('--duration', type=float, default=10)
+    parser.add_argument('--threads', type=int, default=32, help='Threads of the WSGI server')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--serve-wsgi', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.serve_wsgi:
+        return serve_wsgi(args.port, args.threads)
+
+    with tempfile.TemporaryDirectory() as directory:
+        env = {
+            **os.environ,
+            'DJANGO_SETTINGS_MODULE': 'benchmarks.settings',
+            'BENCHMARK_DATABASE': os.path.join(directory, 'db.sqlite3'),
+        }
+        os.environ.update(env)
+        seed()
+
+        run('WSGI', [sys.executable, '-m', 'benchmarks.bench_asgi', '--serve-wsgi', '--port', str(args.port),
+                     '--threads', str(args.threads)], args.port, args, env)
+        run('ASGI', [sys.executable, '-m', 'uvicorn', 'core.asgi:application', '--port', str(args.port + 1),
+                     '--log-level', 'warning', '--no-access-log'], args.port + 1, args, env)
+
+
+if __name__ == '__main__':
+    main()
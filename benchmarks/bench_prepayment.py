@@ -0,0 +1,73 @@
+"""
+Prepaying a 360 month loan: regenerating the whole schedule the way approval does versus
+recomputing only the unpaid tail in bulk.
+
+    python -m benchmarks.bench_prepayment --months 360 --paid 60
+"""
+import argparse
+from datetime import date
+from decimal import Decimal
+
+from benchmarks.utils import setup_django, best_of
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--months', type=int, default=360)
+    parser.add_argument('--paid', type=int, default=60)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    setup_django()
+
+    from django.db import connection, transaction
+    from django.test.utils import CaptureQueriesContext
+
+    from accounts.factories import CustomerUserFactory
+    from loans.enums import LoanStatus, PrepaymentMode
+    from loans.factories import LoanTypeFactory, LoanFactory
+    from loans.models import AmortizationSchedule
+    from loans.signals import create_amortization_schedule
+    from loans.utils import recompute_schedule_tail
+
+    loan = LoanFactory(
+        customer=CustomerUserFactory(),
+        loan_type=LoanTypeFactory(interest_rate=6.0, max_amount=Decimal('500000.00')),
+        amount=Decimal('300000.00'),
+        duration_months=args.months,
+        status=LoanStatus.PENDING,
+        start_at=date(2025, 1, 1)
+    )
+    loan.status = LoanStatus.APPROVED
+    loan.save()
+
+    def pay_head():
+        AmortizationSchedule.objects.filter(
+            loan=loan,
+            payment_date__lt=date(2025, 1, 1).replace(year=2025 + args.paid // 12, month=args.paid % 12 + 1)
+        ).update(is_paid=True)
+
+    def regenerate():
+        with transaction.atomic():
+            loan.amortizations.all().delete()
+            create_amortization_schedule(sender=type(loan), instance=loan, created=False)
+            pay_head()
+
+    def tail(mode):
+        def run():
+            with transaction.atomic():
+                recompute_schedule_tail(loan, prepayment=Decimal('10.00'), mode=mode)
+        return run
+
+    pay_head()
+    for name, func in (('regenerate', regenerate), ('tail keep term', tail(PrepaymentMode.KEEP_TERM)),
+                       ('tail keep payment', tail(PrepaymentMode.KEEP_PAYMENT))):
+        with CaptureQueriesContext(connection) as context:
+            func()
+        seconds = best_of(func, repeat=args.repeat)
+        print(f'{name:<18} {seconds * 1000:>9.1f} ms  {len(context):>5} queries  ({args.months} months, '
+              f'{args.paid} paid)')
+
+
+if __name__ == '__main__':
+    main()
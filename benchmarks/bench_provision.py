@@ -0,0 +1,50 @@
+"""
+Provisioning users from a CSV file with the production password hasher, users per second
+for a growing number of hashing processes.
+
+    python -m benchmarks.bench_provision --users 200
+"""
+import os
+import argparse
+from io import StringIO
+
+from benchmarks.utils import setup_django, best_of
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--users', type=int, default=200)
+    parser.add_argument('--repeat', type=int, default=1)
+    parser.add_argument('--processes', type=int, nargs='*',
+                        help='Process counts to measure, powers of two up to the core count by default')
+    args = parser.parse_args()
+
+    setup_django()
+
+    from django.contrib.auth.hashers import get_hasher
+
+    from accounts.models import User
+    from accounts.provisioning import UserProvisioner
+
+    cores = os.cpu_count() or 1
+    counts = args.processes or sorted({2 ** power for power in range(cores.bit_length())} | {cores})
+    rows = '\n'.join(
+        ['username,email,password,role,first_name,last_name'] +
+        [f'bench{number},bench{number}@example.com,Sturdy-Pass-{number},customer,Bench,User'
+         for number in range(args.users)]
+    )
+
+    def provision(processes):
+        def run():
+            User.objects.filter(username__startswith='bench').delete()
+            UserProvisioner(report=StringIO(), processes=processes).provision(StringIO(rows))
+        return run
+
+    print(f'{get_hasher().algorithm}, {cores} cores, {args.users} users')
+    for processes in counts:
+        seconds = best_of(provision(processes), repeat=args.repeat)
+        print(f'{processes:>3} processes  {args.users / seconds:>9.1f} users/s  {seconds:>7.2f} s')
+
+
+if __name__ == '__main__':
+    main()
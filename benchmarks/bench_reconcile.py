@@ -0,0 +1,100 @@
+"""
+Statement lines reconciled per minute by ``manage.py reconcile_statement``.
+
+    python -m benchmarks.bench_reconcile --lines 100000
+"""
+import os
+import csv
+import time
+import argparse
+import tempfile
+from io import StringIO
+from decimal import Decimal
+from datetime import date, timedelta
+
+from benchmarks.utils import setup_django
+
+
+def seed_unpaid_book(customers, installments):
+    from accounts.models import CustomerUser
+    from loans.enums import LoanStatus
+    from loans.factories import LoanTypeFactory
+    from loans.models import Loan, AmortizationSchedule
+
+    loan_type = LoanTypeFactory()
+    CustomerUser.objects.bulk_create(
+        CustomerUser(username=f'customer{number}', password='!', role=CustomerUser.base_role)
+        for number in range(customers)
+    )
+    Loan.objects.bulk_create(
+        Loan(customer=customer, loan_type=loan_type, amount=Decimal('10000.00'), duration_months=installments,
+             status=LoanStatus.ACTIVE, start_at=date(2025, 1, 1))
+        for customer in CustomerUser.objects.all()
+    )
+
+    start = date(2025, 1, 1)
+    AmortizationSchedule.objects.bulk_create(
+        (
+            AmortizationSchedule(
+                loan_id=loan_id,
+                payment_number=str(number),
+                payment_date=start + timedelta(days=30 * number),
+                principal_amount=Decimal('101.37'),
+                interest_amount=Decimal('12.05'),
+                total_payment=Decimal('113.42'),
+                remaining_balance=Decimal('9000.00'),
+            )
+            for loan_id in Loan.objects.values_list('id', flat=True)
+            for number in range(1, installments + 1)
+        ),
+        batch_size=5000
+    )
+
+
+def write_statement(path, customers, installments):
+    start = date(2025, 1, 1)
+    with open(path, 'w', newline='') as statement:
+        writer = csv.writer(statement)
+        writer.writerow(['date', 'amount', 'reference', 'transaction_id'])
+        for number in range(1, installments + 1):
+            for customer in range(customers):
+                writer.writerow([
+                    (start + timedelta(days=30 * number + 1)).isoformat(), '113.42', f'customer{customer}',
+                    f'BANK-{customer}-{number}'
+                ])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--lines', type=int, default=100000)
+    parser.add_argument('--installments', type=int, default=12)
+    parser.add_argument('--batch-size', type=int, default=5000)
+    args = parser.parse_args()
+
+    setup_django()
+
+    from django.core.management import call_command
+
+    customers = max(args.lines // args.installments, 1)
+    seed_unpaid_book(customers, args.installments)
+
+    handle, path = tempfile.mkstemp(suffix='.csv')
+    os.close(handle)
+    try:
+        write_statement(path, customers, args.installments)
+        lines = customers * args.installments
+
+        report, summary = StringIO(), StringIO()
+        start = time.perf_counter()
+        call_command('reconcile_statement', path, '--batch-size', str(args.batch_size), stdout=report,
+                     stderr=summary)
+        seconds = time.perf_counter() - start
+    finally:
+        os.remove(path)
+
+    print(summary.getvalue().strip())
+    print(f'{lines / seconds * 60:>12,.0f} lines/min  ({seconds:.2f} s / {lines} lines)')
+
+
+if __name__ == '__main__':
+    main()
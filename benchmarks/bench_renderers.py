@@ -0,0 +1,51 @@
+"""
+Payload size, render and parse time of a paginated amortization page through the
+stock DRF JSON classes, the orjson backed ``FastJSONRenderer`` / ``FastJSONParser`` and
+the ``MessagePackRenderer`` / ``MessagePackParser`` pair.
+
+    python -m benchmarks.bench_renderers --rows 1000
+"""
+import io
+import argparse
+
+from benchmarks.utils import setup_django, best_of, seed_schedules
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rows', type=int, default=1000)
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    setup_django()
+
+    from rest_framework.parsers import JSONParser
+    from rest_framework.renderers import JSONRenderer
+
+    from core.api.parsers import FastJSONParser, MessagePackParser
+    from core.api.renderers import FastJSONRenderer, MessagePackRenderer
+    from loans.models import AmortizationSchedule
+    from loans.api.serializers import AmortizationScheduleSerializer
+
+    seed_schedules(rows=args.rows)
+    page = {
+        'count': args.rows,
+        'next': None,
+        'previous': None,
+        'results': AmortizationScheduleSerializer(AmortizationSchedule.objects.all(), many=True).data,
+    }
+    assert FastJSONRenderer().render(page) == JSONRenderer().render(page)
+
+    print(f'{args.rows} rows')
+    for name, renderer, parser_class in (
+            ('JSONRenderer', JSONRenderer(), JSONParser),
+            ('FastJSONRenderer', FastJSONRenderer(), FastJSONParser),
+            ('MessagePackRenderer', MessagePackRenderer(), MessagePackParser)):
+        body = renderer.render(page)
+        render = best_of(lambda: renderer.render(page), repeat=args.repeat)
+        parse = best_of(lambda: parser_class().parse(io.BytesIO(body)), repeat=args.repeat)
+        print(f'{name:<20} {len(body):>10,} bytes   render {render * 1000:>7.2f} ms   parse {parse * 1000:>7.2f} ms')
+
+
+if __name__ == '__main__':
+    main()
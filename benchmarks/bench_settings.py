@@ -0,0 +1,95 @@
+"""
+Cost of one API request under ``core.settings`` and ``core.settings_production``: each
+profile serves the loan list through its WSGI application in a process of its own,
+against its own SQLite file, so the connection setup, pragmas and middleware chain of
+each request are measured without any network in the way.
+
+    python -m benchmarks.bench_settings --requests 2000
+"""
+import os
+import sys
+import json
+import time
+import base64
+import argparse
+import tempfile
+import subprocess
+from statistics import mean, quantiles
+from wsgiref.util import setup_testing_defaults
+
+from benchmarks.bench_asgi import USERNAME, PASSWORD, PATH, seed
+
+# Profile name and the settings module of its benchmark process
+PROFILES = {
+    'default': 'benchmarks.settings',
+    'production': 'benchmarks.settings_production',
+}
+
+
+def measure(requests):
+    seed()
+
+    from core.wsgi import application
+
+    credentials = base64.b64encode(f'{USERNAME}:{PASSWORD}'.encode()).decode()
+    environ = {'REQUEST_METHOD': 'GET', 'PATH_INFO': PATH, 'HTTP_AUTHORIZATION': f'Basic {credentials}',
+               'HTTP_ACCEPT': 'application/json'}
+    setup_testing_defaults(environ)
+    statuses = []
+
+    def start_response(status, headers, exc_info=None):
+        statuses.append(status)
+
+    def request():
+        result = application(dict(environ), start_response)
+        try:
+            b''.join(result)
+        finally:
+            # Sends ``request_finished``, where connections past their CONN_MAX_AGE are closed
+            result.close()
+
+    for _ in range(50):
+        request()
+
+    latencies = []
+    for _ in range(requests):
+        start = time.perf_counter()
+        request()
+        latencies.append(time.perf_counter() - start)
+
+    errors = sum(not status.startswith('200') for status in statuses)
+    return {'latencies': latencies, 'errors': errors}
+
+
+def run(name, args, directory):
+    env = {
+        **os.environ,
+        'DJANGO_SETTINGS_MODULE': PROFILES[name],
+        'BENCHMARK_DATABASE': os.path.join(directory, f'{name}.sqlite3'),
+    }
+    output = subprocess.run([sys.executable, '-m', 'benchmarks.bench_settings', '--measure',
+                             '--requests', str(args.requests)], env=env, check=True, capture_output=True, text=True)
+    result = json.loads(output.stdout)
+    latencies = result['latencies']
+    percentiles = quantiles(latencies, n=100)
+    print(f'{name:<11} mean {mean(latencies) * 1000:>6.2f} ms  p50 {percentiles[49] * 1000:>6.2f} ms  '
+          f'p99 {percentiles[98] * 1000:>6.2f} ms  {result["errors"]} errors  ({len(latencies)} requests)')
+    return mean(latencies)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--requests', type=int, default=2000)
+    parser.add_argument('--measure', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.measure:
+        return json.dump(measure(args.requests), sys.stdout)
+
+    with tempfile.TemporaryDirectory() as directory:
+        default, production = (run(name, args, directory) for name in PROFILES)
+    print(f'production saves {(default - production) * 1e6:,.0f} us per request ({1 - production / default:.1%})')
+
+
+if __name__ == '__main__':
+    main()
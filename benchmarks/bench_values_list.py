@@ -0,0 +1,44 @@
+"""
+Rows serialized per second by ``AmortizationScheduleSerializer`` versus the precompiled
+``ValuesPlan`` used by the list endpoints.
+
+    python -m benchmarks.bench_values_list --rows 1000
+"""
+import argparse
+
+from benchmarks.utils import setup_django, best_of, seed_schedules
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rows', type=int, default=1000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    setup_django()
+
+    from rest_framework.renderers import JSONRenderer
+
+    from core.api.values import ValuesPlan
+    from loans.models import AmortizationSchedule
+    from loans.api.serializers import AmortizationScheduleSerializer
+
+    seed_schedules(rows=args.rows)
+    queryset = AmortizationSchedule.objects.all()
+    plan = ValuesPlan.for_serializer(AmortizationScheduleSerializer)
+
+    def serializer():
+        return AmortizationScheduleSerializer(list(queryset), many=True).data
+
+    def values_plan():
+        return plan.to_representation(list(queryset.values_list(*plan.columns)))
+
+    assert JSONRenderer().render(serializer()) == JSONRenderer().render(values_plan())
+
+    for name, func in (('ModelSerializer', serializer), ('ValuesPlan', values_plan)):
+        seconds = best_of(func, repeat=args.repeat)
+        print(f'{name:<16} {args.rows / seconds:>12,.0f} rows/s  ({seconds * 1000:.1f} ms / {args.rows} rows)')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,117 @@
+"""
+Hot paths timed in isolation: the monthly payment formula, schedule generation for
+several terms, ``LoanSerializer.validate``, ``AmortizationScheduleSerializer`` list
+rendering and the role permission checks. Run them with ``python -m benchmarks``.
+"""
+from datetime import date
+from decimal import Decimal
+
+# Name of each benchmark and the function building it, registered in running order
+BENCHMARKS = {}
+
+
+def benchmark(name, loops):
+    """
+    Register a function returning the callable to time, ``loops`` calls make one sample
+    """
+    def decorator(setup):
+        BENCHMARKS[name] = (setup, loops)
+        return setup
+    return decorator
+
+
+class Fixtures:
+    """
+    Rows shared by the benchmarks, created once in the test database
+    """
+
+    def __init__(self):
+        from rest_framework.request import Request
+        from rest_framework.test import APIRequestFactory
+
+        from accounts.factories import CustomerUserFactory, PersonnelUserFactory
+        from loans.enums import LoanStatus
+        from loans.factories import LoanFundFactory, LoanTypeFactory, LoanFactory
+        from loans.models import AmortizationSchedule
+        from loans.signals import build_amortization_schedule
+
+        self.customer = CustomerUserFactory()
+        self.loan_type = LoanTypeFactory(personnel=PersonnelUserFactory(), interest_rate=7.5,
+                                         min_amount=Decimal('1000.00'), max_amount=Decimal('500000.00'),
+                                         min_duration_months=6, max_duration_months=360)
+        LoanFundFactory(amount=Decimal('10000000.00'))
+
+        loan = LoanFactory(customer=self.customer, loan_type=self.loan_type, amount=Decimal('300000.00'),
+                           duration_months=360, status=LoanStatus.ACTIVE, start_at=date(2025, 1, 1))
+        AmortizationSchedule.objects.bulk_create(build_amortization_schedule(loan), batch_size=500)
+        self.schedules = list(AmortizationSchedule.objects.filter(loan=loan).select_related('loan__customer'))
+
+        # A customer without unpaid installments, ``LoanSerializer.validate`` accepts them
+        self.request = Request(APIRequestFactory().post('/api/loans/'))
+        self.request.user = CustomerUserFactory()
+        self.owner_request = Request(APIRequestFactory().post('/api/loans/amortization/'))
+        self.owner_request.user = self.customer
+
+
+def unsaved_loan(fixtures, months):
+    from loans.models import Loan
+
+    return Loan(customer=fixtures.customer, loan_type=fixtures.loan_type, amount=Decimal('300000.00'),
+                duration_months=months, start_at=date(2025, 1, 1))
+
+
+@benchmark('monthly_payment', loops=10000)
+def monthly_payment(fixtures):
+    from loans.utils import calculate_loan_monthly_payment
+
+    rate = Decimal('7.5') / 100 / 12
+    return lambda: calculate_loan_monthly_payment(Decimal('300000.00'), rate, 360)
+
+
+def schedule_benchmark(months, loops):
+    def setup(fixtures):
+        from loans.signals import build_amortization_schedule
+
+        loan = unsaved_loan(fixtures, months)
+        return lambda: build_amortization_schedule(loan)
+    return benchmark(f'schedule_{months}', loops=loops)(setup)
+
+
+schedule_benchmark(12, loops=200)
+schedule_benchmark(60, loops=50)
+schedule_benchmark(360, loops=10)
+
+
+@benchmark('loan_serializer_validate', loops=50)
+def loan_serializer_validate(fixtures):
+    from loans.api.serializers import LoanSerializer
+
+    serializer = LoanSerializer(context={'request': fixtures.request})
+    data = {'loan_type': fixtures.loan_type, 'amount': Decimal('5000.00'), 'duration_months': 12}
+    return lambda: serializer.validate(data)
+
+
+@benchmark('schedule_list_render', loops=5)
+def schedule_list_render(fixtures):
+    from rest_framework.renderers import JSONRenderer
+
+    from loans.api.serializers import AmortizationScheduleSerializer
+
+    renderer = JSONRenderer()
+    return lambda: renderer.render(AmortizationScheduleSerializer(fixtures.schedules, many=True).data)
+
+
+@benchmark('permission_has_permission', loops=10000)
+def permission_has_permission(fixtures):
+    from loans.api.permissions import IsCustomer
+
+    permission = IsCustomer()
+    return lambda: permission.has_permission(fixtures.request, None)
+
+
+@benchmark('permission_has_object_permission', loops=10000)
+def permission_has_object_permission(fixtures):
+    from loans.api.permissions import IsCustomer
+
+    permission, schedule = IsCustomer(), fixtures.schedules[0]
+    return lambda: permission.has_object_permission(fixtures.owner_request, None, schedule)
@@ -0,0 +1,21 @@
+"""
+Settings of the servers started by the load benchmarks: a throwaway SQLite file shared
+by the server processes and a cheap password hasher, so Basic authentication does not
+dominate the request cost.
+"""
+import os
+
+from core.settings import *  # noqa: F401,F403
+
+DEBUG = False
+
+ALLOWED_HOSTS = ['*']
+
+DATABASES = {
+    'default': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': os.environ['BENCHMARK_DATABASE'],
+    }
+}
+
+PASSWORD_HASHERS = ['django.contrib.auth.hashers.MD5PasswordHasher']
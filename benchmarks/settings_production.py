@@ -0,0 +1,26 @@
+"""
+``core.settings_production`` against the throwaway SQLite file of the load benchmarks,
+with the same cheap password hasher as ``benchmarks.settings``.
+"""
+import os
+
+from core.settings_production import *  # noqa: F401,F403
+from core.settings_production import DATABASES
+
+ALLOWED_HOSTS = ['*']
+
+DATABASES = {
+    'default': {
+        **DATABASES['default'],
+        'NAME': os.environ['BENCHMARK_DATABASE'],
+    }
+}
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': os.environ['BENCHMARK_DATABASE'] + '-cache',
+    }
+}
+
+PASSWORD_HASHERS = ['django.contrib.auth.hashers.MD5PasswordHasher']
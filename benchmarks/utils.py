@@ -0,0 +1,57 @@
+import os
+import time
+from datetime import date, timedelta
+from decimal import Decimal
+
+
+def setup_django():
+    """
+    Configure Django against a throwaway in-memory test database.
+    """
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'core.settings')
+
+    import django
+    django.setup()
+
+    from django.db import connection
+    from django.test.utils import setup_test_environment
+    setup_test_environment()
+    connection.creation.create_test_db(verbosity=0)
+
+
+def best_of(func, repeat=5):
+    # Best wall time over several runs, the least noisy figure for CPU bound code
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def seed_schedules(rows):
+    """
+    Insert one approved loan carrying ``rows`` installments, returns the loan.
+    """
+    from accounts.factories import CustomerUserFactory
+    from loans.enums import LoanStatus
+    from loans.factories import LoanFactory
+    from loans.models import AmortizationSchedule
+
+    loan = LoanFactory(customer=CustomerUserFactory(), status=LoanStatus.ACTIVE, duration_months=rows)
+    start = date(2025, 1, 1)
+    AmortizationSchedule.objects.bulk_create(
+        AmortizationSchedule(
+            loan=loan,
+            payment_number=str(number),
+            payment_date=start + timedelta(days=30 * number),
+            principal_amount=Decimal('101.37'),
+            interest_amount=Decimal('12.05'),
+            total_payment=Decimal('113.42'),
+            remaining_balance=Decimal('9000.00') - number,
+            is_paid=number % 3 == 0,
+            transaction_id=f'TRX{number}' if number % 3 == 0 else None,
+        )
+        for number in range(1, rows + 1)
+    )
+    return loan
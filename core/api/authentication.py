@@ -0,0 +1,27 @@
+from drf_spectacular.authentication import BasicScheme
+from rest_framework.authentication import BasicAuthentication
+
+from core.middleware import timed
+
+
+class TimedBasicAuthentication(BasicAuthentication):
+    """
+    ``BasicAuthentication`` reporting its time, password hashing included, as the
+    ``auth`` metric of ``core.middleware.ServerTimingMiddleware``. Credentials already
+    checked by ``core.profiling`` for a profiled request are not hashed a second time.
+    """
+
+    def authenticate(self, request):
+        authenticated = getattr(request._request, 'basic_authentication', None)
+        if authenticated is not None:
+            return authenticated
+        with timed('auth'):
+            return super().authenticate(request)
+
+
+class BasicSchemeWithSubclasses(BasicScheme):
+    """
+    Document ``TimedBasicAuthentication`` like its parent, as the ``basicAuth`` scheme
+    """
+    match_subclasses = True
+    priority = 0
@@ -0,0 +1,30 @@
+from rest_framework.response import Response
+
+from core.api.values import ValuesPlan
+
+
+class ValuesListModelMixin:
+    """
+    List a queryset through a precompiled ``ValuesPlan`` instead of instantiating the
+    serializer and its fields per row. Falls back to the regular list when the
+    serializer cannot be expressed as a plan.
+    """
+    values_list_enabled: bool = True
+
+    def get_values_plan(self):
+        if not self.values_list_enabled:
+            return None
+        return ValuesPlan.for_serializer(self.get_serializer_class())
+
+    def list(self, request, *args, **kwargs):
+        plan = self.get_values_plan()
+        if plan is None:
+            return super().list(request, *args, **kwargs)
+
+        queryset = self.filter_queryset(self.get_queryset()).values_list(*plan.columns)
+
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            return self.get_paginated_response(plan.to_representation(page))
+
+        return Response(plan.to_representation(queryset))
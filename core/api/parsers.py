@@ -0,0 +1,56 @@
+import codecs
+
+from django.conf import settings
+
+from rest_framework.parsers import BaseParser, JSONParser
+from rest_framework.exceptions import ParseError
+
+from core.api.renderers import FastJSONRenderer, MessagePackRenderer
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+
+class FastJSONParser(JSONParser):
+    """
+    ``JSONParser`` backed by ``orjson`` for UTF-8 bodies, falls back to the stdlib
+    parser otherwise. Numbers are parsed as floats on both paths, ``DecimalField``
+    re-reads them through ``str()`` which is exact for up to 15 significant digits,
+    the widest ``max_digits`` used by the models.
+    """
+    renderer_class = FastJSONRenderer
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        parser_context = parser_context or {}
+        encoding = parser_context.get('encoding', settings.DEFAULT_CHARSET)
+
+        if orjson is None or codecs.lookup(encoding).name != 'utf-8':
+            return super().parse(stream, media_type, parser_context)
+
+        try:
+            return orjson.loads(stream.read())
+        except orjson.JSONDecodeError as exc:
+            raise ParseError('JSON parse error - %s' % str(exc))
+
+
+class MessagePackParser(BaseParser):
+    """
+    Parses ``application/msgpack`` bodies. Clients send values with the encoding
+    documented on ``MessagePackRenderer``: decimals as strings (floats are accepted as
+    in JSON) and dates or datetimes as ISO 8601 strings.
+    """
+    media_type = 'application/msgpack'
+    renderer_class = MessagePackRenderer
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        try:
+            return msgpack.unpackb(stream.read(), raw=False)
+        except (ValueError, msgpack.UnpackException) as exc:
+            raise ParseError('MessagePack parse error - %s' % str(exc))
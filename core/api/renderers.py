@@ -0,0 +1,83 @@
+from decimal import Decimal
+
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+
+class DecimalPreservingJSONEncoder(JSONEncoder):
+    """
+    DRF encoder that writes ``Decimal`` values as exact strings rather than floats,
+    matching what ``DecimalField`` outputs with ``COERCE_DECIMAL_TO_STRING``.
+    """
+
+    def default(self, obj):
+        if isinstance(obj, Decimal):
+            return '{:f}'.format(obj)
+        return super().default(obj)
+
+
+class FastJSONRenderer(JSONRenderer):
+    """
+    ``JSONRenderer`` backed by ``orjson`` when it is installed. Output is the compact
+    form of the stock renderer, ``Decimal`` values are written as exact strings.
+    Indented, non compact or ASCII only output, and a missing ``orjson``, fall back
+    to the stdlib encoder with the same ``Decimal`` handling.
+    """
+    encoder_class = DecimalPreservingJSONEncoder
+
+    def __init__(self):
+        self._default = self.encoder_class().default
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if orjson is None or data is None or self.ensure_ascii or not self.compact:
+            return super().render(data, accepted_media_type, renderer_context)
+
+        if self.get_indent(accepted_media_type, renderer_context or {}) is not None:
+            return super().render(data, accepted_media_type, renderer_context)
+
+        # Datetimes go through the DRF encoder so the ``Z`` suffix matches the stock output
+        ret = orjson.dumps(
+            data, default=self._default,
+            option=orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+        )
+
+        # Same strict javascript subset escaping as the stock renderer
+        if b'\xe2\x80\xa8' in ret or b'\xe2\x80\xa9' in ret:
+            ret = ret.replace(b'\xe2\x80\xa8', b'\\u2028').replace(b'\xe2\x80\xa9', b'\\u2029')
+        return ret
+
+
+class MessagePackRenderer(BaseRenderer):
+    """
+    Renders ``application/msgpack`` with the same value encoding as the JSON output:
+
+    * ``Decimal`` values are strings in fixed point notation, ``"1250.00"``
+    * ``datetime`` values are ISO 8601 strings, UTC is written with a ``Z`` suffix
+    * ``date`` and ``time`` values are ISO 8601 strings
+    * ``UUID`` and lazy translation strings are plain strings
+
+    No msgpack extension types are used, so any msgpack client can decode the payload.
+    """
+    media_type = 'application/msgpack'
+    format = 'msgpack'
+    charset = None
+    render_style = 'binary'
+    encoder_class = DecimalPreservingJSONEncoder
+
+    def __init__(self):
+        self._default = self.encoder_class().default
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        return msgpack.packb(data, default=self._default, use_bin_type=True)
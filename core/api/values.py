@@ -0,0 +1,133 @@
+from datetime import date
+
+from django.utils import timezone
+
+from rest_framework import ISO_8601, serializers
+from rest_framework.settings import api_settings
+from rest_framework.relations import ManyRelatedField
+
+
+# Fields whose database value is already its own representation
+IDENTITY_FIELDS = (
+    serializers.IntegerField,
+    serializers.FloatField,
+    serializers.BooleanField,
+    serializers.CharField,
+    serializers.PrimaryKeyRelatedField,
+)
+
+
+def get_formatter(field, model_field):
+    """
+    Return the callable producing ``field.to_representation(value)`` for database values
+    of ``model_field``, or ``None`` when the database value is already the representation.
+    """
+    if type(field) in IDENTITY_FIELDS:
+        return None
+
+    if type(field) is serializers.DecimalField:
+        coerce_to_string = getattr(field, 'coerce_to_string', api_settings.COERCE_DECIMAL_TO_STRING)
+        # The backends already quantize to the column scale, leaving only the string formatting
+        if (coerce_to_string and not field.localize and not field.normalize_output and
+                field.decimal_places == getattr(model_field, 'decimal_places', None)):
+            return '{:f}'.format
+
+    if type(field) is serializers.DateField:
+        if str(getattr(field, 'format', api_settings.DATE_FORMAT)).lower() == ISO_8601:
+            return date.isoformat
+
+    if type(field) is serializers.DateTimeField:
+        if (str(getattr(field, 'format', api_settings.DATETIME_FORMAT)).lower() == ISO_8601 and
+                not hasattr(field, 'timezone')):
+            return DateTimeFormatter()
+
+    if type(field) is serializers.ChoiceField:
+        choices = field.choice_strings_to_values
+        return lambda value: choices.get(str(value), value)
+
+    return field.to_representation
+
+
+class DateTimeFormatter:
+    """
+    ISO 8601 output of ``DateTimeField``, the active timezone is resolved once per
+    batch of rows rather than once per value.
+    """
+
+    def bind(self, current_timezone):
+        def to_representation(value):
+            # Mirrors ``DateTimeField.enforce_timezone`` for aware values read with ``USE_TZ``
+            if value.tzinfo is not None:
+                value = value.astimezone(current_timezone)
+            value = value.isoformat()
+            if value.endswith('+00:00'):
+                value = value[:-6] + 'Z'
+            return value
+        return to_representation
+
+
+class ValuesPlan:
+    """
+    Precompiled field/formatter plan that turns ``values_list()`` rows into the exact
+    dictionaries a ``ModelSerializer`` would produce, without a serializer per row.
+    """
+    _plans = {}
+
+    def __init__(self, names, columns, formatters):
+        self.names = tuple(names)
+        self.columns = tuple(columns)
+        self.formatters = tuple(formatters)
+
+    @classmethod
+    def for_serializer(cls, serializer_class):
+        # Plans are compiled once per serializer class, ``None`` marks unsupported serializers
+        if serializer_class not in cls._plans:
+            cls._plans[serializer_class] = cls.compile(serializer_class)
+        return cls._plans[serializer_class]
+
+    @classmethod
+    def compile(cls, serializer_class):
+        if not issubclass(serializer_class, serializers.ModelSerializer):
+            return None
+
+        serializer = serializer_class()
+        model_fields = {field.name: field for field in serializer.Meta.model._meta.concrete_fields}
+        names, columns, formatters = [], [], []
+
+        for field in serializer._readable_fields:
+            # Only plain model columns can be read straight from the database
+            if isinstance(field, (serializers.BaseSerializer, serializers.SerializerMethodField, ManyRelatedField)):
+                return None
+            if len(field.source_attrs) != 1 or field.source_attrs[0] not in model_fields:
+                return None
+            if isinstance(field, serializers.RelatedField) and (
+                    not isinstance(field, serializers.PrimaryKeyRelatedField) or field.pk_field is not None):
+                return None
+
+            formatter = get_formatter(field, model_fields[field.source_attrs[0]])
+            if formatter is not None:
+                formatters.append((len(names), formatter))
+            names.append(field.field_name)
+            columns.append(field.source_attrs[0])
+
+        return cls(names=names, columns=columns, formatters=formatters)
+
+    def to_representation(self, rows):
+        return list(self.iter_representation(rows))
+
+    def iter_representation(self, rows):
+        names = self.names
+        current_timezone = timezone.get_current_timezone()
+        formatters = [
+            (index, formatter.bind(current_timezone) if isinstance(formatter, DateTimeFormatter) else formatter)
+            for index, formatter in self.formatters
+        ]
+        for row in rows:
+            if formatters:
+                row = list(row)
+                for index, formatter in formatters:
+                    value = row[index]
+                    # Same as the serializer, ``None`` never reaches the field
+                    if value is not None:
+                        row[index] = formatter(value)
+            yield dict(zip(names, row))
@@ -0,0 +1,145 @@
+import base64
+import binascii
+from math import ceil
+
+from asgiref.sync import sync_to_async
+from django.http import HttpResponse
+from django.views import View
+from django.views.decorators.csrf import csrf_exempt
+from django.contrib.auth import aauthenticate, get_user_model
+
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import replace_query_param, remove_query_param
+
+from core.api.values import ValuesPlan
+from core.middleware import timed
+
+
+class AsyncReadOnlyAPIView(View):
+    """
+    Answer the plain JSON ``GET`` of a DRF endpoint with the async ORM, so no worker
+    thread is held while the database answers under ASGI. Every other request, writes,
+    other media types, ``fallback_params`` and every error response, is handed to the
+    synchronous ``fallback_view`` so both paths behave the same.
+    """
+    fallback_view = None
+    fallback_params: tuple = ('format',)
+    permission_classes: tuple = ()
+    queryset = None
+    serializer_class = None
+    json_media_types: tuple = ('*/*', 'application/*', 'application/json')
+
+    @classmethod
+    def as_view(cls, **initkwargs):
+        # Writes are delegated to DRF views, which handle CSRF themselves
+        return csrf_exempt(super().as_view(**initkwargs))
+
+    async def dispatch(self, request, *args, **kwargs):
+        if request.method == 'GET' and self.is_plain_json_request(request):
+            user = await self.authenticate(request)
+            if user is not None:
+                request.user = user
+                if self.has_permission(request):
+                    response = await self.get(request, *args, **kwargs)
+                    if response is not None:
+                        return response
+        return await self.fallback(request, *args, **kwargs)
+
+    def get_queryset(self):
+        assert self.queryset is not None, (
+            f"'{self.__class__.__name__}' should either include a `queryset` attribute, "
+            "or override the `get_queryset()` method."
+        )
+        # A fresh queryset per request, the class attribute caches its results otherwise
+        return self.queryset.all()
+
+    async def fallback(self, request, *args, **kwargs):
+        # Read from the class, a function attribute would be bound to the view instance
+        fallback_view = type(self).fallback_view
+        return await sync_to_async(fallback_view)(request, *args, **kwargs)
+
+    def is_plain_json_request(self, request) -> bool:
+        if any(param in request.GET for param in self.fallback_params):
+            return False
+        # Only the compact JSON output, indented or browsable responses go through DRF
+        media_type = request.headers.get('Accept', '*/*').split(',')[0].strip()
+        return media_type in self.json_media_types
+
+    async def authenticate(self, request):
+        # Same credentials parsing as ``BasicAuthentication``, failures are answered by DRF
+        auth = request.headers.get('Authorization', '').split()
+        if len(auth) != 2 or auth[0].lower() != 'basic':
+            return None
+        try:
+            userid, password = base64.b64decode(auth[1]).decode('utf-8').split(':', 1)
+        except (TypeError, ValueError, UnicodeDecodeError, binascii.Error):
+            return None
+
+        credentials = {get_user_model().USERNAME_FIELD: userid, 'password': password}
+        with timed('auth'):
+            user = await aauthenticate(request=request, **credentials)
+        if user is None or not user.is_active:
+            return None
+        return user
+
+    def has_permission(self, request) -> bool:
+        return all(permission().has_permission(request, self) for permission in self.permission_classes)
+
+    def render(self, data):
+        renderer = api_settings.DEFAULT_RENDERER_CLASSES[0]()
+        response = HttpResponse(renderer.render(data), content_type=renderer.media_type)
+        response['Vary'] = 'Accept'
+        return response
+
+
+class AsyncListAPIView(AsyncReadOnlyAPIView):
+    """
+    Page number paginated list rendered through the serializer ``ValuesPlan``, with the
+    same body as ``PageNumberPagination`` over ``ValuesListModelMixin``.
+    """
+    page_size = api_settings.PAGE_SIZE
+
+    def get_page_link(self, request, page_number):
+        url = request.build_absolute_uri()
+        if page_number == 1:
+            return remove_query_param(url, 'page')
+        return replace_query_param(url, 'page', page_number)
+
+    async def get(self, request, *args, **kwargs):
+        try:
+            page_number = int(request.GET.get('page', 1))
+        except ValueError:
+            return None
+
+        queryset = self.get_queryset()
+        count = await queryset.acount()
+        page_count = max(ceil(count / self.page_size), 1)
+        if not 1 <= page_number <= page_count:
+            return None
+
+        plan = ValuesPlan.for_serializer(self.serializer_class)
+        offset = (page_number - 1) * self.page_size
+        # ``aiterator()`` runs ``values_list()`` queries on the event loop thread (Django 5.1),
+        # iterating the queryset fetches the page in one ``sync_to_async`` call instead
+        rows = [row async for row in queryset.values_list(*plan.columns)[offset:offset + self.page_size]]
+        return self.render({
+            'count': count,
+            'next': self.get_page_link(request, page_number + 1) if page_number < page_count else None,
+            'previous': self.get_page_link(request, page_number - 1) if page_number > 1 else None,
+            'results': plan.to_representation(rows),
+        })
+
+
+class AsyncRetrieveAPIView(AsyncReadOnlyAPIView):
+    """
+    Single object rendered through the serializer ``ValuesPlan``, looked up by ``pk``.
+    """
+
+    async def get(self, request, *args, **kwargs):
+        plan = ValuesPlan.for_serializer(self.serializer_class)
+        queryset = self.get_queryset()
+        try:
+            row = await queryset.values_list(*plan.columns).aget(pk=kwargs['pk'])
+        except queryset.model.DoesNotExist:
+            return None
+        return self.render(plan.to_representation([row])[0])
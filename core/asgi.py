@@ -3,14 +3,40 @@ ASGI config for core project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
 
+Requests are resolved against ``core.urls_asgi``, which serves the hot read endpoints
+with async views. With ``API_MIDDLEWARE`` set, API requests skip the browser middleware,
+see ``core.handlers``. Run it with an ASGI server, e.g. ``uvicorn core.asgi:application``.
+
 For more information on this file, see
 https://docs.djangoproject.com/en/5.1/howto/deployment/asgi/
 """
 
 import os
 
-from django.core.asgi import get_asgi_application
+import django
+from django.conf import settings
+from django.core.handlers.asgi import ASGIHandler, ASGIRequest
+
+from core.handlers import APIMiddlewareMixin, ASGIPathRouter
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'core.settings')
 
-application = get_asgi_application()
+django.setup(set_prefix=False)
+
+
+class AsyncAPIRequest(ASGIRequest):
+    urlconf = 'core.urls_asgi'
+
+
+class AsyncAPIHandler(ASGIHandler):
+    request_class = AsyncAPIRequest
+
+
+class AsyncAPIMiddlewareHandler(APIMiddlewareMixin, AsyncAPIHandler):
+    pass
+
+
+application = AsyncAPIHandler()
+
+if settings.API_MIDDLEWARE is not None:
+    application = ASGIPathRouter(site=application, api=AsyncAPIMiddlewareHandler())
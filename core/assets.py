@@ -0,0 +1,115 @@
+"""
+Static files fingerprinted and compressed once by ``collectstatic``, then served from
+``STATIC_ROOT`` without any work left per request.
+
+``CompressedManifestStaticFilesStorage`` names each file after its content and writes
+``.gz`` and ``.br`` copies of the text files next to it, the ``.br`` ones with the
+``brotli`` package of the requirements, skipped where it is missing. ``serve_static``
+answers with the smallest copy the client accepts, and with a year of ``immutable``
+caching for fingerprinted names, since any change to their content ships under a new
+name.
+"""
+import re
+import gzip
+import mimetypes
+import posixpath
+from functools import lru_cache
+from pathlib import Path
+
+from django.conf import settings
+from django.http import FileResponse, Http404, HttpResponseNotModified
+from django.utils._os import safe_join
+from django.utils.cache import patch_vary_headers
+from django.utils.http import http_date
+from django.views.static import was_modified_since
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage, staticfiles_storage
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+
+# Files worth compressing, images and fonts already are
+COMPRESSED_EXTENSIONS = ('.js', '.mjs', '.css', '.html', '.svg', '.json', '.map', '.txt', '.xml', '.ico')
+# Compressed copies kept only when at least this much smaller
+MIN_COMPRESSION_RATIO = 0.95
+# Preferred first, by ``Accept-Encoding`` token
+ENCODINGS = (('br', '.br'), ('gzip', '.gz'))
+
+# Vite names its chunks after their content, and the chunks import each other by those names
+BUNDLER_HASH = re.compile(r'-[A-Za-z0-9_-]{8}\.(?:js|css)$')
+
+IMMUTABLE_CACHE_CONTROL = 'public, max-age=31536000, immutable'
+
+
+def compress(path):
+    data = path.read_bytes()
+    variants = [('.gz', lambda: gzip.compress(data, compresslevel=9, mtime=0))]
+    if brotli is not None:
+        variants.append(('.br', lambda: brotli.compress(data)))
+    for suffix, compressor in variants:
+        compressed = compressor()
+        if len(compressed) < len(data) * MIN_COMPRESSION_RATIO:
+            path.with_name(path.name + suffix).write_bytes(compressed)
+
+
+class CompressedManifestStaticFilesStorage(ManifestStaticFilesStorage):
+    """
+    ``ManifestStaticFilesStorage`` also writing compressed copies of the collected files
+    """
+    # Templates naming a file missing from the manifest get its plain URL instead of an error
+    manifest_strict = False
+
+    def post_process(self, paths, dry_run=False, **options):
+        compressed = set()
+        for name, hashed_name, processed in super().post_process(paths, dry_run, **options):
+            if not dry_run and not isinstance(processed, Exception):
+                # Both copies are served, the fingerprinted one and the original name
+                for path in {name, hashed_name} - compressed - {None}:
+                    if path.endswith(COMPRESSED_EXTENSIONS):
+                        compress(Path(self.path(path)))
+                        compressed.add(path)
+            yield name, hashed_name, processed
+
+
+@lru_cache
+def get_hashed_names():
+    # Fingerprinted names of the manifest, empty with a storage not keeping one
+    return frozenset(getattr(staticfiles_storage, 'hashed_files', {}).values())
+
+
+def is_immutable(name) -> bool:
+    return name in get_hashed_names() or BUNDLER_HASH.search(name) is not None
+
+
+def serve_static(request, path):
+    name = posixpath.normpath(path).lstrip('/')
+    try:
+        fullpath = Path(safe_join(settings.STATIC_ROOT, name))
+    except ValueError:
+        raise Http404
+    if not fullpath.is_file():
+        raise Http404
+
+    mtime = fullpath.stat().st_mtime
+    if not was_modified_since(request.META.get('HTTP_IF_MODIFIED_SINCE'), mtime):
+        return HttpResponseNotModified()
+
+    accepted = {token.split(';')[0].strip() for token in request.headers.get('Accept-Encoding', '').split(',')}
+    encoding, served = None, fullpath
+    for candidate, suffix in ENCODINGS:
+        variant = fullpath.with_name(fullpath.name + suffix)
+        if candidate in accepted and variant.is_file():
+            encoding, served = candidate, variant
+            break
+
+    content_type, _ = mimetypes.guess_type(fullpath.name)
+    response = FileResponse(served.open('rb'), content_type=content_type or 'application/octet-stream',
+                            filename=fullpath.name)
+    if encoding:
+        response['Content-Encoding'] = encoding
+    response['Last-Modified'] = http_date(mtime)
+    response['Cache-Control'] = IMMUTABLE_CACHE_CONTROL if is_immutable(name) else 'no-cache'
+    patch_vary_headers(response, ['Accept-Encoding'])
+    return response
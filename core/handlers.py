@@ -0,0 +1,114 @@
+"""
+Serve the ``API_PREFIX`` paths through the ``API_MIDDLEWARE`` chain and every other path
+through ``MIDDLEWARE``. The API authenticates each request itself and has no use for the
+sessions, CSRF, auth and messages middleware the admin and the front end need.
+
+``core.wsgi`` and ``core.asgi`` route requests this way when ``API_MIDDLEWARE`` is set.
+"""
+import logging
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured, MiddlewareNotUsed
+from django.core.handlers.exception import convert_exception_to_response
+from django.core.handlers.wsgi import WSGIHandler
+from django.utils.module_loading import import_string
+
+logger = logging.getLogger('django.request')
+
+
+class APIMiddlewareMixin:
+    """
+    Handler loading ``API_MIDDLEWARE`` in place of ``MIDDLEWARE``.
+
+    ``BaseHandler.load_middleware`` of Django 5.1 iterates ``settings.MIDDLEWARE``, its
+    loop is repeated here over the chain of ``get_middleware`` so the settings, shared by
+    every thread, are never changed.
+    """
+
+    def get_middleware(self):
+        return settings.API_MIDDLEWARE
+
+    def load_middleware(self, is_async=False):
+        self._view_middleware = []
+        self._template_response_middleware = []
+        self._exception_middleware = []
+
+        get_response = self._get_response_async if is_async else self._get_response
+        handler = convert_exception_to_response(get_response)
+        handler_is_async = is_async
+        for middleware_path in reversed(self.get_middleware()):
+            middleware = import_string(middleware_path)
+            middleware_can_sync = getattr(middleware, 'sync_capable', True)
+            middleware_can_async = getattr(middleware, 'async_capable', False)
+            if not middleware_can_sync and not middleware_can_async:
+                raise RuntimeError(
+                    f'Middleware {middleware_path} must have at least one of sync_capable/async_capable set to True.'
+                )
+            elif not handler_is_async and middleware_can_sync:
+                middleware_is_async = False
+            else:
+                middleware_is_async = middleware_can_async
+            try:
+                adapted_handler = self.adapt_method_mode(
+                    middleware_is_async, handler, handler_is_async, debug=settings.DEBUG,
+                    name=f'middleware {middleware_path}'
+                )
+                mw_instance = middleware(adapted_handler)
+            except MiddlewareNotUsed as exc:
+                if settings.DEBUG:
+                    logger.debug('MiddlewareNotUsed(%r): %s', middleware_path, exc)
+                continue
+            handler = adapted_handler
+
+            if mw_instance is None:
+                raise ImproperlyConfigured(f'Middleware factory {middleware_path} returned None.')
+
+            if hasattr(mw_instance, 'process_view'):
+                self._view_middleware.insert(0, self.adapt_method_mode(is_async, mw_instance.process_view))
+            if hasattr(mw_instance, 'process_template_response'):
+                self._template_response_middleware.append(
+                    self.adapt_method_mode(is_async, mw_instance.process_template_response)
+                )
+            if hasattr(mw_instance, 'process_exception'):
+                # Exception middleware always runs synchronously
+                self._exception_middleware.append(self.adapt_method_mode(False, mw_instance.process_exception))
+
+            handler = convert_exception_to_response(mw_instance)
+            handler_is_async = middleware_is_async
+
+        # Set last, a chain in place tells the handler is ready
+        self._middleware_chain = self.adapt_method_mode(is_async, handler, handler_is_async)
+
+
+class APIWSGIHandler(APIMiddlewareMixin, WSGIHandler):
+    pass
+
+
+class WSGIPathRouter:
+    """
+    WSGI application handing ``API_PREFIX`` paths to ``api`` and the others to ``site``
+    """
+
+    def __init__(self, site, api):
+        self.site = site
+        self.api = api
+
+    def __call__(self, environ, start_response):
+        handler = self.api if environ.get('PATH_INFO', '').startswith(settings.API_PREFIX) else self.site
+        return handler(environ, start_response)
+
+
+class ASGIPathRouter:
+    """
+    ASGI application handing ``API_PREFIX`` paths to ``api`` and the others to ``site``
+    """
+
+    def __init__(self, site, api):
+        self.site = site
+        self.api = api
+
+    async def __call__(self, scope, receive, send):
+        # Same path info as ``ASGIRequest``, without the prefix the app is mounted under
+        path = scope.get('path', '').removeprefix(scope.get('root_path', ''))
+        handler = self.api if path.startswith(settings.API_PREFIX) else self.site
+        return await handler(scope, receive, send)
@@ -0,0 +1,15 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from core.schema import write_schema
+
+
+class Command(BaseCommand):
+    help = 'Generate the OpenAPI schema as JSON and YAML files, served by the schema views without introspection.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--directory', help='Where to write the files, SCHEMA_DIR by default')
+
+    def handle(self, *args, **options):
+        for path in write_schema(options['directory'] or settings.SCHEMA_DIR):
+            self.stdout.write(self.style.SUCCESS(f'Wrote {path}'))
@@ -0,0 +1,83 @@
+"""
+Prometheus metrics of the API, served at ``/metrics``.
+
+Request metrics are recorded by ``core.middleware.MetricsMiddleware``. Under a server
+running several worker processes, set ``PROMETHEUS_MULTIPROC_DIR`` to an empty
+directory shared by the workers: each one writes its samples to memory mapped files
+there and a scrape of any worker aggregates them all. The ``METRICS_COLLECTORS`` add
+gauges collected at scrape time, like ``loans.metrics.LoanBookCollector``.
+"""
+import os
+import time
+from functools import lru_cache
+
+from django.conf import settings
+from django.http import HttpResponse, Http404
+from django.utils.crypto import constant_time_compare
+from django.utils.module_loading import import_string
+
+try:
+    import prometheus_client
+    from prometheus_client import multiprocess
+except ImportError:
+    prometheus_client = None
+
+
+# Query counts per request, the last bucket takes the N+1 loops
+QUERY_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, float('inf'))
+
+if prometheus_client is not None:
+    # Not registered globally, ``get_registry`` collects them or their multiprocess files
+    REQUESTS = prometheus_client.Counter(
+        'blink_http_requests', 'Requests handled, by URL name, viewset action, method and status',
+        ['view', 'action', 'method', 'status'], registry=None
+    )
+    LATENCY = prometheus_client.Histogram(
+        'blink_http_request_duration_seconds', 'Request latency, by URL name and viewset action',
+        ['view', 'action'], registry=None
+    )
+    QUERIES = prometheus_client.Histogram(
+        'blink_http_request_queries', 'Database queries per request, by URL name and viewset action',
+        ['view', 'action'], buckets=QUERY_BUCKETS, registry=None
+    )
+
+
+def observe_request(request, response, timings):
+    resolver_match = getattr(request, 'resolver_match', None)
+    view = resolver_match.view_name if resolver_match else ''
+    action = timings.action or ''
+    REQUESTS.labels(view, action, request.method, str(response.status_code)).inc()
+    LATENCY.labels(view, action).observe(time.perf_counter() - timings.started)
+    QUERIES.labels(view, action).observe(timings.queries)
+
+
+@lru_cache(maxsize=None)
+def get_collectors():
+    return [import_string(path)() for path in settings.METRICS_COLLECTORS]
+
+
+def get_registry():
+    registry = prometheus_client.CollectorRegistry(auto_describe=True)
+    if os.environ.get('PROMETHEUS_MULTIPROC_DIR'):
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        for metric in (REQUESTS, LATENCY, QUERIES):
+            registry.register(metric)
+    for collector in get_collectors():
+        registry.register(collector)
+    return registry
+
+
+def is_authorized(request) -> bool:
+    if not settings.METRICS_TOKEN:
+        return settings.DEBUG
+    scheme, _, token = request.headers.get('Authorization', '').partition(' ')
+    return scheme.lower() == 'bearer' and constant_time_compare(token, settings.METRICS_TOKEN)
+
+
+def metrics_view(request):
+    # Unknown to anyone but the scraper, like an unrouted path
+    if not settings.METRICS_ENABLED or not is_authorized(request):
+        raise Http404
+    return HttpResponse(prometheus_client.generate_latest(get_registry()),
+                        content_type=prometheus_client.CONTENT_TYPE_LATEST)
@@ -0,0 +1,253 @@
+import time
+import logging
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.db import connections
+from django.core.exceptions import MiddlewareNotUsed
+
+from core.metrics import observe_request
+from core.profiling import RequestProfile, is_profiling_allowed, is_profiling_requested
+
+
+logger = logging.getLogger('core.timing')
+
+# Timings of the request being handled, ``None`` outside of ``ServerTimingMiddleware``
+current_timings = ContextVar('current_timings', default=None)
+
+
+class RequestTimings:
+    """
+    Durations in seconds of one request, by ``Server-Timing`` metric name, and the
+    number of queries it ran
+    """
+
+    def __init__(self, request):
+        self.started = time.perf_counter()
+        self.method = request.method
+        self.path = request.path
+        self.durations = {}
+        self.queries = 0
+        self.view = None
+        self.action = None
+
+    def add(self, name, seconds):
+        self.durations[name] = self.durations.get(name, 0) + seconds
+
+    def get_header(self):
+        metrics = []
+        for name, seconds in self.durations.items():
+            description = f';desc="{self.queries} queries"' if name == 'db' else ''
+            metrics.append(f'{name};dur={seconds * 1000:.2f}{description}')
+        return ', '.join(metrics)
+
+
+def record_query(execute, sql, params, many, context):
+    timings = current_timings.get()
+    if timings is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        timings.add('db', time.perf_counter() - started)
+        timings.queries += 1
+
+
+def install_query_timer():
+    # Connections belong to a thread, the async ORM runs its queries in the thread sensitive
+    # worker. The wrapper stays installed, outside of a timed request it only reads the context.
+    for alias in connections:
+        wrappers = connections[alias].execute_wrappers
+        if record_query not in wrappers:
+            wrappers.insert(0, record_query)
+
+
+@contextmanager
+def timed(name):
+    """
+    Add the time spent in the block to the ``name`` metric of the current request
+    """
+    timings = current_timings.get()
+    if timings is None:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings.add(name, time.perf_counter() - started)
+
+
+class RequestTimingMiddleware:
+    """
+    Time each request into the ``RequestTimings`` of the context, shared with any outer
+    timing middleware, and hand them to ``finish`` with the response. Dropped from the
+    chain unless its ``enabled_setting`` is on.
+
+    On its own it only sets up the context, which tags the statements logged by
+    ``core.slow_queries`` with the view, action and path of their request.
+    """
+    sync_capable = True
+    async_capable = True
+    enabled_setting = 'SLOW_QUERY_THRESHOLD'
+
+    def __init__(self, get_response):
+        if not getattr(settings, self.enabled_setting):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        timings = current_timings.get()
+        if timings is not None:
+            return self.finish(request, self.get_response(request), timings)
+
+        install_query_timer()
+        timings = RequestTimings(request)
+        token = current_timings.set(timings)
+        try:
+            response = self.get_response(request)
+        finally:
+            current_timings.reset(token)
+        return self.finish(request, response, timings)
+
+    async def __acall__(self, request):
+        timings = current_timings.get()
+        if timings is not None:
+            return self.finish(request, await self.get_response(request), timings)
+
+        await sync_to_async(install_query_timer)()
+        timings = RequestTimings(request)
+        token = current_timings.set(timings)
+        try:
+            response = await self.get_response(request)
+        finally:
+            current_timings.reset(token)
+        return self.finish(request, response, timings)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        timings = current_timings.get()
+        if timings is None:
+            return None
+        # DRF views carry their class, viewsets also the action of each method
+        view_class = getattr(view_func, 'cls', None) or getattr(view_func, 'view_class', None)
+        timings.view = view_class.__name__ if view_class else view_func.__qualname__
+        actions = getattr(view_func, 'actions', None) or {}
+        timings.action = actions.get(request.method.lower())
+        return None
+
+    def finish(self, request, response, timings):
+        # Hook of the middlewares reporting the timings, the context alone needs nothing more
+        return response
+
+
+class ServerTimingMiddleware(RequestTimingMiddleware):
+    """
+    Report where the time of each request went: ``total``, ``db`` with the query count,
+    ``auth`` and ``render``, as a ``Server-Timing`` header and one ``core.timing`` log
+    line tagged with the view and action. Authentication is timed by
+    ``core.api.authentication.TimedBasicAuthentication``.
+
+    Enabled by the ``SERVER_TIMING`` setting, otherwise Django drops it from the chain.
+    """
+    enabled_setting = 'SERVER_TIMING'
+
+    def process_template_response(self, request, response):
+        timings = current_timings.get()
+        if timings is None:
+            return response
+        started = time.perf_counter()
+        response.add_post_render_callback(lambda response: timings.add('render', time.perf_counter() - started))
+        return response
+
+    def finish(self, request, response, timings):
+        total = time.perf_counter() - timings.started
+        timings.durations = {'total': total, **timings.durations}
+        response['Server-Timing'] = timings.get_header()
+
+        durations = {f'{name}_ms': round(seconds * 1000, 2) for name, seconds in timings.durations.items()}
+        fields = {
+            'method': request.method,
+            'path': request.path,
+            'status': response.status_code,
+            'view': timings.view,
+            'action': timings.action,
+            **durations,
+            'queries': timings.queries,
+        }
+        logger.info(' '.join(f'{key}={value}' for key, value in fields.items()), extra={'timing': fields})
+        return response
+
+
+class MetricsMiddleware(RequestTimingMiddleware):
+    """
+    Count each request and observe its latency and query count in the Prometheus
+    metrics of ``core.metrics``, labelled with the URL name and the viewset action.
+
+    Enabled by the ``METRICS_ENABLED`` setting, on when ``prometheus_client`` is installed.
+    """
+    enabled_setting = 'METRICS_ENABLED'
+
+    def finish(self, request, response, timings):
+        observe_request(request, response, timings)
+        return response
+
+
+class ProfilingMiddleware:
+    """
+    Run a request carrying ``?profile=1`` or ``X-Profile: 1`` under cProfile and a stack
+    sampler, see ``core.profiling``, when its Basic credentials or session belong to a
+    staff user. Those are checked before the profiler starts, any other request runs
+    unprofiled. The profile is named in the ``X-Profile`` response header. Under ASGI
+    the event loop thread and the worker thread running the sync views are profiled.
+
+    Enabled by the ``PROFILING_ENABLED`` setting, otherwise Django drops it from the chain.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not settings.PROFILING_ENABLED:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        if not (is_profiling_requested(request) and is_profiling_allowed(request)):
+            return self.get_response(request)
+
+        profile = RequestProfile()
+        profile.start()
+        try:
+            response = self.get_response(request)
+        finally:
+            profile.stop()
+        return self.finish(request, response, profile)
+
+    async def __acall__(self, request):
+        if not (is_profiling_requested(request) and await sync_to_async(is_profiling_allowed)(request)):
+            return await self.get_response(request)
+
+        # Thread sensitive, like the sync views of the request, so both run in the same worker thread
+        profile = RequestProfile()
+        profile.start()
+        await sync_to_async(profile.start)()
+        try:
+            response = await self.get_response(request)
+        finally:
+            await sync_to_async(profile.stop)()
+            profile.stop()
+        return self.finish(request, response, profile)
+
+    def finish(self, request, response, profile):
+        response['X-Profile'] = profile.save(request)
+        return response
@@ -0,0 +1,130 @@
+"""
+Profile single requests on demand, see ``ProfilingMiddleware``.
+
+Each profiled request leaves two files in ``PROFILING_DIR``: ``<name>.pstats`` from
+cProfile, readable with ``python -m pstats`` or snakeviz, and ``<name>.collapsed`` with
+the sampled stacks in the ``frame;frame;frame count`` format of flamegraph.pl and
+speedscope.
+"""
+import re
+import sys
+import pstats
+import cProfile
+import threading
+from collections import Counter
+from importlib import import_module
+from pathlib import Path
+from types import SimpleNamespace
+
+from django.conf import settings
+from django.contrib.auth import get_user
+from django.utils import timezone
+
+from rest_framework.authentication import BasicAuthentication
+from rest_framework.exceptions import AuthenticationFailed
+
+
+class StackSampler:
+    """
+    Sample the stacks of the threads in ``thread_ids`` every ``interval`` seconds from a
+    thread of its own
+    """
+
+    def __init__(self, interval):
+        self.interval = interval
+        self.thread_ids = set()
+        self.stacks = Counter()
+        self.stopped = threading.Event()
+        self.thread = threading.Thread(target=self.run, daemon=True)
+
+    def start(self):
+        self.thread.start()
+
+    def stop(self):
+        self.stopped.set()
+        self.thread.join()
+
+    def run(self):
+        while not self.stopped.wait(self.interval):
+            frames = sys._current_frames()
+            for thread_id in tuple(self.thread_ids):
+                frame = frames.get(thread_id)
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(f'{code.co_name} ({code.co_filename}:{code.co_firstlineno})')
+                    frame = frame.f_back
+                if stack:
+                    self.stacks[';'.join(reversed(stack))] += 1
+
+    def write(self, path):
+        with open(path, 'w') as file:
+            for stack, count in self.stacks.most_common():
+                file.write(f'{stack} {count}\n')
+
+
+class RequestProfile:
+    """
+    cProfile and a stack sampler over the threads running a request. Each thread joins
+    with ``start`` and leaves with ``stop``, called from that thread: under ASGI the event
+    loop runs the async code and a worker thread the sync middleware and views.
+    """
+
+    def __init__(self):
+        self.profilers = {}
+        self.sampler = StackSampler(settings.PROFILING_SAMPLE_INTERVAL)
+
+    def start(self):
+        thread_id = threading.get_ident()
+        self.profilers[thread_id] = profiler = cProfile.Profile()
+        if not self.sampler.thread_ids:
+            self.sampler.start()
+        self.sampler.thread_ids.add(thread_id)
+        profiler.enable()
+
+    def stop(self):
+        thread_id = threading.get_ident()
+        self.profilers[thread_id].disable()
+        self.sampler.thread_ids.discard(thread_id)
+        if not self.sampler.thread_ids:
+            self.sampler.stop()
+
+    def save(self, request):
+        directory = Path(settings.PROFILING_DIR)
+        directory.mkdir(parents=True, exist_ok=True)
+        path = re.sub(r'[^\w-]+', '-', request.path).strip('-') or 'root'
+        name = f'{timezone.now():%Y%m%dT%H%M%S%f}-{request.method.lower()}-{path}'[:200]
+        pstats.Stats(*self.profilers.values()).dump_stats(directory / f'{name}.pstats')
+        self.sampler.write(directory / f'{name}.collapsed')
+        return name
+
+
+def is_profiling_requested(request) -> bool:
+    return request.GET.get('profile') == '1' or request.headers.get('X-Profile') == '1'
+
+
+def get_request_user(request):
+    """
+    User of the Basic credentials or the session cookie of ``request``, read before the
+    authentication middleware and the views have run. The Basic credentials checked here
+    are kept on the request for ``TimedBasicAuthentication``.
+    """
+    try:
+        authenticated = BasicAuthentication().authenticate(request)
+    except AuthenticationFailed:
+        return None
+    if authenticated is not None:
+        request.basic_authentication = authenticated
+        return authenticated[0]
+
+    session_key = request.COOKIES.get(settings.SESSION_COOKIE_NAME)
+    if session_key is None:
+        return None
+    session = import_module(settings.SESSION_ENGINE).SessionStore(session_key)
+    return get_user(SimpleNamespace(session=session))
+
+
+def is_profiling_allowed(request) -> bool:
+    # Checked before the profiler starts, nobody but staff can make the server profile a request
+    user = get_request_user(request)
+    return bool(user is not None and user.is_authenticated and user.is_staff)
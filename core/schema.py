@@ -0,0 +1,93 @@
+"""
+OpenAPI schema built once at deploy time by ``manage.py build_schema`` instead of on
+every hit of the docs.
+
+The views serve ``schema.json`` and ``schema.yaml`` from ``SCHEMA_DIR``, read once per
+process and answered with an ``ETag`` so Swagger and Redoc reloads revalidate with a
+304. Without the files the schema is generated on the first hit and kept in memory.
+Under ``DEBUG``, and for the ``lang`` and ``version`` parameters, it is still generated
+live by drf-spectacular so it follows the code being edited.
+"""
+from functools import lru_cache
+from pathlib import Path
+
+from django.conf import settings
+from django.utils import translation
+
+from rest_framework.authentication import SessionAuthentication
+from drf_spectacular.renderers import OpenApiJsonRenderer, OpenApiJsonRenderer2, OpenApiYamlRenderer, \
+    OpenApiYamlRenderer2
+from drf_spectacular.settings import spectacular_settings
+from drf_spectacular.utils import extend_schema
+from drf_spectacular.views import SCHEMA_KWARGS, SpectacularAPIView
+
+from core.api.authentication import TimedBasicAuthentication
+from core.utils import get_etag, get_etag_response
+
+
+# Renderer of each artifact, by file extension
+SCHEMA_RENDERERS = {'json': OpenApiJsonRenderer, 'yaml': OpenApiYamlRenderer}
+
+
+def generate_schema():
+    generator = spectacular_settings.DEFAULT_GENERATOR_CLASS()
+    with translation.override(settings.LANGUAGE_CODE):
+        return generator.get_schema(request=None, public=spectacular_settings.SERVE_PUBLIC)
+
+
+def render_schema(schema, format) -> bytes:
+    return SCHEMA_RENDERERS[format]().render(schema, renderer_context={})
+
+
+def write_schema(directory) -> list:
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    schema = generate_schema()
+    paths = []
+    for format in SCHEMA_RENDERERS:
+        path = directory / f'schema.{format}'
+        path.write_bytes(render_schema(schema, format))
+        paths.append(path)
+    return paths
+
+
+@lru_cache
+def get_schema(format):
+    """
+    Content of the schema in ``format`` and its ``ETag``, from the artifact when it was built
+    """
+    try:
+        content = (Path(settings.SCHEMA_DIR) / f'schema.{format}').read_bytes()
+    except FileNotFoundError:
+        content = render_schema(generate_schema(), format)
+    return content, get_etag(content)
+
+
+class SchemaView(SpectacularAPIView):
+    """
+    ``SpectacularAPIView`` answering with the precomputed schema, see the module
+    """
+    # The API views authenticate with ``TimedBasicAuthentication``, one ``basicAuth`` scheme
+    authentication_classes = [SessionAuthentication, TimedBasicAuthentication]
+    # Parameters changing the schema itself, left to live generation
+    live_params = ('lang', 'version')
+
+    @extend_schema(**SCHEMA_KWARGS)
+    def get(self, request, *args, **kwargs):
+        if settings.DEBUG or any(param in request.GET for param in self.live_params):
+            return super().get(request, *args, **kwargs)
+
+        renderer, media_type = self.perform_content_negotiation(request)
+        content, etag = get_schema(renderer.format)
+        charset = f'; charset={renderer.charset}' if renderer.charset else ''
+        response = get_etag_response(request, content, etag, content_type=f'{media_type}{charset}')
+        response['Content-Disposition'] = f'inline; filename="{self._get_filename(request, None)}"'
+        return response
+
+
+class YAMLSchemaView(SchemaView):
+    renderer_classes = [OpenApiYamlRenderer, OpenApiYamlRenderer2]
+
+
+class JSONSchemaView(SchemaView):
+    renderer_classes = [OpenApiJsonRenderer, OpenApiJsonRenderer2]
@@ -11,6 +11,7 @@ https://docs.djangoproject.com/en/5.1/ref/settings/
 """
 import environ
 from pathlib import Path
+from importlib.util import find_spec
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -21,6 +22,14 @@ env = environ.Env(
     ALLOWED_HOSTS=(str, ''),
     CORS_ALLOW_ALL_ORIGINS=(bool, True),
     CORS_ALLOW_CREDENTIALS=(bool, True),
+    SERVER_TIMING=(bool, False),
+    METRICS_TOKEN=(str, ''),
+    SLOW_QUERY_THRESHOLD=(float, 0),
+    PROFILING_ENABLED=(bool, False),
+    PROFILING_DIR=(str, ''),
+    SCHEMA_DIR=(str, ''),
+    REDIS_URL=(str, ''),
+    CACHE_DIR=(str, ''),
 )
 environ.Env.read_env()
 # Quick-start development settings - unsuitable for production
@@ -48,11 +57,16 @@ INSTALLED_APPS = [
     'corsheaders',
     'rest_framework',
     'drf_spectacular',
+    'core',
     'accounts',
     'loans'
 ]
 
 MIDDLEWARE = [
+    'core.middleware.ProfilingMiddleware',
+    'core.middleware.ServerTimingMiddleware',
+    'core.middleware.MetricsMiddleware',
+    'core.middleware.RequestTimingMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -63,6 +77,12 @@ MIDDLEWARE = [
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
 
+# Paths served by the API views
+API_PREFIX = '/api/'
+
+# Leaner chain for API_PREFIX paths, see core.handlers, None runs MIDDLEWARE everywhere
+API_MIDDLEWARE = None
+
 ROOT_URLCONF = 'core.urls'
 
 TEMPLATES = [
@@ -93,6 +113,10 @@ DATABASES = {
         'NAME': BASE_DIR / "db.sqlite3",
     }
 }
+
+# PRAGMA statements run on each new SQLite connection, see core.signals
+SQLITE_PRAGMAS = {}
+
 # Password validation
 # https://docs.djangoproject.com/en/5.1/ref/settings/#auth-password-validators
 
@@ -145,18 +169,121 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 AUTH_USER_MODEL = 'accounts.User'
 
 
+# Cache
+# https://docs.djangoproject.com/en/5.1/topics/cache/
+
+# Shared by the worker processes with REDIS_URL or CACHE_DIR, otherwise kept in each process
+if env('REDIS_URL'):
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': env('REDIS_URL'),
+        }
+    }
+elif env('CACHE_DIR'):
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': env('CACHE_DIR'),
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'blink',
+        }
+    }
+
+# Seconds a precomputed customer dashboard stays cached, writes invalidate it earlier. A cache
+# per process misses the invalidations of the other workers, the dashboard is not cached there
+DASHBOARD_CACHE_TIMEOUT = 60 * 15 if env('REDIS_URL') or env('CACHE_DIR') else 0
+
+# Stored responses replayed for retried requests carrying an Idempotency-Key header
+IDEMPOTENCY_KEY_TIMEOUT = 60 * 60 * 24
+
+# Seconds a key stays reserved by a request still running, a retry takes over a key left by a crashed worker
+IDEMPOTENCY_KEY_LEASE = 60
+
+IDEMPOTENCY_KEY_PURGE_BATCH = 100
+
+# Server-Timing headers and a ``core.timing`` log line per request, see core.middleware
+SERVER_TIMING = env('SERVER_TIMING')
+
+# Prometheus metrics at /metrics, see core.metrics for the multiprocess setup
+METRICS_ENABLED = find_spec('prometheus_client') is not None
+
+# Bearer token of the scraper, without one /metrics is only served with DEBUG on
+METRICS_TOKEN = env('METRICS_TOKEN')
+
+# Loan book gauges refreshed by the refresh_loan_book_metrics command
+METRICS_COLLECTORS = ['loans.metrics.LoanBookCollector']
+
+# Statements slower than this many milliseconds are logged with their plan, 0 turns it off
+SLOW_QUERY_THRESHOLD = env('SLOW_QUERY_THRESHOLD')
+
+# Staff requests sent with ?profile=1 or X-Profile: 1 are profiled, see core.profiling
+PROFILING_ENABLED = env('PROFILING_ENABLED')
+
+# Where the profiles land, one .pstats and one .collapsed file per request
+PROFILING_DIR = env('PROFILING_DIR') or BASE_DIR / 'profiles'
+
+# Seconds between two stack samples of a profiled request
+PROFILING_SAMPLE_INTERVAL = 0.001
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {
+            'class': 'logging.StreamHandler',
+        },
+    },
+    'loggers': {
+        'core.timing': {
+            'handlers': ['console'],
+            'level': 'INFO',
+            'propagate': False,
+        },
+        'core.slow_queries': {
+            'handlers': ['console'],
+            'level': 'WARNING',
+            'propagate': False,
+        },
+    },
+}
+
+
 REST_FRAMEWORK = {
     'DEFAULT_SCHEMA_CLASS': 'drf_spectacular.openapi.AutoSchema',
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
-    'PAGE_SIZE': 10
+    'PAGE_SIZE': 10,
+    # orjson backed JSON, both classes fall back to the stdlib when it is not installed
+    'DEFAULT_RENDERER_CLASSES': [
+        'core.api.renderers.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+    'DEFAULT_PARSER_CLASSES': [
+        'core.api.parsers.FastJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ],
 }
 
+# MessagePack content negotiation for batch clients, see core.api.renderers.MessagePackRenderer
+if find_spec('msgpack'):
+    REST_FRAMEWORK['DEFAULT_RENDERER_CLASSES'].insert(1, 'core.api.renderers.MessagePackRenderer')
+    REST_FRAMEWORK['DEFAULT_PARSER_CLASSES'].insert(1, 'core.api.parsers.MessagePackParser')
+
 SPECTACULAR_SETTINGS = {
     'TITLE': 'Blink Loan',
     'DESCRIPTION': 'Funds & Loans with Blink',
     'VERSION': '1.0.0',
 }
 
+# Where manage.py build_schema writes the schema served by core.schema at deploy time
+SCHEMA_DIR = env('SCHEMA_DIR') or BASE_DIR / 'schema'
+
 CORS_ALLOW_ALL_ORIGINS = env('CORS_ALLOW_ALL_ORIGINS')
 CORS_ALLOW_CREDENTIALS = env('CORS_ALLOW_CREDENTIALS')
 CORS_ALLOW_METHODS = [
@@ -0,0 +1,87 @@
+"""
+Production settings, on top of ``core.settings``.
+
+    DJANGO_SETTINGS_MODULE=core.settings_production gunicorn core.wsgi
+
+Database connections outlive the request, a cache is shared by the worker processes,
+SQLite runs in WAL mode, API requests skip the browser middleware and static files are
+fingerprinted and compressed by ``collectstatic``. Compare the cost
+of a request under both profiles with ``python -m benchmarks.bench_settings``.
+"""
+import environ
+
+from core.settings import *  # noqa: F401,F403
+from core.settings import BASE_DIR, CACHES, DATABASES, MIDDLEWARE, TEMPLATES
+
+env = environ.Env(
+    CONN_MAX_AGE=(int, 600),
+)
+
+DEBUG = False
+
+# Seconds a connection is kept for the next requests of its thread, checked before reuse
+DATABASES = {
+    'default': {
+        **DATABASES['default'],
+        'CONN_MAX_AGE': env('CONN_MAX_AGE'),
+        'CONN_HEALTH_CHECKS': True,
+        'OPTIONS': {
+            # Writers take the lock when their transaction starts instead of failing to upgrade
+            'transaction_mode': 'IMMEDIATE',
+            'timeout': 20,
+        },
+    }
+}
+
+# Readers no longer block the writer, and commits only sync the WAL at checkpoints
+SQLITE_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+}
+
+# Shared by the workers, with a cache per process they would miss each other's invalidations
+if CACHES['default']['BACKEND'] == 'django.core.cache.backends.locmem.LocMemCache':
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': BASE_DIR / 'cache',
+        }
+    }
+
+DASHBOARD_CACHE_TIMEOUT = 60 * 15
+
+# Fingerprinted names and compressed copies written by collectstatic, see core.assets
+STORAGES = {
+    'default': {
+        'BACKEND': 'django.core.files.storage.FileSystemStorage',
+    },
+    'staticfiles': {
+        'BACKEND': 'core.assets.CompressedManifestStaticFilesStorage',
+    },
+}
+
+TEMPLATES = [{
+    **TEMPLATES[0],
+    'APP_DIRS': False,
+    'OPTIONS': {
+        **TEMPLATES[0]['OPTIONS'],
+        # Templates compiled once per process
+        'loaders': [
+            ('django.template.loaders.cached.Loader', [
+                'django.template.loaders.filesystem.Loader',
+                'django.template.loaders.app_directories.Loader',
+            ]),
+        ],
+    },
+}]
+
+# The API authenticates every request itself, it has no use for sessions, CSRF or messages
+BROWSER_MIDDLEWARE = [
+    'django.contrib.sessions.middleware.SessionMiddleware',
+    'django.middleware.csrf.CsrfViewMiddleware',
+    'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'django.contrib.messages.middleware.MessageMiddleware',
+    'django.middleware.clickjacking.XFrameOptionsMiddleware',
+]
+
+API_MIDDLEWARE = [middleware for middleware in MIDDLEWARE if middleware not in BROWSER_MIDDLEWARE]
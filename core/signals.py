@@ -0,0 +1,13 @@
+from django.conf import settings
+from django.dispatch import receiver
+from django.db.backends.signals import connection_created
+
+
+@receiver(connection_created)
+def apply_sqlite_pragmas(sender, connection, **kwargs):
+    # Per connection settings, ``journal_mode`` sticks to the database file once set
+    if connection.vendor != 'sqlite' or not settings.SQLITE_PRAGMAS:
+        return
+    with connection.cursor() as cursor:
+        for name, value in settings.SQLITE_PRAGMAS.items():
+            cursor.execute(f'PRAGMA {name} = {value}')
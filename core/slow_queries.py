@@ -0,0 +1,133 @@
+"""
+Log every statement slower than ``SLOW_QUERY_THRESHOLD`` milliseconds on the
+``core.slow_queries`` logger, with its plan, the view of the request that ran it and
+the application frames that led to it.
+"""
+import time
+import logging
+import traceback
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.dispatch import receiver
+from django.db.backends.signals import connection_created
+
+from core import middleware
+from core.middleware import current_timings
+
+
+logger = logging.getLogger('core.slow_queries')
+
+# Statements a plan is asked for, the others would only be logged with their text
+EXPLAINED_STATEMENTS = ('SELECT', 'WITH', 'INSERT', 'UPDATE', 'DELETE')
+# Application frames kept in the stack summary, innermost last
+STACK_FRAMES = 8
+# Plans kept by statement text, a statement slow on every request is explained once
+PLAN_CACHE_SIZE = 256
+# Around the EXPLAIN inside a transaction, PostgreSQL aborts the whole transaction on a failed statement
+EXPLAIN_SAVEPOINT = 'slow_query_explain'
+
+explaining = ContextVar('explaining', default=False)
+
+# Frames of the execute wrappers themselves, left out of the stack summary
+WRAPPER_FILES = {__file__, middleware.__file__}
+
+
+class SlowQueryLog:
+    """
+    Execute wrapper timing each statement, the ones over ``threshold`` milliseconds are
+    logged. Plans come from ``EXPLAIN QUERY PLAN`` on SQLite and ``EXPLAIN`` elsewhere,
+    run on a cursor of their own so they are neither timed nor counted as queries, and
+    inside a savepoint within a transaction so a failed one leaves the transaction usable.
+    """
+
+    def __init__(self, threshold):
+        self.threshold = threshold
+        self.plans = {}
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        result = execute(sql, params, many, context)
+        duration = (time.perf_counter() - started) * 1000
+        if duration >= self.threshold and not explaining.get():
+            self.log(context['connection'], sql, params, many, duration)
+        return result
+
+    def log(self, connection, sql, params, many, duration):
+        timings = current_timings.get()
+        if timings is not None:
+            origin = f'{timings.view or "-"}.{timings.action or "-"} ({timings.method} {timings.path})'
+        else:
+            origin = 'no request'
+        plan = self.get_plan(connection, sql, params) if not many else None
+        stack = get_stack_summary()
+
+        lines = [f'Slow query {duration:.1f} ms on {connection.alias} in {origin}', sql]
+        if plan:
+            lines += ['Plan:', *(f'  {row}' for row in plan)]
+        if stack:
+            lines += ['Stack:', *(f'  {frame}' for frame in stack)]
+        logger.warning('\n'.join(lines), extra={'slow_query': {
+            'duration_ms': round(duration, 2),
+            'alias': connection.alias,
+            'sql': sql,
+            'view': timings and timings.view,
+            'action': timings and timings.action,
+            'path': timings and timings.path,
+            'plan': plan,
+            'stack': stack,
+        }})
+
+    def get_plan(self, connection, sql, params):
+        if not sql.lstrip().upper().startswith(EXPLAINED_STATEMENTS):
+            return None
+        if sql in self.plans:
+            return self.plans[sql]
+
+        token = explaining.set(True)
+        cursor = connection.create_cursor()
+        savepoint = connection.in_atomic_block and connection.features.uses_savepoints
+        try:
+            if savepoint:
+                cursor.execute(connection.ops.savepoint_create_sql(EXPLAIN_SAVEPOINT))
+            try:
+                cursor.execute(f'{connection.ops.explain_query_prefix()} {sql}', params)
+                rows = cursor.fetchall()
+            except Exception as error:
+                # A plan is a nice to have, the statement itself already succeeded
+                if savepoint:
+                    cursor.execute(connection.ops.savepoint_rollback_sql(EXPLAIN_SAVEPOINT))
+                return [f'EXPLAIN failed: {error}']
+            finally:
+                if savepoint:
+                    cursor.execute(connection.ops.savepoint_commit_sql(EXPLAIN_SAVEPOINT))
+        finally:
+            cursor.close()
+            explaining.reset(token)
+
+        # SQLite rows are (id, parent, notused, detail)
+        plan = [row[-1] if connection.vendor == 'sqlite' else ' '.join(map(str, row)) for row in rows]
+        if len(self.plans) >= PLAN_CACHE_SIZE:
+            self.plans.clear()
+        self.plans[sql] = plan
+        return plan
+
+
+def get_stack_summary():
+    base_dir = str(settings.BASE_DIR)
+    frames = [
+        frame for frame in traceback.extract_stack()
+        if frame.filename.startswith(base_dir) and frame.filename not in WRAPPER_FILES
+        and 'site-packages' not in frame.filename
+    ]
+    return [
+        f'{frame.filename[len(base_dir) + 1:]}:{frame.lineno} in {frame.name}'
+        for frame in frames[-STACK_FRAMES:]
+    ]
+
+
+@receiver(connection_created)
+def install_slow_query_log(sender, connection, **kwargs):
+    if settings.SLOW_QUERY_THRESHOLD and not any(isinstance(wrapper, SlowQueryLog)
+                                                 for wrapper in connection.execute_wrappers):
+        connection.execute_wrappers.append(SlowQueryLog(threshold=settings.SLOW_QUERY_THRESHOLD))
@@ -0,0 +1,9 @@
+"""
+Helpers shared by the test suites and the load tests, which drive the API like a client.
+"""
+import base64
+
+
+def get_authorization(username, password) -> str:
+    # Authorization header value of the Basic credentials
+    return 'Basic ' + base64.b64encode(f'{username}:{password}'.encode()).decode()
@@ -0,0 +1,465 @@
+import io
+import gzip
+import json
+import pstats
+import tempfile
+from pathlib import Path
+from wsgiref.util import setup_testing_defaults
+from uuid import UUID
+from decimal import Decimal
+from unittest.mock import patch
+from datetime import date, datetime, timezone
+
+import brotli
+import msgpack
+
+from django.conf import settings
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.core.management import call_command
+from django.core.handlers.wsgi import WSGIHandler
+from django.middleware.common import CommonMiddleware
+from django.core.cache import cache
+from django.urls import reverse
+from django.db import connection, transaction
+from django.contrib.auth.base_user import AbstractBaseUser
+from django.utils.translation import gettext_lazy as _
+
+from rest_framework.exceptions import ParseError
+from rest_framework.renderers import JSONRenderer
+
+from core.api.parsers import FastJSONParser, MessagePackParser
+from core.api.renderers import FastJSONRenderer, MessagePackRenderer
+from accounts.factories import CustomerUserFactory
+from loans.enums import LoanStatus
+from loans.factories import LoanFactory
+from loans.models import Loan
+from core.slow_queries import SlowQueryLog
+from core.schema import get_schema
+from core.signals import apply_sqlite_pragmas
+from core.handlers import APIWSGIHandler, WSGIPathRouter
+from core.assets import get_hashed_names
+from core.testing import get_authorization
+
+
+def make_temp_dir(test_case) -> Path:
+    directory = tempfile.TemporaryDirectory()
+    test_case.addCleanup(directory.cleanup)
+    return Path(directory.name)
+
+
+@override_settings(PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'])
+class BasicAuthTestCase(TestCase):
+    """
+    Requests sent with the Basic credentials of factory users, their passwords hashed with
+    MD5 so authenticating each request stays cheap
+    """
+    password = 'secret'
+
+    def create_user(self, username, **kwargs):
+        return CustomerUserFactory(username=username, password=self.password, **kwargs)
+
+    def get_as(self, url, username, password=None, **extra):
+        authorization = get_authorization(username, password or self.password)
+        return self.client.get(url, HTTP_AUTHORIZATION=authorization, **extra)
+
+
+class FastJSONRendererTests(SimpleTestCase):
+    data = {
+        'id': 1,
+        'amount': '110.00',
+        'label': _('Pending'),
+        'uuid': UUID('12345678-1234-5678-1234-567812345678'),
+        'payment_date': date(2025, 1, 31),
+        'create_at': datetime(2025, 1, 31, 8, 30, tzinfo=timezone.utc),
+        'nested': [{'name': 'café  '}, None, True, 1.5],
+    }
+
+    def test_matches_stock_renderer(self):
+        """Test the fast renderer emits the same bytes as the stock renderer"""
+        self.assertEqual(FastJSONRenderer().render(self.data), JSONRenderer().render(self.data))
+
+    def test_decimal_is_preserved(self):
+        """Test decimals are written as exact strings"""
+        data = {'amount': Decimal('12345678901234.57'), 'rate': Decimal('1E+2')}
+        self.assertEqual(FastJSONRenderer().render(data), b'{"amount":"12345678901234.57","rate":"100"}')
+
+    def test_stdlib_fallback(self):
+        """Test the renderer falls back to the stdlib with the same output"""
+        data = dict(self.data, amount=Decimal('0.10'))
+        expected = FastJSONRenderer().render(data)
+        with patch('core.api.renderers.orjson', None):
+            self.assertEqual(FastJSONRenderer().render(data), expected)
+
+    def test_indent_falls_back(self):
+        """Test indented output is delegated to the stock renderer"""
+        rendered = FastJSONRenderer().render({'a': 1}, 'application/json; indent=2')
+        self.assertEqual(rendered, b'{\n  "a": 1\n}')
+
+
+class FastJSONParserTests(SimpleTestCase):
+
+    def test_parse(self):
+        """Test the fast parser reads the same data as the stock parser"""
+        body = '{"amount": 1000.1, "name": "café", "items": [1, null]}'.encode()
+        data = FastJSONParser().parse(io.BytesIO(body))
+        self.assertEqual(data, {'amount': 1000.1, 'name': 'café', 'items': [1, None]})
+
+        with patch('core.api.parsers.orjson', None):
+            self.assertEqual(FastJSONParser().parse(io.BytesIO(body)), data)
+
+    def test_parse_error(self):
+        """Test malformed bodies raise a parse error on both paths"""
+        with self.assertRaises(ParseError):
+            FastJSONParser().parse(io.BytesIO(b'{"amount": '))
+        with patch('core.api.parsers.orjson', None), self.assertRaises(ParseError):
+            FastJSONParser().parse(io.BytesIO(b'{"amount": '))
+
+
+class MessagePackTests(SimpleTestCase):
+
+    def test_encoding_matches_json(self):
+        """Test msgpack payloads decode to the same values as the JSON output"""
+        data = dict(FastJSONRendererTests.data, amount=Decimal('1250.50'))
+        rendered = MessagePackRenderer().render(data)
+        self.assertEqual(msgpack.unpackb(rendered), FastJSONParser().parse(io.BytesIO(FastJSONRenderer().render(data))))
+        self.assertEqual(msgpack.unpackb(rendered)['amount'], '1250.50')
+        self.assertEqual(msgpack.unpackb(rendered)['create_at'], '2025-01-31T08:30:00Z')
+
+    def test_round_trip(self):
+        """Test the parser reads what the renderer writes"""
+        data = {'transaction_id': 'TRX1', 'amount': '10.00', 'items': [1, 2.5, None, True]}
+        self.assertEqual(MessagePackParser().parse(io.BytesIO(MessagePackRenderer().render(data))), data)
+
+    def test_parse_error(self):
+        """Test malformed bodies raise a parse error"""
+        with self.assertRaises(ParseError):
+            MessagePackParser().parse(io.BytesIO(b'\x82\xa1a'))
+
+
+@override_settings(SERVER_TIMING=True)
+class ServerTimingMiddlewareTests(BasicAuthTestCase):
+    def setUp(self):
+        self.customer = self.create_user('timed')
+
+    def get_metrics(self, response):
+        metrics = {}
+        for metric in response['Server-Timing'].split(', '):
+            name, *params = metric.split(';')
+            metrics[name] = dict(param.split('=', 1) for param in params)
+        return metrics
+
+    def test_server_timing_header(self):
+        """Test an API response carries its total, database, auth and render times"""
+        with self.assertLogs('core.timing', level='INFO') as logs:
+            response = self.get_as(reverse('loans:loan-list'), 'timed')
+        self.assertEqual(response.status_code, 200)
+
+        metrics = self.get_metrics(response)
+        self.assertEqual(set(metrics), {'total', 'db', 'auth', 'render'})
+        self.assertGreaterEqual(float(metrics['total']['dur']), float(metrics['db']['dur']))
+        self.assertRegex(metrics['db']['desc'], r'^"[1-9]\d* queries"$')
+
+        record = logs.records[0]
+        self.assertEqual((record.timing['view'], record.timing['action']), ('LoanViewSet', 'list'))
+        self.assertEqual(record.timing['status'], 200)
+        self.assertIn('view=LoanViewSet action=list', record.getMessage())
+
+    def test_action_name(self):
+        """Test extra viewset actions are logged under their own name"""
+        with self.assertLogs('core.timing', level='INFO') as logs:
+            self.get_as(reverse('loans:loan-dashboard'), 'timed')
+        self.assertEqual(logs.records[0].timing['action'], 'dashboard')
+
+    @override_settings(SERVER_TIMING=False)
+    def test_disabled(self):
+        """Test no header is added when the setting is off"""
+        response = self.get_as(reverse('loans:loan-list'), 'timed')
+        self.assertNotIn('Server-Timing', response)
+
+
+@override_settings(METRICS_TOKEN='scraper')
+class MetricsTests(BasicAuthTestCase):
+    def setUp(self):
+        cache.clear()
+        self.customer = self.create_user('metered')
+
+    def scrape(self, token='scraper'):
+        return self.client.get(reverse('metrics'), HTTP_AUTHORIZATION=f'Bearer {token}')
+
+    def test_request_metrics(self):
+        """Test requests are counted and timed by URL name and viewset action"""
+        self.get_as(reverse('loans:loan-list'), 'metered')
+        response = self.scrape()
+        self.assertEqual(response.status_code, 200)
+
+        content = response.content.decode()
+        labels = 'action="list",method="GET",status="200",view="loans:loan-list"'
+        self.assertRegex(content, r'blink_http_requests_total\{%s\} [1-9]' % labels)
+        self.assertIn('blink_http_request_duration_seconds_bucket{action="list"', content)
+        self.assertIn('blink_http_request_queries_bucket{action="list"', content)
+
+    def test_loan_book_gauges(self):
+        """Test the loan book gauges are computed by the refresh command, scrapes only read the cache"""
+        LoanFactory(customer=self.customer, status=LoanStatus.APPROVED)
+        self.assertNotIn('blink_loans', self.scrape().content.decode())
+
+        call_command('refresh_loan_book_metrics', stdout=io.StringIO())
+        with self.assertNumQueries(0):
+            content = self.scrape().content.decode()
+        self.assertIn('blink_loans{status="approved"} 1.0', content)
+        self.assertIn('blink_available_balance', content)
+        self.assertIn('blink_loan_book_refreshed', content)
+
+    def test_token_required(self):
+        """Test the endpoint is hidden from requests without the scraper token"""
+        self.assertEqual(self.scrape(token='guess').status_code, 404)
+        self.assertEqual(self.client.get(reverse('metrics')).status_code, 404)
+
+
+class SlowQueryLogTests(BasicAuthTestCase):
+    def test_slow_query_logged_with_plan(self):
+        """Test a statement over the threshold is logged with its plan and the frames that ran it"""
+        with self.assertLogs('core.slow_queries', level='WARNING') as logs:
+            with connection.execute_wrapper(SlowQueryLog(threshold=0)), self.assertNumQueries(1):
+                Loan.objects.filter(status=LoanStatus.APPROVED).count()
+
+        record = logs.records[0].slow_query
+        self.assertIn('loans_loan', record['sql'])
+        self.assertTrue(any('loans_loan' in row for row in record['plan']))
+        self.assertTrue(record['stack'][-1].startswith('core/tests.py'))
+        self.assertIn('in no request', logs.output[0])
+
+    def test_failed_plan_keeps_transaction(self):
+        """Test a failing EXPLAIN is rolled back to its savepoint, the transaction goes on"""
+        with transaction.atomic():
+            with self.assertNumQueries(0):
+                plan = SlowQueryLog(threshold=0).get_plan(connection, 'SELECT * FROM missing_table', None)
+            self.assertTrue(plan[0].startswith('EXPLAIN failed'))
+            self.assertEqual(Loan.objects.count(), 0)
+
+    def test_fast_query_ignored(self):
+        """Test statements under the threshold are not logged"""
+        with self.assertNoLogs('core.slow_queries'):
+            with connection.execute_wrapper(SlowQueryLog(threshold=10000)):
+                Loan.objects.count()
+
+    @override_settings(SLOW_QUERY_THRESHOLD=10000)
+    def test_slow_query_view(self):
+        """Test a slow statement of a request is tagged with its view and action"""
+        self.create_user('slow')
+        with self.assertLogs('core.slow_queries', level='WARNING') as logs:
+            with connection.execute_wrapper(SlowQueryLog(threshold=0)):
+                self.get_as(reverse('loans:loan-list'), 'slow')
+
+        record = logs.records[-1].slow_query
+        self.assertEqual((record['view'], record['action'], record['path']), ('LoanViewSet', 'list', '/api/loans/'))
+
+
+@override_settings(PROFILING_ENABLED=True)
+class ProfilingMiddlewareTests(BasicAuthTestCase):
+    def setUp(self):
+        self.directory = make_temp_dir(self)
+        self.enterContext(override_settings(PROFILING_DIR=self.directory))
+        self.create_user('staff', is_staff=True)
+        self.create_user('customer')
+        self.url = reverse('loans:loan-list')
+
+    def test_staff_request_profiled(self):
+        """Test a staff request asking for a profile leaves its pstats and collapsed stacks"""
+        response = self.get_as(self.url, 'staff', QUERY_STRING='profile=1')
+        self.assertEqual(response.status_code, 200)
+
+        name = response['X-Profile']
+        stats = pstats.Stats(str(self.directory / f'{name}.pstats'))
+        self.assertTrue(any(function == 'list' for _, _, function in stats.stats))
+        self.assertTrue((self.directory / f'{name}.collapsed').exists())
+
+    def test_credentials_hashed_once(self):
+        """Test the view reuses the Basic credentials the middleware checked, the password is hashed once"""
+        check_password = AbstractBaseUser.check_password
+        with patch.object(AbstractBaseUser, 'check_password', autospec=True, side_effect=check_password) as check:
+            response = self.get_as(self.url, 'staff', QUERY_STRING='profile=1')
+        self.assertIn('X-Profile', response)
+        self.assertEqual(check.call_count, 1)
+
+    async def test_asgi_sync_view_profiled(self):
+        """Test under ASGI the worker thread running a sync view is profiled, not only the event loop"""
+        response = await self.async_client.get(self.url, {'profile': '1'},
+                                               headers={'Authorization': get_authorization('staff', 'secret')})
+        self.assertEqual(response.status_code, 200)
+
+        stats = pstats.Stats(str(self.directory / f'{response["X-Profile"]}.pstats'))
+        self.assertTrue(any(function == 'list' for _, _, function in stats.stats))
+
+    def test_header_requests_profile(self):
+        """Test the X-Profile request header asks for a profile too"""
+        response = self.get_as(self.url, 'staff', HTTP_X_PROFILE='1')
+        self.assertIn('X-Profile', response)
+
+    def test_session_staff_request_profiled(self):
+        """Test a staff user logged in with a session can ask for a profile"""
+        self.client.force_login(CustomerUserFactory(is_staff=True))
+        response = self.client.get(self.url, {'profile': '1'})
+        self.assertIn('X-Profile', response)
+
+    def test_non_staff_request_not_profiled(self):
+        """Test the profiler never starts for anyone but staff"""
+        with patch('core.middleware.RequestProfile.start') as start:
+            response = self.get_as(self.url, 'customer', QUERY_STRING='profile=1')
+            self.assertEqual(response.status_code, 200)
+            anonymous = self.client.get(self.url, {'profile': '1'})
+            wrong_password = self.get_as(self.url, 'staff', 'guess', QUERY_STRING='profile=1')
+        start.assert_not_called()
+        for response in (response, anonymous, wrong_password):
+            self.assertNotIn('X-Profile', response)
+        self.assertEqual(list(self.directory.iterdir()), [])
+
+    def test_not_requested(self):
+        """Test requests without the parameter or header are not profiled"""
+        response = self.get_as(self.url, 'staff')
+        self.assertNotIn('X-Profile', response)
+        self.assertEqual(list(self.directory.iterdir()), [])
+
+
+@override_settings(DEBUG=False)
+class SchemaTests(TestCase):
+    def setUp(self):
+        self.directory = make_temp_dir(self)
+        self.enterContext(override_settings(SCHEMA_DIR=self.directory))
+        get_schema.cache_clear()
+        self.addCleanup(get_schema.cache_clear)
+
+    def test_build_schema(self):
+        """Test the command writes the JSON and YAML schema"""
+        call_command('build_schema', stdout=io.StringIO())
+        schema = json.loads((self.directory / 'schema.json').read_bytes())
+        self.assertIn('/api/loans/', schema['paths'])
+        self.assertTrue((self.directory / 'schema.yaml').read_text().startswith('openapi:'))
+
+    def test_served_from_artifact(self):
+        """Test the built schema is served with an ETag and revalidated with a 304"""
+        (self.directory / 'schema.json').write_text('{"openapi": "built"}')
+        response = self.client.get(reverse('schema_json_view'))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.content, b'{"openapi": "built"}')
+        self.assertIn('no-cache', response['Cache-Control'])
+
+        response = self.client.get(reverse('schema_json_view'), HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, 304)
+
+    def test_generated_once_without_artifact(self):
+        """Test a missing artifact is generated on the first hit and kept in memory"""
+        response = self.client.get(reverse('schema_yaml_view'))
+        self.assertTrue(response.content.startswith(b'openapi:'))
+        with patch('core.schema.generate_schema') as generate_schema:
+            self.assertEqual(self.client.get(reverse('schema_yaml_view')).content, response.content)
+        generate_schema.assert_not_called()
+
+    @override_settings(DEBUG=True)
+    def test_live_in_debug(self):
+        """Test the schema is generated on each hit in debug"""
+        (self.directory / 'schema.json').write_text('{"openapi": "built"}')
+        response = self.client.get(reverse('schema_json_view'))
+        self.assertIn('/api/loans/', json.loads(response.content)['paths'])
+
+
+@override_settings(API_MIDDLEWARE=['django.middleware.common.CommonMiddleware'])
+class APIMiddlewareTests(SimpleTestCase):
+    def setUp(self):
+        self.application = WSGIPathRouter(site=WSGIHandler(), api=APIWSGIHandler())
+
+    def get_headers(self, path):
+        environ = {'REQUEST_METHOD': 'GET', 'PATH_INFO': path, 'HTTP_HOST': 'testserver'}
+        setup_testing_defaults(environ)
+        headers = {}
+
+        def start_response(status, response_headers, exc_info=None):
+            headers.update(response_headers)
+
+        self.application(environ, start_response).close()
+        return headers
+
+    def test_api_middleware(self):
+        """Test API paths run through the API middleware only"""
+        self.assertNotIn('X-Frame-Options', self.get_headers('/api/loans/'))
+
+    def test_site_middleware(self):
+        """Test every other path still runs through the whole middleware chain"""
+        self.assertEqual(self.get_headers('/admin/login/')['X-Frame-Options'], 'DENY')
+
+    def test_settings_untouched(self):
+        """Test the API chain is built without changing MIDDLEWARE, which other threads may read meanwhile"""
+        init, seen = CommonMiddleware.__init__, []
+
+        def record(middleware, get_response):
+            seen.append(settings.MIDDLEWARE)
+            init(middleware, get_response)
+
+        with patch.object(CommonMiddleware, '__init__', autospec=True, side_effect=record):
+            APIWSGIHandler()
+        self.assertEqual(seen, [settings.MIDDLEWARE])
+
+
+class SQLitePragmaTests(TestCase):
+    @override_settings(SQLITE_PRAGMAS={'cache_size': -4000})
+    def test_pragmas_applied(self):
+        """Test the configured pragmas are run on new SQLite connections"""
+        self.addCleanup(connection.cursor().execute, 'PRAGMA cache_size = -2000')
+        apply_sqlite_pragmas(sender=connection.__class__, connection=connection)
+        with connection.cursor() as cursor:
+            cursor.execute('PRAGMA cache_size')
+            self.assertEqual(cursor.fetchone(), (-4000,))
+
+
+@override_settings(STATICFILES_FINDERS=['django.contrib.staticfiles.finders.FileSystemFinder'])
+class StaticAssetsTests(TestCase):
+    script = b'export const hello = () => console.log("hello");\n' * 50
+
+    def setUp(self):
+        directory = make_temp_dir(self)
+        source, self.root = directory / 'source', directory / 'root'
+        source.mkdir()
+        (source / 'app.js').write_bytes(self.script)
+        (source / 'tiny.txt').write_bytes(b'x')
+
+        self.enterContext(override_settings(STATIC_ROOT=self.root, STATICFILES_DIRS=[source], STORAGES={
+            'default': {'BACKEND': 'django.core.files.storage.FileSystemStorage'},
+            'staticfiles': {'BACKEND': 'core.assets.CompressedManifestStaticFilesStorage'},
+        }))
+        call_command('collectstatic', interactive=False, verbosity=0)
+        get_hashed_names.cache_clear()
+        self.addCleanup(get_hashed_names.cache_clear)
+        self.hashed = json.loads((self.root / 'staticfiles.json').read_text())['paths']['app.js']
+
+    def test_compressed_copies(self):
+        """Test collectstatic compresses the fingerprinted and original copies worth it"""
+        self.assertEqual(gzip.decompress((self.root / f'{self.hashed}.gz').read_bytes()), self.script)
+        self.assertTrue((self.root / 'app.js.gz').exists())
+        self.assertFalse((self.root / 'tiny.txt.gz').exists())
+
+    def test_fingerprinted_served_compressed(self):
+        """Test a fingerprinted file is served compressed and cached for good"""
+        response = self.client.get(f'/assets/{self.hashed}', HTTP_ACCEPT_ENCODING='gzip, deflate')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertIn('immutable', response['Cache-Control'])
+        self.assertIn('Accept-Encoding', response['Vary'])
+        self.assertEqual(gzip.decompress(response.getvalue()), self.script)
+
+    def test_brotli_preferred(self):
+        """Test clients accepting brotli get the brotli copy written by collectstatic"""
+        self.assertEqual(brotli.decompress((self.root / f'{self.hashed}.br').read_bytes()), self.script)
+
+        response = self.client.get(f'/assets/{self.hashed}', HTTP_ACCEPT_ENCODING='gzip, deflate, br')
+        self.assertEqual(response['Content-Encoding'], 'br')
+        self.assertEqual(brotli.decompress(response.getvalue()), self.script)
+
+    def test_original_name_revalidated(self):
+        """Test a file under its original name is served as is to clients without gzip and revalidated"""
+        response = self.client.get('/assets/app.js')
+        self.assertNotIn('Content-Encoding', response)
+        self.assertEqual(response['Cache-Control'], 'no-cache')
+        self.assertEqual(response.getvalue(), self.script)
+
+        response = self.client.get('/assets/app.js', HTTP_IF_MODIFIED_SINCE=response['Last-Modified'])
+        self.assertEqual(response.status_code, 304)
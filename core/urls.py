@@ -14,30 +14,40 @@ Including another URLconf
     1. Import the include() function: from django.urls import include, path
     2. Add a URL to urlpatterns:  path('blog/', include('blog.urls'))
 """
+import re
+
 from django.conf import settings
 from django.conf.urls.static import static
 from django.contrib import admin
 from django.urls import path, include, re_path
 
-from drf_spectacular.views import (SpectacularAPIView, SpectacularRedocView, SpectacularSwaggerView,
-                                   SpectacularJSONAPIView, SpectacularYAMLAPIView)
+from drf_spectacular.views import SpectacularRedocView, SpectacularSwaggerView
 
+from core.assets import serve_static
+from core.metrics import metrics_view
+from core.schema import SchemaView, JSONSchemaView, YAMLSchemaView
 from accounts.views import HomeView
 
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('api/', include('accounts.api.urls'), name='accounts'),
     path('api/', include('loans.api.urls'), name='loans'),
-    path('api/docs/schema/', SpectacularAPIView.as_view(), name='schema'),
-    path('api/docs/schema/yaml/', SpectacularJSONAPIView.as_view(), name='schema_yaml_view'),
-    path('api/docs/schema/json/', SpectacularYAMLAPIView.as_view(), name='schema_json_view'),
+    path('api/docs/schema/', SchemaView.as_view(), name='schema'),
+    path('api/docs/schema/yaml/', YAMLSchemaView.as_view(), name='schema_yaml_view'),
+    path('api/docs/schema/json/', JSONSchemaView.as_view(), name='schema_json_view'),
     path('api/docs/redoc/', SpectacularRedocView.as_view(), name='redoc_docs_view'),
     path('api/docs/swagger/', SpectacularSwaggerView.as_view(), name='swagger_docs_view'),
+    path('metrics', metrics_view, name='metrics'),
 ]
 
 if settings.DEBUG:
     urlpatterns += static(settings.STATIC_URL, document_root=settings.STATIC_ROOT)
     urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
+else:
+    # Collected files with their compressed copies, see core.assets
+    urlpatterns += [
+        re_path(r'^%s(?P<path>.*)$' % re.escape(settings.STATIC_URL.lstrip('/')), serve_static, name='static')
+    ]
 
 urlpatterns += [
     re_path(r'^.*$', HomeView.as_view(), name='home')
@@ -0,0 +1,17 @@
+"""
+URL configuration of the ASGI entrypoint.
+
+The hot read endpoints are answered by async views using the async ORM, everything else,
+including the writes on the same URLs, resolves to the regular ``core.urls`` views.
+"""
+from django.urls import path, include
+
+from accounts.api.urls import async_urlpatterns as accounts_async_urlpatterns
+from loans.api.urls import async_urlpatterns as loans_async_urlpatterns
+from core.urls import urlpatterns as sync_urlpatterns
+
+urlpatterns = [
+    path('api/', include(accounts_async_urlpatterns)),
+    path('api/', include(loans_async_urlpatterns)),
+    *sync_urlpatterns,
+]
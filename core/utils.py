@@ -0,0 +1,21 @@
+import hashlib
+
+from django.http import HttpResponse
+from django.utils.cache import get_conditional_response, patch_cache_control
+
+
+def get_etag(content) -> str:
+    return f'"{hashlib.md5(content).hexdigest()}"'
+
+
+def get_etag_response(request, content, etag, content_type=None):
+    """
+    ``content`` kept in memory, or a 304 when the client already holds this ``etag``. Clients
+    revalidate on each use, the content may change with the next deploy.
+    """
+    response = get_conditional_response(request, etag=etag)
+    if response is None:
+        response = HttpResponse(content, content_type=content_type)
+    response['ETag'] = etag
+    patch_cache_control(response, no_cache=True)
+    return response
@@ -3,14 +3,22 @@ WSGI config for core project.
 
 It exposes the WSGI callable as a module-level variable named ``application``.
 
+With ``API_MIDDLEWARE`` set, API requests skip the browser middleware, see ``core.handlers``.
+
 For more information on this file, see
 https://docs.djangoproject.com/en/5.1/howto/deployment/wsgi/
 """
 
 import os
 
+from django.conf import settings
 from django.core.wsgi import get_wsgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'core.settings')
 
 application = get_wsgi_application()
+
+if settings.API_MIDDLEWARE is not None:
+    from core.handlers import APIWSGIHandler, WSGIPathRouter
+
+    application = WSGIPathRouter(site=application, api=APIWSGIHandler())
@@ -1,6 +1,8 @@
-from django.contrib import admin
+from django.contrib import admin, messages
+from django.utils.translation import gettext_lazy as _
 
-from .models import LoanFundType, LoanFund, LoanType, Loan, AmortizationSchedule
+from .enums import LoanStatus
+from .models import LoanFundType, LoanFund, LoanType, Loan, AmortizationSchedule, Prepayment, LoanDelinquency
 
 
 class AmortizationScheduleInlineAdmin(admin.TabularInline):
@@ -33,3 +35,33 @@ class LoanModelAdmin(admin.ModelAdmin):
     list_display = ['customer', 'loan_type', 'status', 'amount', 'create_at', 'update_at']
     readonly_fields = ('create_at', 'update_at')
     inlines = [AmortizationScheduleInlineAdmin]
+
+    def save_model(self, request, obj, form, change):
+        if not change or 'status' not in form.changed_data:
+            return super().save_model(request, obj, form, change)
+
+        # Save the other fields as they are, the status only moves through the allowed transitions
+        status = obj.status
+        obj.status = form.initial['status']
+        super().save_model(request, obj, form, change)
+        if not obj.transition(to=status):
+            self.message_user(
+                request,
+                _("The loan status could not be changed from %(current)s to %(status)s.") % {
+                    'current': obj.get_status_display(), 'status': LoanStatus(status).label
+                },
+                messages.ERROR
+            )
+
+
+@admin.register(Prepayment)
+class PrepaymentModelAdmin(admin.ModelAdmin):
+    list_display = ['loan', 'amount', 'mode', 'transaction_id', 'create_at']
+    readonly_fields = ('create_at',)
+
+
+@admin.register(LoanDelinquency)
+class LoanDelinquencyModelAdmin(admin.ModelAdmin):
+    list_display = ['loan', 'days_past_due', 'bucket', 'overdue_installments', 'overdue_amount', 'as_of']
+    list_filter = ['bucket']
+    readonly_fields = ('create_at', 'update_at')
@@ -0,0 +1,136 @@
+import hashlib
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.http import HttpResponse
+from django.utils import timezone
+
+from rest_framework import status
+from rest_framework.exceptions import APIException, ValidationError
+
+from loans.models import IdempotencyKey
+
+
+IDEMPOTENCY_HEADER = 'Idempotency-Key'
+
+
+class IdempotencyKeyConflict(APIException):
+    status_code = status.HTTP_409_CONFLICT
+    default_detail = 'A request with this idempotency key is still being processed.'
+    default_code = 'idempotency_conflict'
+
+
+class IdempotencyKeyMismatch(APIException):
+    status_code = status.HTTP_422_UNPROCESSABLE_ENTITY
+    default_detail = 'This idempotency key was already used with a different request.'
+    default_code = 'idempotency_mismatch'
+
+
+class IdempotentModelMixin:
+    """
+    Store the response of a request sent with an ``Idempotency-Key`` header and replay it
+    for retries with the same key, without running the view again. Keys are scoped to the
+    authenticated user and expire after ``IDEMPOTENCY_KEY_TIMEOUT`` seconds. Server errors
+    are not stored so the client can retry them. A key still unanswered after
+    ``IDEMPOTENCY_KEY_LEASE`` seconds, left by a worker that died mid-request, is taken
+    over by the next retry.
+    """
+    idempotent_methods = ('POST',)
+    idempotency_record = None
+    stored_response = None
+
+    def get_request_fingerprint(self, request):
+        digest = hashlib.sha256()
+        digest.update(request.method.encode())
+        digest.update(request.path.encode())
+        digest.update(request.body)
+        return digest.hexdigest()
+
+    def get_idempotency_key(self, request):
+        if request.method not in self.idempotent_methods or not request.user.is_authenticated:
+            return None
+        key = request.headers.get(IDEMPOTENCY_HEADER)
+        if key is not None and not 0 < len(key) <= 255:
+            raise ValidationError({IDEMPOTENCY_HEADER: 'Must be between 1 and 255 characters.'})
+        return key
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+
+        key = self.get_idempotency_key(request)
+        if key is None:
+            return
+
+        fingerprint = self.get_request_fingerprint(request)
+        record = IdempotencyKey.objects.get_active_key(user=request.user, key=key)
+        if record is None:
+            self.idempotency_record = self.create_idempotency_record(request.user, key, fingerprint)
+            return
+
+        if record.fingerprint != fingerprint:
+            raise IdempotencyKeyMismatch
+        if record.status_code is None:
+            leased_before = timezone.now() - timedelta(seconds=settings.IDEMPOTENCY_KEY_LEASE)
+            if not IdempotencyKey.objects.take_over_stale_key(record, leased_before=leased_before):
+                raise IdempotencyKeyConflict
+            self.idempotency_record = record
+            return
+
+        # Skip the handler, and with it every validation query, for a stored response
+        self.stored_response = record
+        setattr(self, request.method.lower(), self.replay_stored_response)
+
+    def create_idempotency_record(self, user, key, fingerprint):
+        IdempotencyKey.objects.purge_expired(limit=settings.IDEMPOTENCY_KEY_PURGE_BATCH)
+        IdempotencyKey.objects.filter(user=user, key=key, expires_at__lte=timezone.now()).delete()
+        try:
+            with transaction.atomic():
+                return IdempotencyKey.objects.create(
+                    user=user,
+                    key=key,
+                    fingerprint=fingerprint,
+                    expires_at=timezone.now() + timedelta(seconds=settings.IDEMPOTENCY_KEY_TIMEOUT)
+                )
+        except IntegrityError:
+            # A concurrent request with the same key won the insert
+            raise IdempotencyKeyConflict
+
+    def replay_stored_response(self, request, *args, **kwargs):
+        response = HttpResponse(
+            bytes(self.stored_response.content),
+            status=self.stored_response.status_code,
+            content_type=self.stored_response.content_type
+        )
+        response['Idempotent-Replayed'] = 'true'
+        return response
+
+    def release_idempotency_record(self):
+        if self.idempotency_record is not None:
+            self.idempotency_record.delete()
+            self.idempotency_record = None
+
+    def handle_exception(self, exc):
+        try:
+            return super().handle_exception(exc)
+        except Exception:
+            self.release_idempotency_record()
+            raise
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(request, response, *args, **kwargs)
+        record = self.idempotency_record
+        if record is None:
+            return response
+
+        if response.status_code >= 500 or getattr(response, 'streaming', False):
+            self.release_idempotency_record()
+            return response
+
+        if hasattr(response, 'render'):
+            response.render()
+        record.status_code = response.status_code
+        record.content_type = response.get('Content-Type', '')
+        record.content = response.content
+        record.save(update_fields=['status_code', 'content_type', 'content'])
+        return response
@@ -0,0 +1,82 @@
+from datetime import date
+
+from django.db import models
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import CursorPagination
+
+
+class DelinquencyCursorPagination(CursorPagination):
+    """
+    Keyset pages of the delinquent loans, most overdue first, each one read from the
+    (oldest_due_date, id) index however deep the client pages.
+
+    ``CursorPagination`` keeps only ``oldest_due_date`` in the cursor and pages through the
+    loans sharing a due date with an OFFSET, capped at ``offset_cutoff``. The cursor here
+    holds both columns, a position no other loan shares, so pages never need an offset.
+    """
+    ordering = ('oldest_due_date', 'id')
+    page_size_query_param = 'page_size'
+    max_page_size = 500
+
+    def get_ordering(self, request, queryset, view):
+        # The keyset is the index, no ordering filter may change it
+        return self.ordering
+
+    def parse_position(self, position):
+        try:
+            oldest_due_date, pk = position.split('|')
+            return date.fromisoformat(oldest_due_date), int(pk)
+        except ValueError:
+            raise NotFound(self.invalid_cursor_message)
+
+    def get_keyset_filter(self, position, reverse):
+        # The range on the leading column is what the index seeks, the id only breaks the tie
+        oldest_due_date, pk = self.parse_position(position)
+        if reverse:
+            return models.Q(oldest_due_date__lte=oldest_due_date) & (
+                models.Q(oldest_due_date__lt=oldest_due_date) | models.Q(id__lt=pk)
+            )
+        return models.Q(oldest_due_date__gte=oldest_due_date) & (
+            models.Q(oldest_due_date__gt=oldest_due_date) | models.Q(id__gt=pk)
+        )
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        if not self.page_size:
+            return None
+
+        self.base_url = request.build_absolute_uri()
+        self.ordering = self.get_ordering(request, queryset, view)
+
+        self.cursor = self.decode_cursor(request)
+        reverse, current_position = (self.cursor.reverse, self.cursor.position) if self.cursor else (False, None)
+
+        if reverse:
+            queryset = queryset.order_by('-oldest_due_date', '-id')
+        else:
+            queryset = queryset.order_by(*self.ordering)
+        if current_position is not None:
+            queryset = queryset.filter(self.get_keyset_filter(current_position, reverse))
+
+        # One extra row tells whether a page follows, the links then start after the last row of this one
+        results = list(queryset[:self.page_size + 1])
+        self.page = results[:self.page_size]
+        following_position = None
+        if len(results) > len(self.page):
+            following_position = self._get_position_from_instance(results[-1], self.ordering)
+
+        if reverse:
+            self.page.reverse()
+            self.has_next, self.next_position = current_position is not None, current_position
+            self.has_previous, self.previous_position = following_position is not None, following_position
+        else:
+            self.has_next, self.next_position = following_position is not None, following_position
+            self.has_previous, self.previous_position = current_position is not None, current_position
+
+        if (self.has_previous or self.has_next) and self.template is not None:
+            self.display_page_controls = True
+        return self.page
+
+    def _get_position_from_instance(self, instance, ordering):
+        return f'{instance.oldest_due_date.isoformat()}|{instance.pk}'
@@ -55,3 +55,23 @@ class IsProvider(BaseUserRolePermission):
 class IsCustomer(BaseUserRolePermission):
     allow_readonly = False
     user_role = UserRole.LOAN_CUSTOMER
+
+
+class IsLoanReviewer(BaseUserRolePermission):
+    allow_readonly = False
+    user_role = UserRole.LOAN_PERSONNEL
+
+    def has_object_permission(self, request, view, obj) -> bool:
+        # Personnel review the loans of every customer
+        return self.has_permission(request=request, view=view)
+
+
+class IsPersonnelOrProvider(BaseUserRolePermission):
+    allow_readonly = False
+    user_roles: tuple = (UserRole.LOAN_PERSONNEL, UserRole.LOAN_PROVIDER)
+
+    def has_permission(self, request, view) -> bool:
+        return bool(
+            request.user.is_authenticated and
+            request.user.role in self.user_roles
+        )
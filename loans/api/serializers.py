@@ -1,12 +1,15 @@
+from decimal import Decimal
+
+from django.db import models, transaction, IntegrityError
 from django.utils.translation import gettext_lazy as _
 
 from rest_framework import serializers
 from rest_framework.exceptions import PermissionDenied
 from rest_flex_fields import FlexFieldsModelSerializer
 
-from loans.enums import LoanStatus
-from loans.utils import get_current_balance
-from loans.models import LoanFundType, LoanFund, LoanType, Loan, AmortizationSchedule
+from loans.enums import LoanStatus, PrepaymentMode
+from loans.utils import get_current_balance, invalidate_customer_dashboard, recompute_schedule_tail
+from loans.models import LoanFundType, LoanFund, LoanType, Loan, AmortizationSchedule, Prepayment, LoanDelinquency
 
 
 class LoanFundTypeSerializer(serializers.ModelSerializer):
@@ -174,3 +177,176 @@ class AmortizationPayment(serializers.ModelSerializer):
                 _(f"Cannot pay this amortization. You have an previous amortization that is not paid yet.")
             )
         return data
+
+
+class AmortizationBatchPaymentItem(serializers.Serializer):
+    id = serializers.IntegerField()
+    transaction_id = serializers.CharField(max_length=255)
+
+
+class AmortizationBatchPayment(serializers.Serializer):
+    payments = AmortizationBatchPaymentItem(many=True, allow_empty=False)
+
+    def validate(self, data):
+        customer = self.context['request'].user
+        payments = {payment['id']: payment['transaction_id'] for payment in data['payments']}
+        transaction_ids = set(payments.values())
+
+        # Check that every amortization and transaction id is used once
+        if not (len(data['payments']) == len(payments) == len(transaction_ids)):
+            raise serializers.ValidationError(
+                _("Each amortization and transaction id can only appear once in a batch.")
+            )
+
+        # Check that every amortization belongs to the customer
+        schedules = list(
+            AmortizationSchedule.objects.filter(
+                loan__customer=customer,
+                id__in=payments
+            ).only('id', 'loan', 'payment_number', 'is_paid')
+        )
+        if len(schedules) != len(payments):
+            raise serializers.ValidationError(
+                _("Some amortizations do not exist.")
+            )
+
+        # Check if any of the amortizations is already marked as paid
+        if any(schedule.is_paid for schedule in schedules):
+            raise PermissionDenied(
+                _("You have already paid this")
+            )
+
+        # Check if there are any previous amortization with the same transaction ids
+        if AmortizationSchedule.objects.filter(transaction_id__in=transaction_ids).exists():
+            raise serializers.ValidationError(
+                _("Transaction id is already exist.")
+            )
+
+        # Check if there are any previous unpaid schedules left out of the batch, for all loans at once
+        latest_payment_numbers = {}
+        for schedule in schedules:
+            latest = latest_payment_numbers.get(schedule.loan_id)
+            if latest is None or int(schedule.payment_number) > latest:
+                latest_payment_numbers[schedule.loan_id] = int(schedule.payment_number)
+        if AmortizationSchedule.objects.has_previous_unpaid_schedules(
+                latest_payment_numbers=latest_payment_numbers,
+                exclude_ids=payments):
+            raise serializers.ValidationError(
+                _("Cannot pay this amortization. You have an previous amortization that is not paid yet.")
+            )
+
+        data['loan_ids'] = set(latest_payment_numbers)
+        return data
+
+    def create(self, validated_data):
+        payments = {payment['id']: payment['transaction_id'] for payment in validated_data['payments']}
+
+        with transaction.atomic():
+            # A concurrent payment of one of the rows rolls back the whole batch
+            if AmortizationSchedule.objects.pay_schedules(payments=payments) != len(payments):
+                raise serializers.ValidationError(
+                    _("Some amortizations were paid by another request, try again.")
+                )
+            Loan.objects.complete_paid_loans(loan_ids=validated_data['loan_ids'])
+
+        # Bulk updates bypass the signals, drop the cached dashboard here
+        invalidate_customer_dashboard(self.context['request'].user.id)
+        return AmortizationSchedule.objects.filter(id__in=payments).order_by('loan', 'payment_date', 'id')
+
+
+class LoanPrepayment(serializers.Serializer):
+    amount = serializers.DecimalField(max_digits=10, decimal_places=2, min_value=Decimal('0.01'))
+    mode = serializers.ChoiceField(choices=PrepaymentMode.choices, default=PrepaymentMode.KEEP_TERM)
+    transaction_id = serializers.CharField(max_length=255)
+
+    def validate(self, data):
+        instance = self.instance
+
+        # Check if the loan is being repaid
+        if instance.status not in (LoanStatus.APPROVED, LoanStatus.ACTIVE):
+            raise serializers.ValidationError(
+                _("Only approved or active loans can be prepaid.")
+            )
+
+        # Check if there are any previous payment or prepayment with the same transaction_id
+        if AmortizationSchedule.objects.filter(transaction_id=data['transaction_id']).exists() or \
+                Prepayment.objects.filter(transaction_id=data['transaction_id']).exists():
+            raise serializers.ValidationError(
+                _("Transaction id is already exist.")
+            )
+
+        # Check if the prepayment leaves some principal to recompute the schedule on
+        outstanding = AmortizationSchedule.objects.filter(
+            loan=instance,
+            is_paid=False
+        ).aggregate(
+            outstanding=models.Sum('principal_amount')
+        )['outstanding'] or 0
+        if data['amount'] >= outstanding:
+            raise serializers.ValidationError(
+                _("The prepayment must be lower than the outstanding principal, pay the installments instead.")
+            )
+        return data
+
+    def update(self, instance, validated_data):
+        try:
+            with transaction.atomic():
+                # The money received, recorded with the schedule it changed
+                Prepayment.objects.create(
+                    loan=instance,
+                    amount=validated_data['amount'],
+                    mode=validated_data['mode'],
+                    transaction_id=validated_data['transaction_id']
+                )
+                return recompute_schedule_tail(
+                    loan=instance,
+                    prepayment=validated_data['amount'],
+                    mode=validated_data['mode']
+                )
+        except IntegrityError:
+            # A concurrent prepayment used the same transaction id
+            raise serializers.ValidationError(_("Transaction id is already exist."))
+        except ValueError as error:
+            # The outstanding principal changed after the validation
+            raise serializers.ValidationError(str(error))
+
+
+class DashboardLoanSerializer(serializers.ModelSerializer):
+    outstanding_principal = serializers.DecimalField(max_digits=15, decimal_places=2, read_only=True)
+    outstanding_payment = serializers.DecimalField(max_digits=15, decimal_places=2, read_only=True)
+    unpaid_installments = serializers.IntegerField(read_only=True)
+
+    class Meta:
+        model = Loan
+        fields = ('id', 'loan_type', 'status', 'amount', 'duration_months', 'start_at', 'outstanding_principal',
+                  'outstanding_payment', 'unpaid_installments')
+        read_only_fields = fields
+
+
+class DashboardInstallmentSerializer(serializers.ModelSerializer):
+
+    class Meta:
+        model = AmortizationSchedule
+        fields = ('id', 'loan', 'payment_number', 'payment_date', 'principal_amount', 'interest_amount',
+                  'total_payment')
+        read_only_fields = fields
+
+
+class CustomerDashboardSerializer(serializers.Serializer):
+    active_loans = DashboardLoanSerializer(many=True, read_only=True)
+    next_installment = DashboardInstallmentSerializer(allow_null=True, read_only=True)
+    total_loan_amount = serializers.DecimalField(max_digits=15, decimal_places=2, read_only=True)
+    outstanding_principal = serializers.DecimalField(max_digits=15, decimal_places=2, read_only=True)
+    outstanding_payment = serializers.DecimalField(max_digits=15, decimal_places=2, read_only=True)
+    unpaid_installments = serializers.IntegerField(read_only=True)
+
+
+class LoanDelinquencySerializer(serializers.ModelSerializer):
+    customer = serializers.IntegerField(source='loan.customer_id', read_only=True)
+    status = serializers.IntegerField(source='loan.status', read_only=True)
+
+    class Meta:
+        model = LoanDelinquency
+        fields = ('loan', 'customer', 'status', 'oldest_due_date', 'overdue_installments', 'overdue_amount',
+                  'days_past_due', 'bucket', 'as_of')
+        read_only_fields = fields
@@ -1,9 +1,10 @@
-from django.urls import path, include
+from django.urls import path, re_path, include
 
 from rest_framework import routers
 
 from loans.api.views import (LoanFundTypeViewSet, LoanFundViewSet, LoanTypeViewSet, LoanViewSet,
-                             AmortizationScheduleViewSet)
+                             LoanReviewViewSet, LoanDelinquencyViewSet, AmortizationScheduleViewSet, ExportViewSet,
+                             AsyncLoanListView, AsyncLoanDetailView, AsyncAmortizationScheduleListView)
 
 
 app_name = 'loans'
@@ -13,8 +14,18 @@ router.register(r'fund-type', LoanFundTypeViewSet, basename='fund_type')
 router.register(r'fund', LoanFundViewSet, basename='fund')
 router.register(r'type', LoanTypeViewSet, basename='type')
 router.register(r'', LoanViewSet, basename='loan')
+router.register(r'review', LoanReviewViewSet, basename='loan_review')
+router.register(r'delinquency', LoanDelinquencyViewSet, basename='delinquency')
 router.register(r'amortization', AmortizationScheduleViewSet, basename='amortization')
+router.register(r'export', ExportViewSet, basename='export')
 
 urlpatterns = [
     path('loans/', include(router.urls), name='loans_routes'),
 ]
+
+# Served ahead of the router under ASGI, see ``core.urls_asgi``
+async_urlpatterns = [
+    path('loans/', AsyncLoanListView.as_view()),
+    path('loans/amortization/', AsyncAmortizationScheduleListView.as_view()),
+    re_path(r'^loans/(?P<pk>\d+)/$', AsyncLoanDetailView.as_view()),
+]
@@ -1,20 +1,36 @@
+from django.conf import settings
+from django.core.cache import cache
+
+from rest_framework import status
 from rest_framework.decorators import action
+from rest_framework.exceptions import APIException, ValidationError
 from rest_framework.response import Response
 from rest_framework.settings import api_settings
-from rest_framework.authentication import BasicAuthentication
-from rest_framework.viewsets import ReadOnlyModelViewSet, ModelViewSet
+from rest_framework.mixins import ListModelMixin
+from rest_framework.viewsets import ReadOnlyModelViewSet, ModelViewSet, ViewSet, GenericViewSet
+from rest_flex_fields import EXPAND_PARAM, FIELDS_PARAM, OMIT_PARAM
 from rest_flex_fields.utils import is_expanded
 from rest_flex_fields.filter_backends import FlexFieldsFilterBackend
 
-from loans.models import LoanFundType, LoanFund, LoanType, Loan, AmortizationSchedule
-from loans.api.permissions import IsPersonnel, IsProvider, IsCustomer
+from core.api.values import ValuesPlan
+from core.api.authentication import TimedBasicAuthentication
+from core.api.views import AsyncListAPIView, AsyncRetrieveAPIView
+from core.api.mixins import ValuesListModelMixin
+from core.api.streaming import EXPORT_FORMATS, get_export_response
+from loans.enums import LoanStatus, DelinquencyBucket
+from loans.models import LoanFundType, LoanFund, LoanType, Loan, AmortizationSchedule, LoanDelinquency
+from loans.utils import get_customer_dashboard_cache_key
+from loans.api.mixins import IdempotentModelMixin
+from loans.api.pagination import DelinquencyCursorPagination
+from loans.api.permissions import IsPersonnel, IsProvider, IsCustomer, IsPersonnelOrProvider, IsLoanReviewer
 from loans.api.serializers import (LoanFundTypeSerializer, LoanFundSerializer, LoanTypeSerializer, LoanSerializer,
-                                   AmortizationScheduleSerializer, AmortizationPayment)
+                                   AmortizationScheduleSerializer, AmortizationPayment, AmortizationBatchPayment,
+                                   CustomerDashboardSerializer, LoanPrepayment, LoanDelinquencySerializer)
 
 
-class LoanFundTypeViewSet(ModelViewSet):
+class LoanFundTypeViewSet(ValuesListModelMixin, ModelViewSet):
     queryset = LoanFundType.objects.all()
-    authentication_classes = [BasicAuthentication]
+    authentication_classes = [TimedBasicAuthentication]
     permission_classes = [IsPersonnel]
     serializer_class = LoanFundTypeSerializer
 
@@ -27,9 +43,9 @@ class LoanFundTypeViewSet(ModelViewSet):
         return self.list(request,*args, **kwargs)
 
 
-class LoanTypeViewSet(ModelViewSet):
+class LoanTypeViewSet(ValuesListModelMixin, ModelViewSet):
     queryset = LoanType.objects.all()
-    authentication_classes = [BasicAuthentication]
+    authentication_classes = [TimedBasicAuthentication]
     permission_classes = [IsPersonnel]
     serializer_class = LoanTypeSerializer
 
@@ -42,9 +58,9 @@ class LoanTypeViewSet(ModelViewSet):
         return self.list(request,*args, **kwargs)
 
 
-class LoanFundViewSet(ModelViewSet):
+class LoanFundViewSet(IdempotentModelMixin, ValuesListModelMixin, ModelViewSet):
     queryset = LoanFund.objects.all()
-    authentication_classes = [BasicAuthentication]
+    authentication_classes = [TimedBasicAuthentication]
     permission_classes = [IsProvider]
     serializer_class = LoanFundSerializer
 
@@ -57,13 +73,15 @@ class LoanFundViewSet(ModelViewSet):
         serializer.save(provider=self.request.user)
 
 
-class LoanViewSet(ModelViewSet):
+class LoanViewSet(IdempotentModelMixin, ValuesListModelMixin, ModelViewSet):
     queryset = Loan.objects.all()
-    authentication_classes = [BasicAuthentication]
+    authentication_classes = [TimedBasicAuthentication]
     permission_classes = [IsCustomer]
     serializer_class = LoanSerializer
     filter_backends = [FlexFieldsFilterBackend] + api_settings.DEFAULT_FILTER_BACKENDS
     permit_list_expands = ['amortizations']
+    # Numeric lookups keep the detail route from shadowing the sibling ``amortization/`` routes
+    lookup_value_regex = r'\d+'
 
     def get_queryset(self):
         queryset = super().get_queryset()
@@ -72,13 +90,104 @@ class LoanViewSet(ModelViewSet):
             queryset = queryset.select_related('amortizations')
         return queryset
 
+    def get_values_plan(self):
+        # Expanded, sparse or omitted fields change the serializer shape per request
+        if {EXPAND_PARAM, FIELDS_PARAM, OMIT_PARAM} & set(self.request.query_params):
+            return None
+        return super().get_values_plan()
+
     def perform_create(self, serializer):
         serializer.save(customer=self.request.user)
 
+    def get_dashboard_data(self):
+        customer = self.request.user
+        active_loans = list(Loan.objects.get_user_dashboard_loans(customer=customer))
+        next_installment = AmortizationSchedule.objects.get_next_unpaid_schedule(
+            loan_ids=[loan.id for loan in active_loans]
+        )
+        serializer = CustomerDashboardSerializer({
+            'active_loans': active_loans,
+            'next_installment': next_installment,
+            'total_loan_amount': sum((loan.amount for loan in active_loans), 0),
+            'outstanding_principal': sum((loan.outstanding_principal for loan in active_loans), 0),
+            'outstanding_payment': sum((loan.outstanding_payment for loan in active_loans), 0),
+            'unpaid_installments': sum(loan.unpaid_installments for loan in active_loans),
+        })
+        return serializer.data
+
+    @action(["POST"], detail=True, url_name='prepay', url_path='prepay', serializer_class=LoanPrepayment)
+    def prepay(self, request, *args, **kwargs):
+        instance = self.get_object()
+        serializer = self.get_serializer(instance, data=request.data)
+        serializer.is_valid(raise_exception=True)
+        schedules = serializer.save()
+        return Response(AmortizationScheduleSerializer(schedules, many=True).data)
+
+    @action(["GET"], detail=False, url_name='dashboard', url_path='dashboard',
+            serializer_class=CustomerDashboardSerializer)
+    def dashboard(self, request, *args, **kwargs):
+        # Without a cache shared by the workers a cached dashboard would outlive the writes of the others
+        if not settings.DASHBOARD_CACHE_TIMEOUT:
+            return Response(self.get_dashboard_data())
+
+        # Served from one cache read, the signals drop the key whenever a loan or installment is written
+        cache_key = get_customer_dashboard_cache_key(request.user.id)
+        data = cache.get(cache_key)
+        if data is None:
+            data = self.get_dashboard_data()
+            cache.set(cache_key, data, settings.DASHBOARD_CACHE_TIMEOUT)
+        return Response(data)
+
+
+class LoanStatusConflict(APIException):
+    status_code = status.HTTP_409_CONFLICT
+    default_detail = 'The loan status was changed by another request.'
+    default_code = 'loan_status_conflict'
+
+
+class LoanReviewViewSet(ValuesListModelMixin, ReadOnlyModelViewSet):
+    queryset = Loan.objects.filter(status=LoanStatus.PENDING)
+    authentication_classes = [TimedBasicAuthentication]
+    permission_classes = [IsLoanReviewer]
+    serializer_class = LoanSerializer
+    lookup_value_regex = r'\d+'
 
-class AmortizationScheduleViewSet(ReadOnlyModelViewSet):
+    def transition(self, to):
+        loan = self.get_object()
+        # Two reviewers acting on the same loan, only the first one changes it
+        if not loan.transition(to=to):
+            raise LoanStatusConflict
+        return Response(self.get_serializer(loan).data)
+
+    @action(["POST"], detail=True, url_name='approve', url_path='approve')
+    def approve(self, request, *args, **kwargs):
+        return self.transition(to=LoanStatus.APPROVED)
+
+    @action(["POST"], detail=True, url_name='reject', url_path='reject')
+    def reject(self, request, *args, **kwargs):
+        return self.transition(to=LoanStatus.REJECTED)
+
+
+class LoanDelinquencyViewSet(ListModelMixin, GenericViewSet):
+    queryset = LoanDelinquency.objects.select_related('loan')
+    authentication_classes = [TimedBasicAuthentication]
+    permission_classes = [IsLoanReviewer]
+    serializer_class = LoanDelinquencySerializer
+    pagination_class = DelinquencyCursorPagination
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        bucket = self.request.query_params.get('bucket')
+        if bucket is not None:
+            if bucket not in {str(value) for value in DelinquencyBucket.values}:
+                raise ValidationError({'bucket': f"Unknown bucket, choose one of {DelinquencyBucket.values}"})
+            queryset = queryset.filter(bucket=bucket)
+        return queryset
+
+
+class AmortizationScheduleViewSet(IdempotentModelMixin, ValuesListModelMixin, ReadOnlyModelViewSet):
     queryset = AmortizationSchedule.objects.all()
-    authentication_classes = [BasicAuthentication]
+    authentication_classes = [TimedBasicAuthentication]
     permission_classes = [IsCustomer]
     serializer_class = AmortizationScheduleSerializer
 
@@ -94,3 +203,75 @@ class AmortizationScheduleViewSet(ReadOnlyModelViewSet):
         serializer.is_valid(raise_exception=True)
         serializer.save(is_paid=True)
         return Response(serializer.data)
+
+    @action(["POST"], detail=False, url_name='pay-batch', url_path='pay-batch',
+            serializer_class=AmortizationBatchPayment)
+    def pay_batch(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        schedules = serializer.save()
+        return Response(AmortizationScheduleSerializer(schedules, many=True).data)
+
+
+class ExportViewSet(ViewSet):
+    authentication_classes = [TimedBasicAuthentication]
+    permission_classes = [IsPersonnelOrProvider]
+    chunk_size = 2000
+
+    def get_export_response(self, serializer_class, queryset, filename):
+        output = self.request.query_params.get('output', 'csv')
+        if output not in EXPORT_FORMATS:
+            raise ValidationError({'output': f"Unsupported export format, choose one of {', '.join(EXPORT_FORMATS)}"})
+
+        # Primary key order is served straight from the index, no sort of the whole table
+        return get_export_response(
+            plan=ValuesPlan.for_serializer(serializer_class),
+            queryset=queryset.order_by('pk'),
+            filename=filename,
+            output=output,
+            chunk_size=self.chunk_size
+        )
+
+    @action(["GET"], detail=False, url_name='loans', url_path='loans')
+    def loans(self, request, *args, **kwargs):
+        return self.get_export_response(LoanSerializer, Loan.objects.all(), filename='loans')
+
+    @action(["GET"], detail=False, url_name='amortizations', url_path='amortizations')
+    def amortizations(self, request, *args, **kwargs):
+        return self.get_export_response(
+            AmortizationScheduleSerializer, AmortizationSchedule.objects.all(), filename='amortizations'
+        )
+
+
+class AsyncLoanListView(AsyncListAPIView):
+    fallback_view = LoanViewSet.as_view({'get': 'list', 'post': 'create'})
+    fallback_params = ('format', EXPAND_PARAM, FIELDS_PARAM, OMIT_PARAM)
+    permission_classes = LoanViewSet.permission_classes
+    queryset = Loan.objects.all()
+    serializer_class = LoanSerializer
+
+    def get_queryset(self):
+        return super().get_queryset().filter(customer=self.request.user)
+
+
+class AsyncLoanDetailView(AsyncRetrieveAPIView):
+    fallback_view = LoanViewSet.as_view(
+        {'get': 'retrieve', 'put': 'update', 'patch': 'partial_update', 'delete': 'destroy'}
+    )
+    fallback_params = ('format', EXPAND_PARAM, FIELDS_PARAM, OMIT_PARAM)
+    permission_classes = LoanViewSet.permission_classes
+    queryset = Loan.objects.all()
+    serializer_class = LoanSerializer
+
+    def get_queryset(self):
+        return super().get_queryset().filter(customer=self.request.user)
+
+
+class AsyncAmortizationScheduleListView(AsyncListAPIView):
+    fallback_view = AmortizationScheduleViewSet.as_view({'get': 'list'})
+    permission_classes = AmortizationScheduleViewSet.permission_classes
+    queryset = AmortizationSchedule.objects.all()
+    serializer_class = AmortizationScheduleSerializer
+
+    def get_queryset(self):
+        return super().get_queryset().filter(loan__customer__id=self.request.user.id)
@@ -0,0 +1,95 @@
+import threading
+from functools import partial
+
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+
+
+class DeferredProcessor:
+    """
+    Collect the ids touched by model saves during a transaction and hand each registered
+    handler its set of ids once, when the transaction commits. A thousand saves of the
+    same loan cost one handler call instead of a thousand. Ids are kept apart per
+    savepoint, so the ids of a rolled back savepoint never reach a handler. Outside of a
+    transaction the handlers run right away, like a plain receiver would.
+    """
+
+    def __init__(self):
+        self.handlers = {}
+        self.local = threading.local()
+
+    def register(self, kind):
+        # Handlers run in registration order on every flush
+        def decorator(handler):
+            self.handlers[kind] = handler
+            return handler
+        return decorator
+
+    def get_state(self, using):
+        states = self.local.__dict__.setdefault('states', {})
+        return states.setdefault(using, {'batches': {}, 'queue': None, 'flushing': None})
+
+    def add(self, kind, value, using=None):
+        self.extend(kind, [value], using=using)
+
+    def extend(self, kind, values, using=None):
+        values = {value for value in values if value is not None}
+        if not values:
+            return
+        using = using or DEFAULT_DB_ALIAS
+        state = self.get_state(using)
+
+        # Values added by a handler go to the batch being flushed, the later handlers pick them up
+        if state['flushing'] is not None:
+            state['flushing'].setdefault(kind, set()).update(values)
+            return
+
+        connection = connections[using]
+        if not connection.in_atomic_block:
+            self.flush({kind: values}, using)
+            return
+
+        batch = self.get_batch(connection, state)
+        if kind not in batch:
+            # Queued again for each kind joining the batch, the first callback to run drains it
+            self.queue_flush(batch, connection, state, using)
+        batch.setdefault(kind, set()).update(values)
+
+    def get_batch(self, connection, state):
+        """
+        Batch of the innermost savepoint. Its callbacks are queued under that savepoint, so
+        rolling the savepoint back drops the callbacks and the ids with them.
+        """
+        # Rollbacks and commits replace the queue, the batches of the callbacks it no longer holds are gone
+        if state['queue'] is not connection.run_on_commit:
+            queued = {id(callback) for _, callback, _ in connection.run_on_commit}
+            state['batches'] = {
+                key: (batch, callback) for key, (batch, callback) in state['batches'].items() if id(callback) in queued
+            }
+            state['queue'] = connection.run_on_commit
+
+        key = tuple(connection.savepoint_ids)
+        if key not in state['batches']:
+            state['batches'][key] = ({}, None)
+        return state['batches'][key][0]
+
+    def queue_flush(self, batch, connection, state, using):
+        callback = partial(self.flush, batch, using)
+        transaction.on_commit(callback, using=using)
+        state['batches'][tuple(connection.savepoint_ids)] = (batch, callback)
+
+    def flush(self, batch, using=DEFAULT_DB_ALIAS):
+        state = self.get_state(using)
+        # Values added after this point start a batch of their own
+        state['batches'] = {key: value for key, value in state['batches'].items() if value[0] is not batch}
+        state['flushing'] = batch
+        try:
+            while batch.keys() & self.handlers.keys():
+                for kind, handler in self.handlers.items():
+                    values = batch.pop(kind, None)
+                    if values:
+                        handler(values)
+        finally:
+            state['flushing'] = None
+
+
+deferred = DeferredProcessor()
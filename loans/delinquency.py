@@ -0,0 +1,74 @@
+"""
+Days past due of the loans with overdue installments, kept in ``LoanDelinquency`` by a
+daily ``manage.py update_delinquencies``.
+
+An installment is overdue once its ``payment_date`` passed unpaid. A run reads only the
+installments that fell due since the previous run, through the (is_paid, payment_date)
+index, and recomputes those loans along with the ones already delinquent from their own
+installments: loans paid up since are cured and dropped, the others get the days past
+due and bucket of their oldest overdue installment. The rest of the book is not read.
+"""
+from django.db import transaction
+
+from loans.enums import DelinquencyBucket
+from loans.models import AmortizationSchedule, LoanDelinquency, DelinquencyRun
+
+
+UPDATED_FIELDS = ('oldest_due_date', 'overdue_installments', 'overdue_amount', 'days_past_due', 'bucket', 'as_of',
+                  'update_at')
+
+
+def build_delinquency(totals, as_of):
+    days_past_due = (as_of - totals['oldest_due_date']).days
+    return LoanDelinquency(
+        loan_id=totals['loan_id'],
+        oldest_due_date=totals['oldest_due_date'],
+        overdue_installments=totals['overdue_installments'],
+        overdue_amount=totals['overdue_amount'],
+        days_past_due=days_past_due,
+        bucket=DelinquencyBucket.for_days_past_due(days_past_due),
+        as_of=as_of
+    )
+
+
+@transaction.atomic
+def update_delinquencies(as_of, batch_size=500):
+    """
+    Bring ``LoanDelinquency`` up to ``as_of`` and record the run, the next one starts there
+    """
+    # The run made last rather than the latest date: a back-dated run dropped the loans whose
+    # installments fell due after its date, the next run reads those installments again
+    previous = DelinquencyRun.objects.order_by('-id').first()
+    newly_overdue = AmortizationSchedule.objects.get_newly_overdue(
+        due_from=previous.as_of if previous else None,
+        due_before=as_of
+    )
+    newly_overdue_loan_ids = newly_overdue.values_list('loan_id', flat=True).distinct()
+    loan_ids = sorted(set(newly_overdue_loan_ids) | set(LoanDelinquency.objects.get_loan_ids()))
+
+    delinquent, cured = 0, 0
+    for start in range(0, len(loan_ids), batch_size):
+        batch = loan_ids[start:start + batch_size]
+        delinquencies = [
+            build_delinquency(totals, as_of)
+            for totals in AmortizationSchedule.objects.get_overdue_totals(loan_ids=batch, due_before=as_of)
+        ]
+        LoanDelinquency.objects.bulk_create(
+            delinquencies,
+            update_conflicts=True,
+            unique_fields=['loan'],
+            update_fields=UPDATED_FIELDS
+        )
+        cured += LoanDelinquency.objects.filter(
+            loan__id__in=batch
+        ).exclude(
+            loan__id__in=[delinquency.loan_id for delinquency in delinquencies]
+        ).delete()[0]
+        delinquent += len(delinquencies)
+
+    return DelinquencyRun.objects.create(
+        as_of=as_of,
+        newly_overdue=newly_overdue.count(),
+        delinquent_loans=delinquent,
+        cured_loans=cured
+    )
@@ -8,3 +8,44 @@ class LoanStatus(models.IntegerChoices):
     REJECTED = 2, _("Rejected")
     ACTIVE = 3, _("Active")
     COMPLETED = 4, _("Completed")
+
+    @classmethod
+    def get_sources(cls, status):
+        return tuple(source for source, targets in LOAN_STATUS_TRANSITIONS.items() if status in targets)
+
+
+# Statuses a loan may move to from each status, ``Loan.transition`` refuses any other change
+LOAN_STATUS_TRANSITIONS = {
+    LoanStatus.PENDING: (LoanStatus.APPROVED, LoanStatus.REJECTED),
+    LoanStatus.APPROVED: (LoanStatus.ACTIVE, LoanStatus.COMPLETED),
+    LoanStatus.ACTIVE: (LoanStatus.COMPLETED,),
+    LoanStatus.REJECTED: (),
+    LoanStatus.COMPLETED: (),
+}
+
+
+class DelinquencyBucket(models.IntegerChoices):
+    DAYS_1_30 = 1, _("1-30 Days Past Due")
+    DAYS_31_60 = 2, _("31-60 Days Past Due")
+    DAYS_61_90 = 3, _("61-90 Days Past Due")
+    DAYS_90_PLUS = 4, _("90+ Days Past Due")
+
+    @classmethod
+    def for_days_past_due(cls, days):
+        for bucket, last_day in DELINQUENCY_BUCKET_LAST_DAYS.items():
+            if days <= last_day:
+                return bucket
+        return cls.DAYS_90_PLUS
+
+
+# Last day past due of each bucket, later days fall in ``DAYS_90_PLUS``
+DELINQUENCY_BUCKET_LAST_DAYS = {
+    DelinquencyBucket.DAYS_1_30: 30,
+    DelinquencyBucket.DAYS_31_60: 60,
+    DelinquencyBucket.DAYS_61_90: 90,
+}
+
+
+class PrepaymentMode(models.TextChoices):
+    KEEP_TERM = 'term', _("Keep Term")
+    KEEP_PAYMENT = 'payment', _("Keep Payment")
@@ -0,0 +1,5 @@
+from django.dispatch import Signal
+
+
+# Sent by ``Loan.objects.transition`` with the ``loan_ids`` it moved to ``status`` and the database alias as ``using``
+loan_status_changed = Signal()
@@ -0,0 +1,360 @@
+import json
+import time
+import uuid
+import queue
+import random
+import threading
+import http.client
+from decimal import Decimal
+from statistics import quantiles
+
+from django.db import connections
+from django.test import Client
+from django.urls import reverse
+
+from core.testing import get_authorization
+from accounts.enums import UserRole
+from accounts.models import User
+from loans.models import LoanFund, LoanType
+from loans.seeding import BookSeeder
+
+
+# Upper bounds in milliseconds of the latency histogram buckets, the last one takes the rest
+HISTOGRAM_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000, float('inf'))
+# Distinct error messages kept by endpoint, to tell why requests failed
+ERROR_SAMPLES = 5
+# Measures compared between two reports, a rise of any of them is a regression
+COMPARED_METRICS = ('throughput', 'p50', 'p95', 'p99', 'errors')
+SCENARIO = 'scenario'
+
+
+def seed_load_test(customers, password, amount, installments, using='default'):
+    """
+    Seed the users of a load test: one personnel and ``customers`` customers sharing
+    ``password``, a loan type accepting ``amount`` over ``installments`` months and a fund
+    large enough for every loan the run applies for.
+    """
+    BookSeeder(customers=customers, loans=0, providers=0, personnel=1, funds=0, password=password,
+               using=using).seed()
+    loan_type = LoanType.objects.using(using).create(
+        name='Load Test',
+        min_amount=amount,
+        max_amount=amount,
+        interest_rate=10.0,
+        min_duration_months=installments,
+        max_duration_months=installments
+    )
+    LoanFund.objects.using(using).create(amount=Decimal('1000000000000.00'), duration_months=installments)
+
+    users = User.objects.using(using).order_by('pk')
+    return (
+        list(users.filter(role=UserRole.LOAN_CUSTOMER).values_list('username', flat=True)),
+        users.filter(role=UserRole.LOAN_PERSONNEL).values_list('username', flat=True).first(),
+        loan_type.pk
+    )
+
+
+class ClientTransport:
+    """
+    Send requests through the Django test client, in the process running the load test
+    """
+
+    def __init__(self):
+        # Server errors are measured like any other response instead of raised
+        self.client = Client(raise_request_exception=False)
+
+    def __call__(self, method, path, body, authorization):
+        response = self.client.generic(method, path, data=json.dumps(body) if body is not None else '',
+                                       content_type='application/json', HTTP_AUTHORIZATION=authorization)
+        return response.status_code, response.content
+
+    def close(self):
+        # Requests made from a load test thread open a database connection of their own
+        connections.close_all()
+
+
+class HTTPTransport:
+    """
+    Send requests to a server listening on ``host:port``, over a new connection each
+    """
+
+    def __init__(self, host, port, timeout=30):
+        self.host = host
+        self.port = port
+        self.timeout = timeout
+
+    def __call__(self, method, path, body, authorization):
+        connection = http.client.HTTPConnection(self.host, self.port, timeout=self.timeout)
+        try:
+            connection.request(method, path, body=json.dumps(body) if body is not None else None, headers={
+                'Authorization': authorization,
+                'Accept': 'application/json',
+                'Content-Type': 'application/json',
+            })
+            response = connection.getresponse()
+            return response.status, response.read()
+        finally:
+            connection.close()
+
+    def close(self):
+        pass
+
+
+class ScenarioError(Exception):
+    pass
+
+
+class Recorder:
+    """
+    Collect the latency and outcome of every request, by endpoint, across threads
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.latencies = {}
+        self.errors = {}
+        self.error_samples = {}
+        self.started = time.perf_counter()
+        self.finished = None
+
+    def record(self, endpoint, seconds, error=None):
+        with self.lock:
+            self.latencies.setdefault(endpoint, []).append(seconds)
+            self.errors.setdefault(endpoint, 0)
+            if error is not None:
+                self.errors[endpoint] += 1
+                samples = self.error_samples.setdefault(endpoint, [])
+                if len(samples) < ERROR_SAMPLES and error not in samples:
+                    samples.append(error)
+
+    def stop(self):
+        self.finished = time.perf_counter()
+
+    def build_report(self, **details):
+        elapsed = (self.finished or time.perf_counter()) - self.started
+        endpoints = {}
+        for endpoint, latencies in sorted(self.latencies.items()):
+            endpoints[endpoint] = get_latency_stats(latencies, self.errors[endpoint], elapsed)
+            if endpoint in self.error_samples:
+                endpoints[endpoint]['error_samples'] = self.error_samples[endpoint]
+        return {**details, 'elapsed': round(elapsed, 3), 'endpoints': endpoints}
+
+
+def get_latency_stats(latencies, errors, elapsed):
+    milliseconds = sorted(latency * 1000 for latency in latencies)
+    # The inclusive method keeps the percentiles within the measured range for small samples
+    percentiles = quantiles(milliseconds, n=100, method='inclusive') if len(milliseconds) > 1 else milliseconds * 99
+
+    histogram, position = [], 0
+    for bound in HISTOGRAM_BUCKETS:
+        count = 0
+        while position < len(milliseconds) and milliseconds[position] <= bound:
+            count += 1
+            position += 1
+        histogram.append([None if bound == float('inf') else bound, count])
+
+    return {
+        'count': len(milliseconds),
+        'errors': errors,
+        'throughput': round(len(milliseconds) / elapsed, 3) if elapsed else 0,
+        'mean': round(sum(milliseconds) / len(milliseconds), 3),
+        'p50': round(percentiles[49], 3),
+        'p95': round(percentiles[94], 3),
+        'p99': round(percentiles[98], 3),
+        'max': round(milliseconds[-1], 3),
+        'histogram': histogram,
+    }
+
+
+def compare_reports(baseline, report):
+    """
+    Rows of ``(endpoint, metric, baseline, current, change)`` for the endpoints of both
+    reports, ``change`` is the relative difference or ``None`` when the baseline is zero
+    """
+    rows = []
+    for endpoint, stats in report['endpoints'].items():
+        before = baseline['endpoints'].get(endpoint)
+        if before is None:
+            continue
+        for metric in COMPARED_METRICS:
+            change = (stats[metric] - before[metric]) / before[metric] if before[metric] else None
+            rows.append((endpoint, metric, before[metric], stats[metric], change))
+    return rows
+
+
+class LoanScenario:
+    """
+    One customer journey: apply for a loan, have it approved by personnel, pay every
+    installment and read the loans back, each request timed under its endpoint template.
+    """
+
+    def __init__(self, transport, recorder, customer, personnel, loan_type_id, amount, installments):
+        self.transport = transport
+        self.recorder = recorder
+        self.customer = customer
+        self.personnel = personnel
+        self.loan_type_id = loan_type_id
+        self.amount = amount
+        self.installments = installments
+
+    def request(self, endpoint, method, path, body=None, authorization=None, expected=200):
+        started = time.perf_counter()
+        try:
+            status, content = self.transport(method, path, body, authorization or self.customer)
+        except OSError as error:
+            self.recorder.record(endpoint, time.perf_counter() - started, error=str(error))
+            raise ScenarioError(error)
+        if status != expected:
+            error = f'{status} {content[:200].decode(errors="replace")}'
+            self.recorder.record(endpoint, time.perf_counter() - started, error=error)
+            raise ScenarioError(error)
+        self.recorder.record(endpoint, time.perf_counter() - started)
+        return json.loads(content) if content else None
+
+    def run(self):
+        loan = self.request('POST /api/loans/', 'POST', reverse('loans:loan-list'), body={
+            'loan_type': self.loan_type_id,
+            'amount': str(self.amount),
+            'duration_months': self.installments,
+        }, expected=201)
+
+        self.request('GET /api/loans/review/', 'GET', reverse('loans:loan_review-list'),
+                     authorization=self.personnel)
+        self.request('POST /api/loans/review/{id}/approve/', 'POST',
+                     reverse('loans:loan_review-approve', kwargs={'pk': loan['id']}), authorization=self.personnel)
+
+        detail = self.request('GET /api/loans/{id}/?expand=amortizations', 'GET',
+                              reverse('loans:loan-detail', kwargs={'pk': loan['id']}) + '?expand=amortizations')
+        # Installments are paid in the order they fall due
+        for amortization in sorted(detail['amortizations'], key=lambda amortization: amortization['payment_date']):
+            self.request('POST /api/loans/amortization/{id}/pay/', 'POST',
+                         reverse('loans:amortization-pay', kwargs={'pk': amortization['id']}),
+                         body={'transaction_id': f'LOAD-{uuid.uuid4().hex}'})
+
+        self.request('GET /api/loans/', 'GET', reverse('loans:loan-list'))
+        self.request('GET /api/loans/?expand=amortizations', 'GET', reverse('loans:loan-list') + '?expand=amortizations')
+        self.request('GET /api/loans/dashboard/', 'GET', reverse('loans:loan-dashboard'))
+
+
+class LoadTest:
+    """
+    Run ``LoanScenario`` under a closed or an open concurrency model.
+
+    Closed: ``users`` virtual users each run scenarios back to back. Open: scenarios
+    arrive at ``rate`` per second, Poisson distributed, and run on up to ``users``
+    threads; their ``scenario`` latency counts from the arrival, so a saturated server
+    shows up as queueing instead of a lower arrival rate.
+
+    Each virtual user applies as a customer of its own, customers are handed out and
+    taken back through a queue. The run stops after ``duration`` seconds or once
+    ``iterations`` scenarios started, whichever comes first.
+    """
+
+    def __init__(self, transport_factory, customers, personnel, password, loan_type_id, amount, installments,
+                 users=10, duration=30.0, iterations=None, rate=None, seed=None):
+        self.transport_factory = transport_factory
+        self.customers = customers
+        self.personnel = get_authorization(personnel, password)
+        self.password = password
+        self.loan_type_id = loan_type_id
+        self.amount = amount
+        self.installments = installments
+        self.users = users
+        self.duration = duration
+        self.iterations = iterations
+        self.rate = rate
+        self.random = random.Random(seed)
+        self.recorder = Recorder()
+        self.customer_queue = queue.Queue()
+        for username in customers[:users]:
+            self.customer_queue.put(get_authorization(username, password))
+        self.local = threading.local()
+        self.lock = threading.Lock()
+        self.started_scenarios = 0
+        self.failed_scenarios = 0
+        self.deadline = None
+
+    def run(self):
+        self.recorder = Recorder()
+        self.deadline = time.perf_counter() + self.duration
+        if self.rate:
+            self.run_open()
+        else:
+            self.run_closed()
+        self.recorder.stop()
+        return self.recorder.build_report(
+            model='open' if self.rate else 'closed',
+            users=self.users,
+            rate=self.rate,
+            scenarios=self.started_scenarios,
+            failed_scenarios=self.failed_scenarios,
+            installments=self.installments
+        )
+
+    def take_iteration(self):
+        with self.lock:
+            if time.perf_counter() >= self.deadline:
+                return False
+            if self.iterations is not None and self.started_scenarios >= self.iterations:
+                return False
+            self.started_scenarios += 1
+            return True
+
+    def get_transport(self):
+        if not hasattr(self.local, 'transport'):
+            self.local.transport = self.transport_factory()
+        return self.local.transport
+
+    def run_scenario(self, arrived):
+        customer = self.customer_queue.get()
+        try:
+            LoanScenario(self.get_transport(), self.recorder, customer, self.personnel, self.loan_type_id,
+                         self.amount, self.installments).run()
+        except ScenarioError as error:
+            with self.lock:
+                self.failed_scenarios += 1
+            self.recorder.record(SCENARIO, time.perf_counter() - arrived, error=str(error))
+        else:
+            self.recorder.record(SCENARIO, time.perf_counter() - arrived)
+        finally:
+            self.customer_queue.put(customer)
+
+    def run_user(self):
+        try:
+            while self.take_iteration():
+                self.run_scenario(time.perf_counter())
+        finally:
+            self.get_transport().close()
+
+    def run_closed(self):
+        threads = [threading.Thread(target=self.run_user) for _ in range(self.users)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+    def run_worker(self, arrivals):
+        try:
+            while (arrival := arrivals.get()) is not None:
+                self.run_scenario(arrival)
+        finally:
+            self.get_transport().close()
+
+    def run_open(self):
+        arrivals = queue.Queue()
+        threads = [threading.Thread(target=self.run_worker, args=(arrivals,)) for _ in range(self.users)]
+        for thread in threads:
+            thread.start()
+
+        arrival = time.perf_counter()
+        while True:
+            time.sleep(max(arrival - time.perf_counter(), 0))
+            if not self.take_iteration():
+                break
+            arrivals.put(arrival)
+            arrival += self.random.expovariate(self.rate)
+
+        for _ in threads:
+            arrivals.put(None)
+        for thread in threads:
+            thread.join()
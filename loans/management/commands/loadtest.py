@@ -0,0 +1,173 @@
+import os
+import sys
+import json
+import time
+import socket
+import tempfile
+import subprocess
+from decimal import Decimal
+
+from django.conf import settings
+from django.db import connections, DEFAULT_DB_ALIAS
+from django.test.utils import override_settings
+from django.core.management.base import BaseCommand, CommandError
+
+from loans.loadtest import ClientTransport, HTTPTransport, LoadTest, compare_reports, seed_load_test
+
+
+PASSWORD = 'loadtest'
+# A cheap hasher, so Basic authentication does not dominate the measured requests
+PASSWORD_HASHERS = ['django.contrib.auth.hashers.MD5PasswordHasher']
+
+
+class Command(BaseCommand):
+    help = ('Drive loan scenarios against a throwaway database, through the test client or a local WSGI or ASGI '
+            'server, and report the throughput and latency percentiles of each endpoint.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--server', choices=('client', 'wsgi', 'asgi'), default='client',
+                            help='In process test client, runserver or uvicorn')
+        parser.add_argument('--users', type=int, default=10, help='Virtual users, the threads sending requests')
+        parser.add_argument('--duration', type=float, default=30, help='Seconds to keep starting scenarios')
+        parser.add_argument('--iterations', type=int, help='Stop after this many scenarios')
+        parser.add_argument('--rate', type=float,
+                            help='Scenarios started per second, an open model instead of users looping')
+        parser.add_argument('--installments', type=int, default=12, help='Installments of each loan')
+        parser.add_argument('--amount', default='5000.00', help='Amount of each loan')
+        parser.add_argument('--port', type=int, default=8765, help='Port of the wsgi and asgi servers')
+        parser.add_argument('--seed', type=int, help='Random seed of the open model arrivals')
+        parser.add_argument('--output', help='Write the JSON report to this file')
+        parser.add_argument('--compare', help='JSON report of a previous run to compare with')
+
+    def handle(self, *args, **options):
+        for name in ('users', 'installments'):
+            if options[name] < 1:
+                raise CommandError(f'--{name} must be a positive number')
+        if options['rate'] is not None and options['rate'] <= 0:
+            raise CommandError('--rate must be a positive number')
+        try:
+            amount = Decimal(options['amount'])
+        except ArithmeticError:
+            raise CommandError(f'"{options["amount"]}" is not an amount')
+
+        baseline = None
+        if options['compare']:
+            try:
+                with open(options['compare']) as file:
+                    baseline = json.load(file)
+            except (OSError, ValueError) as error:
+                raise CommandError(error)
+
+        connection = connections[DEFAULT_DB_ALIAS]
+        if connection.vendor != 'sqlite' and options['server'] != 'client':
+            raise CommandError('The wsgi and asgi servers share a SQLite database file only')
+
+        # The test client sends its requests to the ``testserver`` host
+        allowed_hosts = [*settings.ALLOWED_HOSTS, 'testserver']
+        with tempfile.TemporaryDirectory() as directory, \
+                override_settings(PASSWORD_HASHERS=PASSWORD_HASHERS, ALLOWED_HOSTS=allowed_hosts):
+            test_settings = connection.settings_dict['TEST']
+            old_test_name = test_settings.get('NAME')
+            if connection.vendor == 'sqlite':
+                # A file instead of memory, shared by the threads and the server process
+                test_settings['NAME'] = os.path.join(directory, 'loadtest.sqlite3')
+            old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+            try:
+                report = self.run(connection, amount, options)
+            finally:
+                connection.creation.destroy_test_db(old_name, verbosity=0)
+                test_settings['NAME'] = old_test_name
+
+        if options['output']:
+            with open(options['output'], 'w') as file:
+                json.dump(report, file, indent=2)
+
+        self.write_report(report)
+        if baseline is not None:
+            self.write_comparison(compare_reports(baseline, report))
+
+    def run(self, connection, amount, options):
+        if connection.vendor == 'sqlite':
+            # Readers no longer wait for the writers
+            with connection.cursor() as cursor:
+                cursor.execute('PRAGMA journal_mode=WAL')
+
+        customers, personnel, loan_type_id = seed_load_test(
+            customers=options['users'],
+            password=PASSWORD,
+            amount=amount,
+            installments=options['installments']
+        )
+        connection.close()
+
+        server = None
+        if options['server'] == 'client':
+            transport_factory = ClientTransport
+        else:
+            server = self.start_server(options['server'], options['port'], connection.settings_dict['NAME'])
+            transport_factory = lambda: HTTPTransport('127.0.0.1', options['port'])  # noqa: E731
+
+        load_test = LoadTest(
+            transport_factory=transport_factory,
+            customers=customers,
+            personnel=personnel,
+            password=PASSWORD,
+            loan_type_id=loan_type_id,
+            amount=amount,
+            installments=options['installments'],
+            users=options['users'],
+            duration=options['duration'],
+            iterations=options['iterations'],
+            rate=options['rate'],
+            seed=options['seed']
+        )
+        try:
+            return {'server': options['server'], **load_test.run()}
+        finally:
+            if server is not None:
+                server.terminate()
+                server.wait()
+
+    def start_server(self, kind, port, database):
+        env = {**os.environ, 'DJANGO_SETTINGS_MODULE': 'benchmarks.settings', 'BENCHMARK_DATABASE': database}
+        if kind == 'wsgi':
+            command = [sys.executable, 'manage.py', 'runserver', '--noreload', f'127.0.0.1:{port}']
+        else:
+            command = [sys.executable, '-m', 'uvicorn', 'core.asgi:application', '--port', str(port),
+                       '--log-level', 'warning', '--no-access-log']
+        server = subprocess.Popen(command, cwd=settings.BASE_DIR, env=env,
+                                  stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+        deadline = time.monotonic() + 30
+        while time.monotonic() < deadline:
+            if server.poll() is not None:
+                raise CommandError(f'The {kind} server exited with code {server.returncode}')
+            try:
+                socket.create_connection(('127.0.0.1', port), timeout=1).close()
+                return server
+            except OSError:
+                time.sleep(0.2)
+        server.terminate()
+        raise CommandError(f'The {kind} server did not listen on port {port}')
+
+    def write_report(self, report):
+        self.stdout.write(
+            f'{report["server"]} server, {report["model"]} model, {report["users"]} users: '
+            f'{report["scenarios"]} scenarios, {report["failed_scenarios"]} failed in {report["elapsed"]:.2f}s'
+        )
+        self.stdout.write(f'{"endpoint":<48} {"count":>7} {"errors":>6} {"req/s":>9} '
+                          f'{"p50 ms":>9} {"p95 ms":>9} {"p99 ms":>9} {"max ms":>9}')
+        for endpoint, stats in report['endpoints'].items():
+            self.stdout.write(
+                f'{endpoint:<48} {stats["count"]:>7} {stats["errors"]:>6} {stats["throughput"]:>9.1f} '
+                f'{stats["p50"]:>9.1f} {stats["p95"]:>9.1f} {stats["p99"]:>9.1f} {stats["max"]:>9.1f}'
+            )
+
+    def write_comparison(self, rows):
+        self.stdout.write(f'{"endpoint":<48} {"metric":<10} {"baseline":>10} {"current":>10} {"change":>8}')
+        for endpoint, metric, before, after, change in rows:
+            # Less throughput, more latency or more errors is a regression
+            regression = change is not None and (change < 0 if metric == 'throughput' else change > 0)
+            line = (f'{endpoint:<48} {metric:<10} {before:>10.1f} {after:>10.1f} '
+                    f'{"-" if change is None else format(change, "+.1%"):>8}')
+            self.stdout.write(self.style.ERROR(line) if regression else line)
@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from loans.models import IdempotencyKey
+
+
+class Command(BaseCommand):
+    help = 'Delete expired idempotency keys in bounded batches.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000, help='Keys deleted per statement')
+
+    def handle(self, *args, **options):
+        if options['batch_size'] < 1:
+            raise CommandError('--batch-size must be a positive number')
+
+        total = 0
+        while deleted := IdempotencyKey.objects.purge_expired(limit=options['batch_size']):
+            total += deleted
+        self.stdout.write(self.style.SUCCESS(f'Deleted {total} expired idempotency keys'))
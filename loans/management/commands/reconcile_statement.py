@@ -0,0 +1,49 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from loans.reconciliation import StatementReconciler
+
+
+class Command(BaseCommand):
+    help = 'Reconcile a CSV bank statement against the unpaid amortizations and report the mismatches.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('file', help='CSV statement with the columns date,amount,reference,transaction_id')
+        parser.add_argument('--report', help='Write the mismatch report to this file instead of stdout')
+        parser.add_argument('--batch-size', type=int, default=5000, help='Statement lines matched per query')
+        parser.add_argument('--tolerance-days', type=int, default=5,
+                            help='Allowed distance between the statement and the payment dates')
+        parser.add_argument('--dry-run', action='store_true', help='Match the statement without paying anything')
+
+    def handle(self, *args, **options):
+        if options['batch_size'] < 1:
+            raise CommandError('--batch-size must be a positive number')
+
+        report = open(options['report'], 'w', newline='') if options['report'] else self.stdout
+        try:
+            with open(options['file'], newline='') as statement:
+                reconciler = StatementReconciler(
+                    report=report,
+                    batch_size=options['batch_size'],
+                    tolerance_days=options['tolerance_days'],
+                    dry_run=options['dry_run']
+                )
+                started = time.perf_counter()
+                reconciler.reconcile(statement)
+                elapsed = time.perf_counter() - started
+        except (OSError, ValueError) as error:
+            raise CommandError(error)
+        finally:
+            if report is not self.stdout:
+                report.close()
+
+        summary = (
+            f'{reconciler.lines} lines, {reconciler.matched} matched, {reconciler.mismatched} mismatched '
+            f'in {elapsed:.2f}s{" (dry run)" if options["dry_run"] else ""}'
+        )
+        # Keep stdout a valid CSV report when no report file is given
+        if options['report']:
+            self.stdout.write(self.style.SUCCESS(summary))
+        else:
+            self.stderr.write(summary, style_func=self.style.SUCCESS)
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from loans.utils import refresh_loan_book_summary
+
+
+class Command(BaseCommand):
+    help = ('Recompute the loan book gauges served at /metrics, scrapes read them from the cache. Meant to run '
+            'every minute, with a cache shared by the workers.')
+
+    def handle(self, *args, **options):
+        summary = refresh_loan_book_summary()
+        self.stdout.write(self.style.SUCCESS(
+            f'{sum(summary["loans"].values())} loans, {summary["outstanding_principal"]} outstanding principal'
+        ))
@@ -0,0 +1,71 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from loans.enums import LoanStatus
+from loans.seeding import BookSeeder, parse_distribution
+
+
+def parse_status(name):
+    try:
+        return LoanStatus[name.upper()]
+    except KeyError:
+        raise ValueError(f"Unknown status \"{name}\", choose from {', '.join(s.name.lower() for s in LoanStatus)}")
+
+
+class Command(BaseCommand):
+    help = 'Seed a synthetic loan book with bulk inserts, for load testing.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--customers', type=int, required=True, help='Customer users to create')
+        parser.add_argument('--loans', type=int, required=True, help='Loans to create, spread over the customers')
+        parser.add_argument('--providers', type=int, default=10, help='Provider users to create')
+        parser.add_argument('--personnel', type=int, default=5, help='Personnel users to create')
+        parser.add_argument('--fund-types', type=int, default=3, help='Loan fund types to create')
+        parser.add_argument('--funds', type=int, default=50, help='Loan funds to create')
+        parser.add_argument('--loan-types', type=int, default=5, help='Loan types to create')
+        parser.add_argument('--statuses',
+                            help='Loan status weights, e.g. approved=0.5,active=0.3,completed=0.1,pending=0.1')
+        parser.add_argument('--progress',
+                            help='Weights of the paid share of approved and active loans, e.g. 0=0.5,0.5=0.5')
+        parser.add_argument('--password', default='defaultpassword', help='Password of every created user')
+        parser.add_argument('--seed', type=int, help='Random seed, for a reproducible book')
+        parser.add_argument('--batch-size', type=int, default=10000, help='Loans inserted per batch')
+
+    def handle(self, *args, **options):
+        for name in ('customers', 'loans', 'batch_size'):
+            if options[name] < (1 if name == 'batch_size' else 0):
+                raise CommandError(f'--{name.replace("_", "-")} must be a positive number')
+        if options['loans'] and not options['customers']:
+            raise CommandError('--loans needs at least one customer')
+
+        try:
+            statuses = parse_distribution(options['statuses'], parse_status) if options['statuses'] else None
+            progress = parse_distribution(options['progress'], float) if options['progress'] else None
+        except ValueError as error:
+            raise CommandError(error)
+        if progress and not all(0 <= share <= 1 for share in progress):
+            raise CommandError('--progress shares must be between 0 and 1')
+
+        seeder = BookSeeder(
+            customers=options['customers'],
+            loans=options['loans'],
+            providers=options['providers'],
+            personnel=options['personnel'],
+            fund_types=options['fund_types'],
+            funds=options['funds'],
+            loan_types=options['loan_types'],
+            statuses=statuses,
+            progress=progress,
+            password=options['password'],
+            seed=options['seed'],
+            batch_size=options['batch_size']
+        )
+        started = time.perf_counter()
+        seeder.seed()
+        elapsed = time.perf_counter() - started
+
+        self.stdout.write(self.style.SUCCESS(
+            f'{options["customers"]} customers, {options["loans"]} loans, {seeder.schedules} schedules '
+            f'in {elapsed:.2f}s'
+        ))
@@ -0,0 +1,29 @@
+from datetime import date
+
+from django.utils import timezone
+from django.core.management.base import BaseCommand, CommandError
+
+from loans.delinquency import update_delinquencies
+
+
+class Command(BaseCommand):
+    help = ('Track the loans with overdue installments, reading only the installments that fell due since the '
+            'previous run. Meant to run daily.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--date', help='Day to compute the days past due on, YYYY-MM-DD, today by default')
+        parser.add_argument('--batch-size', type=int, default=500, help='Loans recomputed per query')
+
+    def handle(self, *args, **options):
+        if options['batch_size'] < 1:
+            raise CommandError('--batch-size must be a positive number')
+        try:
+            as_of = date.fromisoformat(options['date']) if options['date'] else timezone.localdate()
+        except ValueError as error:
+            raise CommandError(error)
+
+        run = update_delinquencies(as_of=as_of, batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(
+            f'{run.delinquent_loans} delinquent loans as of {run.as_of}, {run.newly_overdue} installments newly '
+            f'overdue, {run.cured_loans} loans cured'
+        ))
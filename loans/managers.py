@@ -1,6 +1,9 @@
-from django.db import models
+from django.db import models, connections, transaction
+from django.db.models.functions import Cast
+from django.utils import timezone
 
 from loans.enums import LoanStatus
+from loans.events import loan_status_changed
 
 
 class LoanFundManager(models.Manager):
@@ -26,6 +29,67 @@ class LoanManager(models.Manager):
             models.Q(status=LoanStatus.COMPLETED)
         )
 
+    def get_user_dashboard_loans(self, customer):
+        unpaid = models.Q(amortizations__is_paid=False)
+        return self.get_user_active_loans(customer=customer).annotate(
+            outstanding_principal=models.Sum('amortizations__principal_amount', filter=unpaid, default=0),
+            outstanding_payment=models.Sum('amortizations__total_payment', filter=unpaid, default=0),
+            unpaid_installments=models.Count('amortizations', filter=unpaid)
+        ).order_by('id')
+
+    def transition(self, loan_ids, to, condition=None):
+        """
+        Move the loans of ``loan_ids`` whose status allows it, and that match ``condition``,
+        to the ``to`` status. Returns the ids of the loans it moved, those of a concurrent
+        change are left out.
+        """
+        queryset = self.get_queryset().filter(
+            id__in=loan_ids,
+            status__in=LoanStatus.get_sources(to)
+        ).order_by()
+        if condition is not None:
+            queryset = queryset.filter(condition)
+
+        connection = connections[self.db]
+        if connection.vendor in ('postgresql', 'sqlite') and connection.features.can_return_columns_from_insert:
+            moved_ids = self.update_returning(queryset, to, connection)
+        else:
+            # No UPDATE ... RETURNING, the rows are locked until the UPDATE so none changes in between
+            with transaction.atomic(using=self.db):
+                moved_ids = list(queryset.select_for_update().values_list('id', flat=True))
+                if moved_ids:
+                    self.get_queryset().filter(id__in=moved_ids).update(status=to, update_at=timezone.now())
+
+        if moved_ids:
+            loan_status_changed.send(sender=self.model, loan_ids=moved_ids, status=to, using=self.db)
+        return moved_ids
+
+    def update_returning(self, queryset, to, connection):
+        # One conditional UPDATE, no row is locked or read beforehand. ``QuerySet.update()`` only
+        # returns a row count, RETURNING tells which loans moved. PostgreSQL and SQLite 3.35+ only
+        quote_name = connection.ops.quote_name
+        opts = self.model._meta
+        subquery, params = queryset.values('id').query.sql_with_params()
+        sql = 'UPDATE {table} SET {status} = %s, {update_at} = %s WHERE {pk} IN ({subquery}) RETURNING {pk}'.format(
+            table=quote_name(opts.db_table),
+            status=quote_name(opts.get_field('status').column),
+            update_at=quote_name(opts.get_field('update_at').column),
+            pk=quote_name(opts.pk.column),
+            subquery=subquery
+        )
+        update_at = opts.get_field('update_at').get_db_prep_save(timezone.now(), connection)
+        with connection.cursor() as cursor:
+            cursor.execute(sql, [to, update_at, *params])
+            return [row[0] for row in cursor.fetchall()]
+
+    def complete_paid_loans(self, loan_ids):
+        # One UPDATE for every loan in ``loan_ids`` left without unpaid amortizations
+        return self.transition(
+            loan_ids=loan_ids,
+            to=LoanStatus.COMPLETED,
+            condition=~models.Q(amortizations__is_paid=False)
+        )
+
 
 class AmortizationScheduleManager(models.Manager):
 
@@ -38,9 +102,130 @@ class AmortizationScheduleManager(models.Manager):
             models.Q(loan__status=LoanStatus.COMPLETED)
         )
 
-    def get_previous_unpaid_schedules(self, loan_id, payment_number):
+    def get_next_unpaid_schedule(self, loan_ids):
         return self.get_queryset().filter(
+            models.Q(loan__id__in=loan_ids) &
+            models.Q(is_paid=False)
+        ).order_by('payment_date', 'id').first()
+
+    def with_payment_numbers(self):
+        # ``payment_number`` is stored as text, compared as text '10' would come before '2'
+        return self.get_queryset().alias(number=Cast('payment_number', models.IntegerField()))
+
+    def get_previous_unpaid_schedules(self, loan_id, payment_number):
+        return self.with_payment_numbers().filter(
             models.Q(loan__id=loan_id) &
-            models.Q(payment_number__lt=payment_number) &
+            models.Q(number__lt=int(payment_number)) &
             models.Q(is_paid=False)
         )
+
+    def has_previous_unpaid_schedules(self, latest_payment_numbers, exclude_ids):
+        # One query for the ``get_previous_unpaid_schedules`` check of several loans
+        previous = models.Q()
+        for loan_id, payment_number in latest_payment_numbers.items():
+            previous |= models.Q(loan__id=loan_id, number__lt=int(payment_number))
+        return self.with_payment_numbers().filter(
+            previous &
+            models.Q(is_paid=False)
+        ).exclude(
+            id__in=exclude_ids
+        ).exists()
+
+    def get_newly_overdue(self, due_from, due_before):
+        """
+        Installments fallen due unpaid in [due_from, due_before), a range of the covering
+        (is_paid, payment_date, loan) index. ``NOT is_paid`` would have SQLite scan the
+        (loan, is_paid, payment_date) index instead.
+        """
+        queryset = self.get_queryset().filter(
+            is_paid__in=[False],
+            payment_date__lt=due_before
+        )
+        if due_from is not None:
+            queryset = queryset.filter(payment_date__gte=due_from)
+        return queryset.order_by()
+
+    def get_overdue_totals(self, loan_ids, due_before):
+        # Overdue installments of each repaying loan of ``loan_ids``, from the (loan, is_paid, payment_date) index
+        return self.get_queryset().filter(
+            loan__id__in=loan_ids,
+            loan__status__in=(LoanStatus.APPROVED, LoanStatus.ACTIVE),
+            is_paid=False,
+            payment_date__lt=due_before
+        ).order_by().values('loan_id').annotate(
+            oldest_due_date=models.Min('payment_date'),
+            overdue_installments=models.Count('id'),
+            overdue_amount=models.Sum('total_payment')
+        )
+
+    def pay_schedules(self, payments):
+        # Mark every ``{schedule id: transaction id}`` of ``payments`` as paid in one UPDATE
+        return self.get_queryset().filter(
+            id__in=payments,
+            is_paid=False
+        ).update(
+            is_paid=True,
+            transaction_id=models.Case(
+                *[models.When(id=schedule_id, then=models.Value(transaction_id))
+                  for schedule_id, transaction_id in payments.items()]
+            ),
+            update_at=timezone.now()
+        )
+
+    def update_schedules(self, schedules, fields):
+        # One prepared UPDATE run for every row, ``bulk_update`` builds a CASE per row and field instead
+        connection = connections[self.db]
+        quote_name = connection.ops.quote_name
+        opts = self.model._meta
+        model_fields = [opts.get_field(name) for name in fields]
+        sql = 'UPDATE {table} SET {columns} WHERE {pk} = %s'.format(
+            table=quote_name(opts.db_table),
+            columns=', '.join(f'{quote_name(field.column)} = %s' for field in model_fields),
+            pk=quote_name(opts.pk.column)
+        )
+        params = [
+            [field.get_db_prep_save(getattr(schedule, field.attname), connection) for field in model_fields]
+            + [schedule.pk]
+            for schedule in schedules
+        ]
+        with connection.cursor() as cursor:
+            cursor.executemany(sql, params)
+
+
+class IdempotencyKeyManager(models.Manager):
+
+    def get_active_key(self, user, key):
+        return self.get_queryset().filter(
+            user=user,
+            key=key,
+            expires_at__gt=timezone.now()
+        ).first()
+
+    def take_over_stale_key(self, record, leased_before):
+        """
+        Reserve again the key of ``record``, left unanswered since before ``leased_before``,
+        returns whether this call got it. Only one of several concurrent retries does.
+        """
+        return self.get_queryset().filter(
+            id=record.id,
+            status_code__isnull=True,
+            create_at__lt=leased_before
+        ).update(create_at=timezone.now()) == 1
+
+    def purge_expired(self, limit):
+        # Bounded so a large backlog of stale keys never turns into one long locking delete
+        expired_ids = list(
+            self.get_queryset().filter(
+                expires_at__lte=timezone.now()
+            ).order_by().values_list('id', flat=True)[:limit]
+        )
+        if not expired_ids:
+            return 0
+        deleted, _ = self.get_queryset().filter(id__in=expired_ids).delete()
+        return deleted
+
+
+class LoanDelinquencyManager(models.Manager):
+
+    def get_loan_ids(self):
+        return self.get_queryset().order_by().values_list('loan_id', flat=True)
@@ -0,0 +1,28 @@
+from django.core.cache import cache
+from prometheus_client.core import GaugeMetricFamily
+
+from loans.utils import LOAN_BOOK_SUMMARY_CACHE_KEY
+
+
+class LoanBookCollector:
+    """
+    Loan book gauges for ``core.metrics``, read from the figures the
+    ``refresh_loan_book_metrics`` command leaves in the cache. A scrape runs no query,
+    the gauges are missing until the command has run once.
+    """
+
+    def collect(self):
+        summary = cache.get(LOAN_BOOK_SUMMARY_CACHE_KEY)
+        if summary is None:
+            return
+
+        loans = GaugeMetricFamily('blink_loans', 'Loans by status', labels=['status'])
+        for status, count in summary['loans'].items():
+            loans.add_metric([status.name.lower()], count)
+        yield loans
+        yield GaugeMetricFamily('blink_outstanding_principal', 'Unpaid principal of the approved and active loans',
+                                value=float(summary['outstanding_principal']))
+        yield GaugeMetricFamily('blink_available_balance', 'Funds left to lend',
+                                value=float(summary['available_balance']))
+        yield GaugeMetricFamily('blink_loan_book_refreshed', 'Unix time the loan book gauges were computed at',
+                                value=summary['refreshed_at'].timestamp())
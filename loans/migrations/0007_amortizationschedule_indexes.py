@@ -0,0 +1,21 @@
+# Generated by Django 5.1.6 on 2026-10-18 22:37
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('loans', '0006_alter_amortizationschedule_loan'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='amortizationschedule',
+            index=models.Index(fields=['loan', 'is_paid', 'payment_date'], name='amortization_loan_unpaid_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='amortizationschedule',
+            index=models.Index(fields=['transaction_id'], name='amortization_transaction_idx'),
+        ),
+    ]
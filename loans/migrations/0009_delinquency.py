@@ -0,0 +1,66 @@
+# Generated by Django 5.1.6 on 2026-10-19 00:39
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('loans', '0008_idempotencykey'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DelinquencyRun',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('as_of', models.DateField(verbose_name='As Of')),
+                ('newly_overdue', models.PositiveIntegerField(verbose_name='Newly Overdue Installments')),
+                ('delinquent_loans', models.PositiveIntegerField(verbose_name='Delinquent Loans')),
+                ('cured_loans', models.PositiveIntegerField(verbose_name='Cured Loans')),
+                ('create_at', models.DateTimeField(auto_now_add=True, verbose_name='Create At')),
+            ],
+            options={
+                'verbose_name': 'Delinquency Run',
+                'verbose_name_plural': 'Delinquency Runs',
+                'ordering': ('-as_of', '-id'),
+            },
+        ),
+        migrations.CreateModel(
+            name='LoanDelinquency',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('oldest_due_date', models.DateField(verbose_name='Oldest Due Date')),
+                ('overdue_installments', models.PositiveIntegerField(verbose_name='Overdue Installments')),
+                ('overdue_amount', models.DecimalField(decimal_places=2, max_digits=15, verbose_name='Overdue Amount')),
+                ('days_past_due', models.PositiveIntegerField(verbose_name='Days Past Due')),
+                ('bucket', models.PositiveSmallIntegerField(choices=[(1, '1-30 Days Past Due'), (2, '31-60 Days Past Due'), (3, '61-90 Days Past Due'), (4, '90+ Days Past Due')], verbose_name='Bucket')),
+                ('as_of', models.DateField(verbose_name='As Of')),
+                ('create_at', models.DateTimeField(auto_now_add=True, verbose_name='Create At')),
+                ('update_at', models.DateTimeField(auto_now=True, verbose_name='Update At')),
+            ],
+            options={
+                'verbose_name': 'Loan Delinquency',
+                'verbose_name_plural': 'Loan Delinquencies',
+                'ordering': ('oldest_due_date', 'id'),
+            },
+        ),
+        migrations.AddIndex(
+            model_name='amortizationschedule',
+            index=models.Index(fields=['is_paid', 'payment_date', 'loan'], name='amortization_unpaid_due_idx'),
+        ),
+        migrations.AddField(
+            model_name='loandelinquency',
+            name='loan',
+            field=models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='delinquency', to='loans.loan', verbose_name='Loan'),
+        ),
+        migrations.AddIndex(
+            model_name='loandelinquency',
+            index=models.Index(fields=['oldest_due_date', 'id'], name='delinquency_due_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='loandelinquency',
+            index=models.Index(fields=['bucket', 'oldest_due_date', 'id'], name='delinquency_bucket_due_idx'),
+        ),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 5.1.6 on 2026-10-19 00:58
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('loans', '0009_delinquency'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Prepayment',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('amount', models.DecimalField(decimal_places=2, max_digits=10, verbose_name='Amount')),
+                ('mode', models.CharField(choices=[('term', 'Keep Term'), ('payment', 'Keep Payment')], max_length=10, verbose_name='Mode')),
+                ('transaction_id', models.CharField(max_length=255, unique=True, verbose_name='Transaction ID')),
+                ('create_at', models.DateTimeField(auto_now_add=True, verbose_name='Create At')),
+                ('loan', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='prepayments', to='loans.loan', verbose_name='Loan')),
+            ],
+            options={
+                'verbose_name': 'Prepayment',
+                'verbose_name_plural': 'Prepayments',
+                'ordering': ('-create_at',),
+            },
+        ),
+    ]
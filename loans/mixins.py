@@ -0,0 +1,79 @@
+from django.db import models
+from django.db.models import DEFERRED
+
+
+class DirtyFieldsMixin(models.Model):
+    """
+    Remember the column values an instance was loaded or last saved with, so a ``save()``
+    without ``update_fields`` writes only the changed columns, and skips the write when
+    nothing changed. Receivers of ``post_save`` can still ask what changed, the values
+    are refreshed once the save returns.
+    """
+
+    class Meta:
+        abstract = True
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_values = {
+            attname: value for attname, value in zip(field_names, values) if value is not DEFERRED
+        }
+        return instance
+
+    def refresh_from_db(self, using=None, fields=None, from_queryset=None):
+        super().refresh_from_db(using=using, fields=fields, from_queryset=from_queryset)
+        # Loading a deferred field goes through here as well
+        self.set_loaded_values(fields)
+
+    def set_loaded_values(self, field_names=None):
+        loaded_values = self.__dict__.setdefault('_loaded_values', {})
+        for field in self._meta.concrete_fields:
+            if field.attname not in self.__dict__:
+                continue
+            if field_names is None or field.name in field_names or field.attname in field_names:
+                loaded_values[field.attname] = getattr(self, field.attname)
+
+    def get_dirty_fields(self) -> set:
+        """
+        Names of the concrete fields changed since the instance was loaded or saved, every
+        field for an instance that has not been loaded from the database
+        """
+        loaded_values = self.__dict__.get('_loaded_values')
+        fields = [field for field in self._meta.concrete_fields if field.attname in self.__dict__]
+        if self._state.adding or loaded_values is None:
+            return {field.name for field in fields}
+        return {
+            field.name for field in fields
+            if field.attname not in loaded_values or loaded_values[field.attname] != getattr(self, field.attname)
+        }
+
+    def has_changed(self, field_name) -> bool:
+        return field_name in self.get_dirty_fields()
+
+    def changed_to(self, field_name, value) -> bool:
+        """
+        Whether ``field_name`` was set to ``value`` since the instance was loaded or saved,
+        for a new instance whether it is created with ``value``
+        """
+        return getattr(self, field_name) == value and self.has_changed(field_name)
+
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get('update_fields')
+        if (
+            not args and update_fields is None and not kwargs.get('force_insert')
+            and not self._state.adding and '_loaded_values' in self.__dict__
+        ):
+            dirty_fields = self.get_dirty_fields()
+            if not dirty_fields:
+                return
+            # A new primary key is saved as another row, with every column
+            if self._meta.pk.name not in dirty_fields:
+                # ``auto_now`` columns are only refreshed when they are part of ``update_fields``
+                update_fields = dirty_fields | {
+                    field.name for field in self._meta.concrete_fields if getattr(field, 'auto_now', False)
+                }
+                kwargs['update_fields'] = update_fields
+
+        super().save(*args, **kwargs)
+        self.set_loaded_values(update_fields)
@@ -2,12 +2,14 @@ from django.db import models
 from django.utils.translation import gettext_lazy as _
 from django.core.validators import MinValueValidator, MaxValueValidator
 
-from accounts.models import PersonnelUser, ProviderUser, CustomerUser
-from loans.enums import LoanStatus
-from loans.managers import LoanFundManager, LoanManager, AmortizationScheduleManager
+from accounts.models import User, PersonnelUser, ProviderUser, CustomerUser
+from loans.enums import LoanStatus, DelinquencyBucket, PrepaymentMode
+from loans.mixins import DirtyFieldsMixin
+from loans.managers import (LoanFundManager, LoanManager, AmortizationScheduleManager, IdempotencyKeyManager,
+                            LoanDelinquencyManager)
 
 
-class BaseLoanType(models.Model):
+class BaseLoanType(DirtyFieldsMixin, models.Model):
     name = models.CharField(max_length=100, verbose_name=_('Name'))
     min_amount = models.DecimalField(max_digits=10, decimal_places=2, verbose_name=_('Minimum Amount'))
     max_amount = models.DecimalField(max_digits=10, decimal_places=2, verbose_name=_('Maximum Amount'))
@@ -45,7 +47,7 @@ class LoanFundType(BaseLoanType):
         return self.name
 
 
-class LoanFund(models.Model):
+class LoanFund(DirtyFieldsMixin, models.Model):
     provider = models.ForeignKey(
         ProviderUser,
         on_delete=models.SET_NULL,
@@ -85,7 +87,7 @@ class LoanType(BaseLoanType):
         return self.name
 
 
-class Loan(models.Model):
+class Loan(DirtyFieldsMixin, models.Model):
     customer = models.ForeignKey(
         CustomerUser,
         on_delete=models.SET_NULL,
@@ -112,8 +114,19 @@ class Loan(models.Model):
         verbose_name_plural = _('Loan')
         ordering = ('-create_at', '-update_at')
 
+    def transition(self, to) -> bool:
+        """
+        Move the loan to the ``to`` status if its current status in the database allows it,
+        returns whether this call made the change
+        """
+        if not Loan.objects.db_manager(self._state.db).transition(loan_ids=[self.pk], to=to):
+            return False
+        self.status = to
+        self.set_loaded_values(['status'])
+        return True
 
-class AmortizationSchedule(models.Model):
+
+class AmortizationSchedule(DirtyFieldsMixin, models.Model):
     loan = models.ForeignKey(
         Loan,
         on_delete=models.CASCADE,
@@ -142,3 +155,110 @@ class AmortizationSchedule(models.Model):
         verbose_name = _('Amortization Schedule')
         verbose_name_plural = _('Amortization Schedules')
         ordering = ('-create_at', '-update_at')
+        indexes = [
+            models.Index(fields=['loan', 'is_paid', 'payment_date'], name='amortization_loan_unpaid_idx'),
+            models.Index(fields=['transaction_id'], name='amortization_transaction_idx'),
+            # Installments falling due in a date range, covering the loan so delinquency runs read only those
+            models.Index(fields=['is_paid', 'payment_date', 'loan'], name='amortization_unpaid_due_idx'),
+        ]
+
+
+class Prepayment(models.Model):
+    loan = models.ForeignKey(
+        Loan,
+        on_delete=models.CASCADE,
+        related_name='prepayments',
+        verbose_name=_('Loan')
+    )
+    amount = models.DecimalField(max_digits=10, decimal_places=2, verbose_name=_('Amount'))
+    mode = models.CharField(max_length=10, choices=PrepaymentMode.choices, verbose_name=_('Mode'))
+    transaction_id = models.CharField(max_length=255, unique=True, verbose_name=_('Transaction ID'))
+    create_at = models.DateTimeField(auto_now_add=True, verbose_name=_("Create At"))
+
+    class Meta:
+        verbose_name = _('Prepayment')
+        verbose_name_plural = _('Prepayments')
+        ordering = ('-create_at',)
+
+    def __str__(self):
+        return f'{self.loan_id}: {self.amount}'
+
+
+class LoanDelinquency(models.Model):
+    loan = models.OneToOneField(
+        Loan,
+        on_delete=models.CASCADE,
+        related_name='delinquency',
+        verbose_name=_('Loan')
+    )
+    oldest_due_date = models.DateField(verbose_name=_('Oldest Due Date'))
+    overdue_installments = models.PositiveIntegerField(verbose_name=_('Overdue Installments'))
+    overdue_amount = models.DecimalField(max_digits=15, decimal_places=2, verbose_name=_('Overdue Amount'))
+    days_past_due = models.PositiveIntegerField(verbose_name=_('Days Past Due'))
+    bucket = models.PositiveSmallIntegerField(choices=DelinquencyBucket.choices, verbose_name=_('Bucket'))
+    as_of = models.DateField(verbose_name=_('As Of'))
+    create_at = models.DateTimeField(auto_now_add=True, verbose_name=_("Create At"))
+    update_at = models.DateTimeField(auto_now=True, verbose_name=_("Update At"))
+
+    objects = LoanDelinquencyManager()
+
+    class Meta:
+        verbose_name = _('Loan Delinquency')
+        verbose_name_plural = _('Loan Delinquencies')
+        # Most overdue first, the keyset order of the delinquency endpoint
+        ordering = ('oldest_due_date', 'id')
+        indexes = [
+            models.Index(fields=['oldest_due_date', 'id'], name='delinquency_due_idx'),
+            models.Index(fields=['bucket', 'oldest_due_date', 'id'], name='delinquency_bucket_due_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.loan_id}: {self.days_past_due} days past due'
+
+
+class DelinquencyRun(models.Model):
+    as_of = models.DateField(verbose_name=_('As Of'))
+    newly_overdue = models.PositiveIntegerField(verbose_name=_('Newly Overdue Installments'))
+    delinquent_loans = models.PositiveIntegerField(verbose_name=_('Delinquent Loans'))
+    cured_loans = models.PositiveIntegerField(verbose_name=_('Cured Loans'))
+    create_at = models.DateTimeField(auto_now_add=True, verbose_name=_("Create At"))
+
+    class Meta:
+        verbose_name = _('Delinquency Run')
+        verbose_name_plural = _('Delinquency Runs')
+        ordering = ('-as_of', '-id')
+
+    def __str__(self):
+        return str(self.as_of)
+
+
+class IdempotencyKey(models.Model):
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='idempotency_keys',
+        verbose_name=_('User')
+    )
+    key = models.CharField(max_length=255, verbose_name=_('Key'))
+    fingerprint = models.CharField(max_length=64, verbose_name=_('Request Fingerprint'))
+    status_code = models.PositiveSmallIntegerField(null=True, blank=True, verbose_name=_('Status Code'))
+    content_type = models.CharField(max_length=255, blank=True, verbose_name=_('Content Type'))
+    content = models.BinaryField(blank=True, verbose_name=_('Content'))
+    expires_at = models.DateTimeField(verbose_name=_('Expires At'))
+    create_at = models.DateTimeField(auto_now_add=True, verbose_name=_("Create At"))
+
+    objects = IdempotencyKeyManager()
+
+    class Meta:
+        verbose_name = _('Idempotency Key')
+        verbose_name_plural = _('Idempotency Keys')
+        ordering = ('-create_at',)
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'key'], name='idempotency_user_key_unique'),
+        ]
+        indexes = [
+            models.Index(fields=['expires_at'], name='idempotency_expires_idx'),
+        ]
+
+    def __str__(self):
+        return self.key
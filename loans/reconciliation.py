@@ -0,0 +1,211 @@
+import csv
+from datetime import date, timedelta
+from decimal import Decimal, InvalidOperation
+
+from django.db import transaction
+
+from accounts.models import CustomerUser
+from loans.models import Loan, AmortizationSchedule
+from loans.utils import invalidate_customer_dashboard
+
+
+STATEMENT_COLUMNS = ('date', 'amount', 'reference', 'transaction_id')
+REPORT_COLUMNS = ('line', *STATEMENT_COLUMNS, 'reason')
+
+
+class ReconciliationConflict(Exception):
+    pass
+
+
+class MismatchReason:
+    INVALID_LINE = 'invalid_line'
+    DUPLICATE_TRANSACTION = 'duplicate_transaction'
+    UNKNOWN_REFERENCE = 'unknown_reference'
+    NO_MATCH = 'no_match'
+    OUT_OF_ORDER = 'out_of_order'
+    CONFLICT = 'conflict'
+
+
+class StatementReconciler:
+    """
+    Match bank statement lines to unpaid amortizations and pay them.
+
+    A line ``date,amount,reference,transaction_id`` matches the earliest unpaid
+    amortization of the customer whose username is ``reference``, with a
+    ``total_payment`` equal to ``amount`` and a ``payment_date`` within
+    ``tolerance_days`` of ``date``. As with the payment endpoints, a match leaving an
+    earlier installment of its loan unpaid is reported instead of paid. Lines are read
+    lazily and handled in batches, each batch costs a fixed number of indexed queries and
+    is applied in its own transaction. Unmatched lines are written to ``report`` as they
+    are found.
+    """
+
+    def __init__(self, report, batch_size=5000, tolerance_days=5, dry_run=False):
+        self.report = csv.DictWriter(report, fieldnames=REPORT_COLUMNS)
+        self.report.writeheader()
+        self.batch_size = batch_size
+        self.tolerance = timedelta(days=tolerance_days)
+        self.dry_run = dry_run
+        self.seen_transaction_ids = set()
+        self.claimed_schedule_ids = set()
+        self.lines = 0
+        self.matched = 0
+        self.mismatched = 0
+
+    def reconcile(self, stream):
+        reader = csv.DictReader(stream)
+        missing = set(STATEMENT_COLUMNS) - set(reader.fieldnames or ())
+        if missing:
+            raise ValueError(f"Statement is missing the columns: {', '.join(sorted(missing))}")
+
+        batch = []
+        for line_number, row in enumerate(reader, start=2):
+            batch.append((line_number, row))
+            if len(batch) == self.batch_size:
+                self.reconcile_batch(batch)
+                batch = []
+        if batch:
+            self.reconcile_batch(batch)
+        return self
+
+    def add_mismatch(self, line_number, row, reason):
+        self.mismatched += 1
+        self.report.writerow({'line': line_number, **{key: row.get(key) for key in STATEMENT_COLUMNS},
+                              'reason': reason})
+
+    def parse_batch(self, batch):
+        lines = []
+        for line_number, row in batch:
+            try:
+                payment_date = date.fromisoformat(row['date'].strip())
+                amount = Decimal(row['amount'].strip()).quantize(Decimal('0.01'))
+                reference = row['reference'].strip()
+                transaction_id = row['transaction_id'].strip()
+            except (AttributeError, ValueError, InvalidOperation):
+                self.add_mismatch(line_number, row, MismatchReason.INVALID_LINE)
+                continue
+            if not (reference and transaction_id):
+                self.add_mismatch(line_number, row, MismatchReason.INVALID_LINE)
+                continue
+            lines.append((line_number, row, payment_date, amount, reference, transaction_id))
+        return lines
+
+    def get_candidates(self, lines):
+        references = {line[4] for line in lines}
+        start = min(line[2] for line in lines) - self.tolerance
+        end = max(line[2] for line in lines) + self.tolerance
+
+        # Served by the username index, the customer foreign key and the (loan, is_paid, payment_date) index
+        schedules = AmortizationSchedule.objects.filter(
+            loan__customer__username__in=references,
+            is_paid=False,
+            payment_date__range=(start, end)
+        ).order_by(
+            'payment_date', 'id'
+        ).values_list(
+            'id', 'loan_id', 'loan__customer_id', 'loan__customer__username', 'total_payment', 'payment_date'
+        )
+
+        candidates = {}
+        for schedule_id, loan_id, customer_id, username, total_payment, payment_date in schedules:
+            candidates.setdefault((username, total_payment), []).append(
+                (payment_date, schedule_id, loan_id, customer_id)
+            )
+        return candidates, end
+
+    def get_unpaid_schedule_ids(self, candidates, end):
+        # ``{loan id: [schedule id]}`` of the unpaid installments up to the last candidate, from the
+        # (loan, is_paid, payment_date) index, in the order they must be paid
+        loan_ids = {candidate[2] for schedules in candidates.values() for candidate in schedules}
+        schedules = AmortizationSchedule.objects.filter(
+            loan__id__in=loan_ids,
+            is_paid=False,
+            payment_date__lte=end
+        ).order_by(
+            'payment_date', 'id'
+        ).values_list(
+            'loan_id', 'id'
+        )
+
+        unpaid = {}
+        for loan_id, schedule_id in schedules:
+            unpaid.setdefault(loan_id, []).append(schedule_id)
+        return unpaid
+
+    def has_previous_unpaid(self, unpaid, loan_id, schedule_id):
+        # Installments claimed by earlier lines count as paid, even when the run is a dry one
+        for previous_id in unpaid.get(loan_id, ()):
+            if previous_id == schedule_id:
+                return False
+            if previous_id not in self.claimed_schedule_ids:
+                return True
+        return False
+
+    def reconcile_batch(self, batch):
+        self.lines += len(batch)
+        lines = self.parse_batch(batch)
+        if not lines:
+            return
+
+        transaction_ids = [line[5] for line in lines]
+        used = set(
+            AmortizationSchedule.objects.filter(
+                transaction_id__in=transaction_ids
+            ).values_list('transaction_id', flat=True)
+        )
+        known_references = set(
+            CustomerUser.objects.filter(
+                username__in={line[4] for line in lines}
+            ).values_list('username', flat=True)
+        )
+        candidates, end = self.get_candidates(lines)
+        unpaid = self.get_unpaid_schedule_ids(candidates, end) if candidates else {}
+        # Restored when the batch rolls back, its lines neither used the transaction ids nor paid the rows
+        seen_transaction_ids, claimed_schedule_ids = set(self.seen_transaction_ids), set(self.claimed_schedule_ids)
+
+        payments, loan_ids, customer_ids, applied = {}, set(), set(), []
+        for line_number, row, payment_date, amount, reference, transaction_id in lines:
+            if transaction_id in used or transaction_id in self.seen_transaction_ids:
+                self.add_mismatch(line_number, row, MismatchReason.DUPLICATE_TRANSACTION)
+                continue
+            if reference not in known_references:
+                self.add_mismatch(line_number, row, MismatchReason.UNKNOWN_REFERENCE)
+                continue
+
+            match = None
+            for candidate in candidates.get((reference, amount), ()):
+                if candidate[1] not in self.claimed_schedule_ids and abs(candidate[0] - payment_date) <= self.tolerance:
+                    match = candidate
+                    break
+            if match is None:
+                self.add_mismatch(line_number, row, MismatchReason.NO_MATCH)
+                continue
+            if self.has_previous_unpaid(unpaid, match[2], match[1]):
+                self.add_mismatch(line_number, row, MismatchReason.OUT_OF_ORDER)
+                continue
+
+            self.seen_transaction_ids.add(transaction_id)
+            self.claimed_schedule_ids.add(match[1])
+            payments[match[1]] = transaction_id
+            loan_ids.add(match[2])
+            customer_ids.add(match[3])
+            applied.append((line_number, row))
+
+        if payments and not self.dry_run:
+            try:
+                self.apply(payments, loan_ids)
+            except ReconciliationConflict:
+                self.seen_transaction_ids, self.claimed_schedule_ids = seen_transaction_ids, claimed_schedule_ids
+                for line_number, row in applied:
+                    self.add_mismatch(line_number, row, MismatchReason.CONFLICT)
+                return
+            invalidate_customer_dashboard(*customer_ids)
+
+        self.matched += len(applied)
+
+    @transaction.atomic
+    def apply(self, payments, loan_ids):
+        # A row paid meanwhile through the API rolls back the whole chunk
+        if AmortizationSchedule.objects.pay_schedules(payments=payments) != len(payments):
+            raise ReconciliationConflict
+        Loan.objects.complete_paid_loans(loan_ids=loan_ids)
@@ -0,0 +1,221 @@
+import random
+from datetime import date
+from decimal import Decimal
+
+from django.db import connections, transaction, DEFAULT_DB_ALIAS
+from django.utils import timezone
+from django.contrib.auth.hashers import make_password
+
+from accounts.enums import UserRole
+from accounts.models import User
+from loans.enums import LoanStatus
+from loans.models import LoanFundType, LoanFund, LoanType, Loan, AmortizationSchedule
+from loans.utils import iter_amortization_rows
+
+
+DEFAULT_STATUSES = {
+    LoanStatus.PENDING: 0.05,
+    LoanStatus.REJECTED: 0.05,
+    LoanStatus.APPROVED: 0.5,
+    LoanStatus.ACTIVE: 0.3,
+    LoanStatus.COMPLETED: 0.1,
+}
+# Share of the installments already paid, for the approved and active loans
+DEFAULT_PROGRESS = {
+    0.0: 0.2,
+    0.25: 0.3,
+    0.5: 0.3,
+    0.75: 0.2,
+}
+SCHEDULE_COLUMNS = (
+    'loan', 'payment_number', 'payment_date', 'principal_amount', 'interest_amount', 'total_payment',
+    'remaining_balance', 'transaction_id', 'is_paid', 'create_at', 'update_at'
+)
+
+
+def parse_distribution(value, parse_key):
+    """
+    ``key=weight,key=weight`` into ``{parse_key(key): weight}``
+    """
+    distribution = {}
+    for item in value.split(','):
+        key, separator, weight = item.partition('=')
+        if not separator:
+            raise ValueError(f'Expected key=weight, got "{item}"')
+        distribution[parse_key(key.strip())] = float(weight)
+    if not distribution or min(distribution.values()) < 0 or not sum(distribution.values()):
+        raise ValueError(f'"{value}" is not a distribution')
+    return distribution
+
+
+class BookSeeder:
+    """
+    Generate a synthetic loan book for load testing: users, fund types, funds, loan types,
+    loans and their amortization schedules.
+
+    Every table is filled with bulk inserts and every user shares one precomputed password
+    hash. Schedules go through one prepared INSERT run for all rows, their amounts are
+    computed once per distinct amount, rate and duration. No signal is sent and no
+    dashboard is invalidated, seed an empty database or a copy.
+    """
+
+    def __init__(self, customers, loans, providers=10, personnel=5, fund_types=3, funds=50, loan_types=5,
+                 statuses=None, progress=None, password='defaultpassword', seed=None,
+                 batch_size=10000, using=DEFAULT_DB_ALIAS):
+        self.customers = customers
+        self.loans = loans
+        self.providers = providers
+        self.personnel = personnel
+        self.fund_types = fund_types
+        self.funds = funds
+        self.loan_types = loan_types
+        self.statuses = statuses or DEFAULT_STATUSES
+        self.progress = progress or DEFAULT_PROGRESS
+        self.password = password
+        self.random = random.Random(seed)
+        self.batch_size = batch_size
+        self.using = using
+        self.connection = connections[using]
+        self.now = timezone.now()
+        self.templates = {}
+        self.schedules = 0
+
+    def seed(self):
+        with transaction.atomic(using=self.using):
+            password = make_password(self.password)
+            personnel = self.create_users(UserRole.LOAN_PERSONNEL, self.personnel, password)
+            providers = self.create_users(UserRole.LOAN_PROVIDER, self.providers, password)
+            customers = self.create_users(UserRole.LOAN_CUSTOMER, self.customers, password)
+            self.create_funds(personnel, providers)
+            loan_types = self.create_loan_types(personnel)
+            self.create_loans(customers, loan_types)
+        return self
+
+    def choose(self, distribution, count):
+        return self.random.choices(list(distribution), weights=list(distribution.values()), k=count)
+
+    def create_users(self, role, count, password):
+        first = (User.objects.using(self.using).order_by('-pk').values_list('pk', flat=True).first() or 0) + 1
+        users = User.objects.using(self.using).bulk_create(
+            [
+                User(
+                    username=f'seed_{number}',
+                    email=f'seed_{number}@example.com',
+                    first_name='Seed',
+                    last_name=str(number),
+                    password=password,
+                    role=role,
+                    date_joined=self.now
+                )
+                for number in range(first, first + count)
+            ],
+            batch_size=self.batch_size
+        )
+        return [user.pk for user in users]
+
+    def create_funds(self, personnel, providers):
+        fund_types = LoanFundType.objects.using(self.using).bulk_create([
+            LoanFundType(
+                name=f'Seed Fund {number}',
+                min_amount=Decimal('5000.00'),
+                max_amount=Decimal('1000000.00'),
+                interest_rate=round(self.random.uniform(1.0, 8.0), 2),
+                min_duration_months=12,
+                max_duration_months=120,
+                personnel_id=self.random.choice(personnel) if personnel else None
+            )
+            for number in range(1, max(self.fund_types, 1) + 1)
+        ])
+        LoanFund.objects.using(self.using).bulk_create(
+            [
+                LoanFund(
+                    provider_id=self.random.choice(providers) if providers else None,
+                    loan_type=self.random.choice(fund_types),
+                    amount=Decimal(self.random.randrange(1000, 5000) * 1000),
+                    duration_months=self.random.randrange(12, 121)
+                )
+                for _ in range(self.funds)
+            ],
+            batch_size=self.batch_size
+        )
+
+    def create_loan_types(self, personnel):
+        return LoanType.objects.using(self.using).bulk_create([
+            LoanType(
+                name=f'Seed Loan {number}',
+                min_amount=Decimal('1000.00'),
+                max_amount=Decimal('50000.00'),
+                interest_rate=round(self.random.uniform(3.0, 20.0), 2),
+                min_duration_months=6,
+                max_duration_months=60,
+                personnel_id=self.random.choice(personnel) if personnel else None
+            )
+            for number in range(1, max(self.loan_types, 1) + 1)
+        ])
+
+    def create_loans(self, customers, loan_types):
+        today = self.now.date()
+        for offset in range(0, self.loans, self.batch_size):
+            count = min(self.batch_size, self.loans - offset)
+            loans = []
+            for status in self.choose(self.statuses, count):
+                loan_type = self.random.choice(loan_types)
+                months_ago = self.random.randrange(0, 36)
+                month = today.year * 12 + today.month - 1 - months_ago
+                loans.append(Loan(
+                    customer_id=self.random.choice(customers) if customers else None,
+                    loan_type=loan_type,
+                    status=status,
+                    # Steps of 500 keep the number of distinct schedules small
+                    amount=Decimal(self.random.randrange(2, 101) * 500),
+                    duration_months=self.random.randrange(loan_type.min_duration_months,
+                                                          loan_type.max_duration_months + 1),
+                    start_at=date(month // 12, month % 12 + 1, self.random.randrange(1, 29))
+                ))
+            Loan.objects.using(self.using).bulk_create(loans)
+            self.create_schedules([loan for loan in loans if loan.status not in (LoanStatus.PENDING,
+                                                                                 LoanStatus.REJECTED)])
+
+    def get_template(self, loan):
+        key = (loan.amount, loan.loan_type.interest_rate, loan.duration_months)
+        if key not in self.templates:
+            monthly_interest_rate = Decimal(loan.loan_type.interest_rate) / 100 / 12
+            # Quantized decimals, the database driver adapts them like the dates below
+            self.templates[key] = list(
+                iter_amortization_rows(loan.amount, monthly_interest_rate, total_periods=loan.duration_months)
+            )
+        return self.templates[key]
+
+    def create_schedules(self, loans):
+        now = self.connection.ops.adapt_datetimefield_value(self.now)
+        paid_shares = self.choose(self.progress, len(loans))
+
+        rows = []
+        for loan, paid_share in zip(loans, paid_shares):
+            template = self.get_template(loan)
+            paid = len(template) if loan.status == LoanStatus.COMPLETED else int(len(template) * paid_share)
+            start = loan.start_at.year * 12 + loan.start_at.month - 1
+            for number, (principal, interest, payment, remaining) in enumerate(template, start=1):
+                month = start + number - 1
+                is_paid = number <= paid
+                rows.append((
+                    loan.pk, str(number),
+                    date(month // 12, month % 12 + 1, loan.start_at.day),
+                    principal, interest, payment, remaining,
+                    f'SEED-{loan.pk}-{number}' if is_paid else None, is_paid, now, now
+                ))
+        self.insert_schedules(rows)
+
+    def insert_schedules(self, rows):
+        # One prepared statement run for every row, ``bulk_create`` would build a model instance each
+        quote_name = self.connection.ops.quote_name
+        opts = AmortizationSchedule._meta
+        sql = 'INSERT INTO {table} ({columns}) VALUES ({values})'.format(
+            table=quote_name(opts.db_table),
+            columns=', '.join(quote_name(opts.get_field(name).column) for name in SCHEDULE_COLUMNS),
+            values=', '.join(['%s'] * len(SCHEDULE_COLUMNS))
+        )
+        with self.connection.cursor() as cursor:
+            for offset in range(0, len(rows), self.batch_size * 10):
+                cursor.executemany(sql, rows[offset:offset + self.batch_size * 10])
+        self.schedules += len(rows)
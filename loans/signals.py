@@ -1,16 +1,49 @@
 from datetime import date
-from decimal import Decimal
 
+from django.db import models
 from django.dispatch import receiver
-from django.db.models.signals import post_save
+from django.db.models.signals import post_save, post_delete
 from dateutil.relativedelta import relativedelta
 
 from loans.enums import LoanStatus
+from loans.deferred import deferred
+from loans.events import loan_status_changed
 from loans.models import Loan, AmortizationSchedule
-from loans.utils import calculate_loan_monthly_payment
+from loans.utils import get_monthly_interest_rate, iter_amortization_rows, invalidate_customer_dashboard
+
+
+GENERATE_SCHEDULES = 'generate_schedules'
+COMPLETE_LOANS = 'complete_loans'
+LOAN_DASHBOARDS = 'loan_dashboards'
+CUSTOMER_DASHBOARDS = 'customer_dashboards'
+
+
+def build_amortization_schedule(loan):
+    """
+    Unsaved amortization entries of ``loan`` for its amount, rate and duration
+    """
+    # Determine schedule start date
+    start_date = loan.start_at or date.today()
+    rows = iter_amortization_rows(
+        balance=loan.amount,
+        monthly_interest_rate=get_monthly_interest_rate(loan),
+        total_periods=loan.duration_months
+    )
+    return [
+        AmortizationSchedule(
+            loan=loan,
+            payment_number=str(period),
+            payment_date=start_date + relativedelta(months=period-1),
+            principal_amount=principal,
+            interest_amount=interest,
+            total_payment=payment,
+            remaining_balance=remaining_balance,
+            is_paid=False
+        )
+        for period, (principal, interest, payment, remaining_balance) in enumerate(rows, start=1)
+    ]
 
 
-@receiver(post_save, sender=Loan)
 def create_amortization_schedule(sender, instance, created, **kwargs):
     """
     Generate amortization schedule when loan is approved
@@ -23,65 +56,92 @@ def create_amortization_schedule(sender, instance, created, **kwargs):
     if not instance.loan_type:
         return
 
-    # Calculate monthly payment components
-    loan_amount = instance.amount
-    annual_interest = Decimal(instance.loan_type.interest_rate) / 100
-    monthly_interest_rate = annual_interest / 12
-    total_periods = instance.duration_months
-
-    # Monthly payment formula (annuity)
-    monthly_payment = calculate_loan_monthly_payment(
-        loan_amount=loan_amount,
-        monthly_interest_rate=monthly_interest_rate,
-        total_periods=total_periods
+    AmortizationSchedule.objects.bulk_create(build_amortization_schedule(instance))
+
+
+@deferred.register(GENERATE_SCHEDULES)
+def generate_amortization_schedules(loan_ids):
+    """
+    Generate the amortization schedules of the approved loans that have none, at once
+    """
+    loans = Loan.objects.filter(
+        id__in=loan_ids,
+        status=LoanStatus.APPROVED,
+        loan_type__isnull=False
+    ).exclude(
+        models.Exists(AmortizationSchedule.objects.filter(loan=models.OuterRef('pk')))
+    ).select_related('loan_type')
+    AmortizationSchedule.objects.bulk_create(
+        [schedule for loan in loans for schedule in build_amortization_schedule(loan)],
+        batch_size=1000
     )
 
-    # Determine schedule start date
-    start_date = instance.start_at or date.today()
-    remaining_balance = loan_amount
-
-    # Create amortization entries
-    for period in range(1, total_periods + 1):
-        interest = remaining_balance * monthly_interest_rate
-        principal = monthly_payment - interest
-        remaining_balance -= principal
-
-        # Handle final payment rounding
-        if period == total_periods:
-            principal += remaining_balance
-            remaining_balance = Decimal(0)
-
-        AmortizationSchedule.objects.create(
-            loan=instance,
-            payment_number=str(period),
-            payment_date=start_date + relativedelta(months=period-1),
-            principal_amount=principal.quantize(Decimal('0.01')),
-            interest_amount=interest.quantize(Decimal('0.01')),
-            total_payment=monthly_payment.quantize(Decimal('0.01')),
-            remaining_balance=remaining_balance.quantize(Decimal('0.01')),
-            is_paid=False
-        )
+
+@deferred.register(COMPLETE_LOANS)
+def complete_paid_loans(loan_ids):
+    """
+    Mark the loans whose amortization schedules are all paid as COMPLETED
+    """
+    Loan.objects.complete_paid_loans(loan_ids=loan_ids)
+
+
+@deferred.register(LOAN_DASHBOARDS)
+def invalidate_loan_dashboards(loan_ids):
+    invalidate_customer_dashboard(
+        *set(Loan.objects.filter(id__in=loan_ids).values_list('customer_id', flat=True))
+    )
+
+
+@deferred.register(CUSTOMER_DASHBOARDS)
+def invalidate_customer_dashboards(customer_ids):
+    invalidate_customer_dashboard(*customer_ids)
+
+
+@receiver(post_save, sender=Loan)
+def queue_amortization_schedule(sender, instance, created, using, **kwargs):
+    """
+    Generate the amortization schedule once the transaction approving the loan commits
+    """
+    if instance.changed_to('status', LoanStatus.APPROVED):
+        deferred.add(GENERATE_SCHEDULES, instance.id, using=using)
+
+
+@receiver(loan_status_changed, sender=Loan)
+def queue_loan_status_change(sender, loan_ids, status, using, **kwargs):
+    """
+    Same follow-ups as a saved status change for the loans moved by ``Loan.objects.transition``
+    """
+    if status == LoanStatus.APPROVED:
+        deferred.extend(GENERATE_SCHEDULES, loan_ids, using=using)
+    deferred.extend(LOAN_DASHBOARDS, loan_ids, using=using)
 
 
 @receiver(post_save, sender=AmortizationSchedule)
-def update_loan_status_on_payment(sender, instance, created, **kwargs):
+def update_loan_status_on_payment(sender, instance, created, using, **kwargs):
     """
-    Signal to automatically update loan status to CLOSED when all
-    amortization schedules are marked as paid.
+    Signal to automatically update loan status to COMPLETED when all
+    amortization schedules are marked as paid, once per loan on commit.
     """
     if created:
         return  # Only handle updates, not creations
 
-    if instance.is_paid:
-        loan = instance.loan
+    if instance.changed_to('is_paid', True):
+        deferred.add(COMPLETE_LOANS, instance.loan_id, using=using)
+
+
+@receiver(post_save, sender=Loan)
+@receiver(post_delete, sender=Loan)
+def invalidate_loan_customer_dashboard(sender, instance, using, **kwargs):
+    """
+    Drop the cached dashboard of the loan customer whenever the loan is written.
+    """
+    deferred.add(CUSTOMER_DASHBOARDS, instance.customer_id, using=using)
 
-        # Check if all payments for this loan are completed
-        unpaid_schedules = AmortizationSchedule.objects.filter(
-            loan=loan,
-            is_paid=False
-        )
 
-        # If no unpaid schedules remain, mark the loan as CLOSED
-        if not unpaid_schedules.exists():
-            loan.status = LoanStatus.COMPLETED
-            loan.save()
+@receiver(post_save, sender=AmortizationSchedule)
+@receiver(post_delete, sender=AmortizationSchedule)
+def invalidate_schedule_customer_dashboard(sender, instance, using, **kwargs):
+    """
+    Drop the cached dashboard of the schedule customer whenever an installment is written.
+    """
+    deferred.add(LOAN_DASHBOARDS, instance.loan_id, using=using)
@@ -0,0 +1,98 @@
+from decimal import Decimal
+from datetime import date
+
+from django.urls import reverse
+from django.test import TestCase, override_settings
+
+from core.testing import get_authorization
+from accounts.factories import CustomerUserFactory, ProviderUserFactory
+from loans.enums import LoanStatus
+from loans.factories import LoanTypeFactory, LoanFactory
+
+
+def basic_auth(user):
+    return {'headers': {'Authorization': get_authorization(user.username, 'defaultpassword')}}
+
+
+@override_settings(ROOT_URLCONF='core.urls_asgi')
+class AsyncReadViewTests(TestCase):
+    def setUp(self):
+        self.customer = CustomerUserFactory()
+        self.loan = LoanFactory(
+            customer=self.customer,
+            loan_type=LoanTypeFactory(interest_rate=9.0),
+            amount=Decimal('9000.00'),
+            duration_months=24,
+            status=LoanStatus.PENDING,
+            start_at=date(2025, 1, 31)
+        )
+        self.loan.status = LoanStatus.APPROVED
+        with self.captureOnCommitCallbacks(execute=True):
+            self.loan.save()
+        LoanFactory(customer=CustomerUserFactory())
+
+        self.provider = ProviderUserFactory()
+        self.auth = basic_auth(self.customer)
+
+    async def assertSameAsSync(self, url, data=None):
+        response = await self.async_client.get(url, data, **self.auth)
+        self.assertEqual(response.status_code, 200)
+        # The async view does not run the DRF view, so it does not add its ``Allow`` header
+        self.assertNotIn('Allow', response)
+
+        with override_settings(ROOT_URLCONF='core.urls'):
+            expected = await self.async_client.get(url, data, **self.auth)
+        self.assertEqual(response.content, expected.content)
+        return response
+
+    async def test_loan_list(self):
+        """Test the async loan list renders the same page as the viewset"""
+        response = await self.assertSameAsSync(reverse('loans:loan-list'))
+        self.assertEqual(response.json()['count'], 1)
+
+    async def test_loan_detail(self):
+        """Test the async loan detail renders the same body as the viewset"""
+        await self.assertSameAsSync(reverse('loans:loan-detail', kwargs={'pk': self.loan.pk}))
+
+    async def test_amortization_list_pages(self):
+        """Test every amortization page and its links match the viewset"""
+        url = reverse('loans:amortization-list')
+        for page in (1, 2, 3):
+            await self.assertSameAsSync(url, {'page': page})
+
+    async def test_errors_fall_back(self):
+        """Test missing objects, bad pages and bad credentials are answered by the viewset"""
+        other = await self.async_client.get(reverse('loans:loan-detail', kwargs={'pk': self.loan.pk + 1}),
+                                            **self.auth)
+        self.assertEqual(other.status_code, 404)
+
+        page = await self.async_client.get(reverse('loans:amortization-list'), {'page': 9}, **self.auth)
+        self.assertEqual(page.status_code, 404)
+
+        anonymous = await self.async_client.get(reverse('loans:loan-list'))
+        self.assertEqual(anonymous.status_code, 401)
+
+        forbidden = await self.async_client.get(reverse('loans:loan-list'), **basic_auth(self.provider))
+        self.assertEqual(forbidden.status_code, 403)
+
+    async def test_expanded_list_falls_back(self):
+        """Test flex fields parameters still go through the viewset"""
+        response = await self.async_client.get(reverse('loans:loan-list'), {'expand': 'amortizations'},
+                                               **self.auth)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('Allow', response)
+        self.assertEqual(len(response.json()['results'][0]['amortizations']), 24)
+
+    async def test_writes_fall_back(self):
+        """Test writes on the async routes reach the viewset"""
+        response = await self.async_client.patch(
+            reverse('loans:loan-detail', kwargs={'pk': self.loan.pk}), {'amount': '1.00'},
+            content_type='application/json', **self.auth
+        )
+        self.assertEqual(response.status_code, 403)
+        self.assertEqual(response.json()['detail'], 'Updates are only allowed for loans with PENDING status.')
+
+    async def test_current_user(self):
+        """Test the async users/me matches the viewset"""
+        response = await self.assertSameAsSync(reverse('accounts:users-me'))
+        self.assertEqual(response.json()['username'], self.customer.username)
@@ -0,0 +1,134 @@
+from decimal import Decimal
+from datetime import date
+
+from django.db import connection
+from django.urls import reverse
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from accounts.factories import CustomerUserFactory
+from loans.enums import LoanStatus
+from loans.models import Loan
+from loans.factories import LoanTypeFactory, LoanFactory
+
+
+class AmortizationBatchPaymentTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.customer = CustomerUserFactory()
+        self.loan_type = LoanTypeFactory(interest_rate=10.0)
+
+        self.loan = self.create_approved_loan(duration_months=6)
+        self.other_loan = self.create_approved_loan(duration_months=3)
+
+        self.url = reverse('loans:amortization-pay-batch')
+        self.client.force_authenticate(user=self.customer)
+
+    def create_approved_loan(self, duration_months):
+        loan = LoanFactory(
+            customer=self.customer,
+            loan_type=self.loan_type,
+            amount=Decimal('6000.00'),
+            duration_months=duration_months,
+            status=LoanStatus.PENDING,
+            start_at=date.today()
+        )
+        loan.status = LoanStatus.APPROVED
+        with self.captureOnCommitCallbacks(execute=True):
+            loan.save()
+        return loan
+
+    def get_payments(self, loan, count, prefix='TRX'):
+        schedules = loan.amortizations.order_by('payment_date', 'id')[:count]
+        return [
+            {'id': schedule.id, 'transaction_id': f'{prefix}-{loan.id}-{schedule.payment_number}'}
+            for schedule in schedules
+        ]
+
+    def test_pay_batch(self):
+        """Test paying several installments of several loans at once"""
+        payments = self.get_payments(self.loan, 3) + self.get_payments(self.other_loan, 1)
+        response = self.client.post(self.url, {'payments': payments}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data), 4)
+        self.assertTrue(all(item['is_paid'] for item in response.data))
+
+        self.assertEqual(self.loan.amortizations.filter(is_paid=True).count(), 3)
+        paid = self.loan.amortizations.get(payment_number='1')
+        self.assertEqual(paid.transaction_id, f'TRX-{self.loan.id}-1')
+
+    def test_pay_batch_completes_loan(self):
+        """Test paying every remaining installment completes the loan"""
+        response = self.client.post(self.url, {'payments': self.get_payments(self.other_loan, 3)}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        self.other_loan.refresh_from_db()
+        self.loan.refresh_from_db()
+        self.assertEqual(self.other_loan.status, LoanStatus.COMPLETED)
+        self.assertEqual(self.loan.status, LoanStatus.APPROVED)
+
+    def test_pay_batch_constant_queries(self):
+        """Test the number of queries does not grow with the batch size"""
+        def count_queries(payments):
+            with CaptureQueriesContext(connection) as context:
+                response = self.client.post(self.url, {'payments': payments}, format='json')
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            return len(context)
+
+        small = count_queries(self.get_payments(self.other_loan, 1))
+        large = count_queries(self.get_payments(self.loan, 6))
+        self.assertEqual(small, large)
+
+    def test_pay_batch_out_of_order(self):
+        """Test skipping an earlier unpaid installment rejects the whole batch"""
+        payments = self.get_payments(self.loan, 3)[1:]
+        response = self.client.post(self.url, {'payments': payments}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("You have an previous amortization that is not paid yet", str(response.data))
+        self.assertFalse(self.loan.amortizations.filter(is_paid=True).exists())
+
+    def test_pay_batch_two_digit_payment_numbers(self):
+        """Test installments are ordered by their number, not its text, past the ninth one"""
+        loan = self.create_approved_loan(duration_months=12)
+        response = self.client.post(self.url, {'payments': self.get_payments(loan, 10)}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([item['payment_number'] for item in response.data], [str(number) for number in range(1, 11)])
+
+        payments = self.get_payments(loan, 12)[11:]
+        response = self.client.post(self.url, {'payments': payments}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_pay_batch_duplicate_transaction_id(self):
+        """Test transaction ids must be unique within the batch and the database"""
+        payments = self.get_payments(self.loan, 2)
+        payments[1]['transaction_id'] = payments[0]['transaction_id']
+        response = self.client.post(self.url, {'payments': payments}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        first = self.loan.amortizations.get(payment_number='1')
+        first.is_paid = True
+        first.transaction_id = 'TRX-USED'
+        first.save()
+        payments = [{'id': self.loan.amortizations.get(payment_number='2').id, 'transaction_id': 'TRX-USED'}]
+        response = self.client.post(self.url, {'payments': payments}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("Transaction id is already exist", str(response.data))
+
+    def test_pay_batch_already_paid(self):
+        """Test including a paid installment is forbidden"""
+        payments = self.get_payments(self.loan, 1)
+        self.client.post(self.url, {'payments': payments}, format='json')
+
+        payments = self.get_payments(self.loan, 2, prefix='RETRY')
+        response = self.client.post(self.url, {'payments': payments}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_pay_batch_other_customer(self):
+        """Test installments of other customers cannot be paid"""
+        self.client.force_authenticate(user=CustomerUserFactory())
+        response = self.client.post(self.url, {'payments': self.get_payments(self.loan, 1)}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(Loan.objects.get(pk=self.loan.pk).amortizations.filter(is_paid=True).count(), 0)
@@ -0,0 +1,110 @@
+from decimal import Decimal
+from datetime import date
+
+from django.urls import reverse
+from django.test import TestCase, override_settings
+from django.core.cache import cache
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from accounts.factories import CustomerUserFactory, PersonnelUserFactory
+from loans.enums import LoanStatus
+from loans.factories import LoanTypeFactory, LoanFactory
+from loans.utils import get_customer_dashboard_cache_key
+
+
+@override_settings(DASHBOARD_CACHE_TIMEOUT=60 * 15)
+class CustomerDashboardTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.customer = CustomerUserFactory()
+        self.loan_type = LoanTypeFactory(personnel=PersonnelUserFactory(), interest_rate=12.0)
+
+        # Approving the loan generates a 12 rows schedule
+        self.loan = LoanFactory(
+            customer=self.customer,
+            loan_type=self.loan_type,
+            amount=Decimal('12000.00'),
+            duration_months=12,
+            status=LoanStatus.PENDING,
+            start_at=date(2025, 1, 1)
+        )
+        self.loan.status = LoanStatus.APPROVED
+        with self.captureOnCommitCallbacks(execute=True):
+            self.loan.save()
+
+        self.url = reverse('loans:loan-dashboard')
+        self.cache_key = get_customer_dashboard_cache_key(self.customer.id)
+        self.client.force_authenticate(user=self.customer)
+
+    def test_dashboard_payload(self):
+        """Test the dashboard aggregates active loans, totals and the next installment"""
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        self.assertEqual(len(response.data['active_loans']), 1)
+        self.assertEqual(response.data['active_loans'][0]['id'], self.loan.id)
+        self.assertEqual(response.data['unpaid_installments'], 12)
+        self.assertEqual(response.data['total_loan_amount'], '12000.00')
+        self.assertAlmostEqual(
+            Decimal(response.data['outstanding_principal']), Decimal('12000.00'), delta=Decimal('0.05')
+        )
+
+        first = self.loan.amortizations.get(payment_number='1')
+        self.assertEqual(response.data['next_installment']['id'], first.id)
+        self.assertEqual(response.data['next_installment']['payment_date'], '2025-01-01')
+
+    def test_dashboard_served_from_cache(self):
+        """Test a second read is answered from the cache without queries"""
+        self.client.get(self.url)
+        self.assertIsNotNone(cache.get(self.cache_key))
+
+        with self.assertNumQueries(0):
+            response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    @override_settings(DASHBOARD_CACHE_TIMEOUT=0)
+    def test_dashboard_not_cached_per_process(self):
+        """Test the dashboard is read from the database each time without a cache shared by the workers"""
+        self.client.get(self.url)
+        self.assertIsNone(cache.get(self.cache_key))
+
+        response = self.client.get(self.url)
+        self.assertEqual(response.data['unpaid_installments'], 12)
+
+    def test_dashboard_invalidated_on_payment(self):
+        """Test paying an installment drops the cached dashboard"""
+        self.client.get(self.url)
+
+        first = self.loan.amortizations.get(payment_number='1')
+        first.is_paid = True
+        first.transaction_id = 'TRX1'
+        with self.captureOnCommitCallbacks(execute=True):
+            first.save()
+        self.assertIsNone(cache.get(self.cache_key))
+
+        response = self.client.get(self.url)
+        self.assertEqual(response.data['unpaid_installments'], 11)
+        self.assertNotEqual(response.data['next_installment']['id'], first.id)
+
+    def test_dashboard_invalidated_on_loan_update(self):
+        """Test writing a loan drops the cached dashboard"""
+        self.client.get(self.url)
+
+        self.loan.status = LoanStatus.REJECTED
+        with self.captureOnCommitCallbacks(execute=True):
+            self.loan.save()
+        self.assertIsNone(cache.get(self.cache_key))
+
+        response = self.client.get(self.url)
+        self.assertEqual(response.data['active_loans'], [])
+        self.assertIsNone(response.data['next_installment'])
+        self.assertEqual(response.data['total_loan_amount'], '0.00')
+
+    def test_dashboard_customer_only(self):
+        """Test non customers cannot read a dashboard"""
+        self.client.force_authenticate(user=PersonnelUserFactory())
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
@@ -0,0 +1,134 @@
+from decimal import Decimal
+from datetime import date
+
+from django.db import transaction
+from django.test import TestCase
+
+from accounts.factories import CustomerUserFactory
+from loans.enums import LoanStatus
+from loans.deferred import DeferredProcessor
+from loans.factories import LoanTypeFactory, LoanFactory
+from loans.models import Loan, AmortizationSchedule
+from loans.signals import build_amortization_schedule
+
+
+class DeferredProcessorTests(TestCase):
+    def setUp(self):
+        self.customer = CustomerUserFactory()
+        self.loan_type = LoanTypeFactory(interest_rate=12.0, max_amount=Decimal('900000.00'))
+
+    def create_loan(self, **kwargs):
+        return LoanFactory(
+            customer=self.customer,
+            loan_type=self.loan_type,
+            amount=Decimal('50000.00'),
+            status=LoanStatus.PENDING,
+            start_at=date(2025, 1, 1),
+            **kwargs
+        )
+
+    def test_values_handled_once_on_commit(self):
+        """Test a value added many times reaches its handler once, after the commit"""
+        processor = DeferredProcessor()
+        handled = []
+        processor.register('loans')(handled.append)
+
+        with self.captureOnCommitCallbacks() as callbacks:
+            for value in (1, 2, 1, 2, 1):
+                processor.add('loans', value)
+            processor.add('loans', None)
+        self.assertEqual(handled, [])
+
+        for callback in callbacks:
+            callback()
+        self.assertEqual(handled, [{1, 2}])
+
+    def test_rolled_back_values_dropped(self):
+        """Test values added in a rolled back savepoint never reach their handler"""
+        processor = DeferredProcessor()
+        handled = []
+        processor.register('loans')(handled.append)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            with self.assertRaises(RuntimeError), transaction.atomic():
+                processor.add('loans', 1)
+                raise RuntimeError
+            processor.add('loans', 2)
+        self.assertEqual(handled, [{2}])
+
+    def test_savepoint_rolled_back_after_outer_values(self):
+        """Test values of a rolled back savepoint are dropped while the outer values are kept"""
+        processor = DeferredProcessor()
+        handled = []
+        processor.register('loans')(handled.append)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            processor.add('loans', 1)
+            with self.assertRaises(RuntimeError), transaction.atomic():
+                processor.add('loans', 2)
+                raise RuntimeError
+            processor.add('loans', 3)
+        self.assertEqual(handled, [{1, 3}])
+
+    def test_one_callback_per_savepoint(self):
+        """Test many values queue one callback per savepoint level rather than one per value"""
+        processor = DeferredProcessor()
+        processor.register('loans')(lambda values: None)
+
+        with self.captureOnCommitCallbacks() as callbacks:
+            for value in range(1000):
+                processor.add('loans', value)
+            with transaction.atomic():
+                for value in range(1000):
+                    processor.add('loans', value)
+        self.assertEqual(len(callbacks), 2)
+
+    def test_bulk_schedule_updates_constant_queries(self):
+        """Test paying 1,000 schedules runs the completion and invalidation queries once"""
+        loans = [self.create_loan(duration_months=500) for _ in range(2)]
+        Loan.objects.filter(id__in=[loan.id for loan in loans]).update(status=LoanStatus.APPROVED)
+        AmortizationSchedule.objects.bulk_create(
+            [schedule for loan in loans for schedule in build_amortization_schedule(loan)]
+        )
+        schedules = list(AmortizationSchedule.objects.filter(loan__in=loans))
+        self.assertEqual(len(schedules), 1000)
+
+        with self.captureOnCommitCallbacks() as callbacks:
+            with self.assertNumQueries(1000):
+                for schedule in schedules:
+                    schedule.is_paid = True
+                    schedule.transaction_id = f'TRX-{schedule.id}'
+                    schedule.save()
+
+        # One completion UPDATE and one customer lookup for the dashboards
+        with self.assertNumQueries(2):
+            for callback in callbacks:
+                callback()
+        self.assertEqual(Loan.objects.filter(status=LoanStatus.COMPLETED).count(), 2)
+
+    def test_bulk_approval_constant_queries(self):
+        """Test approving many loans generates every schedule with a constant number of queries"""
+        loans = [self.create_loan(duration_months=12) for _ in range(5)]
+
+        with self.captureOnCommitCallbacks() as callbacks:
+            for loan in loans:
+                loan.status = LoanStatus.APPROVED
+                loan.save()
+
+        # One lookup of the approved loans and one INSERT, kept under the SQLite batch size
+        with self.assertNumQueries(2):
+            for callback in callbacks:
+                callback()
+        self.assertEqual(AmortizationSchedule.objects.filter(loan__in=loans).count(), 5 * 12)
+
+    def test_rolled_back_approval_not_processed(self):
+        """Test an approval rolled back before the commit generates no schedule"""
+        loan = self.create_loan(duration_months=12)
+
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            with self.assertRaises(RuntimeError), transaction.atomic():
+                loan.status = LoanStatus.APPROVED
+                loan.save()
+                raise RuntimeError
+        self.assertEqual(callbacks, [])
+        self.assertFalse(loan.amortizations.exists())
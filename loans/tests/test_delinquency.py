@@ -0,0 +1,147 @@
+from io import StringIO
+from decimal import Decimal
+from datetime import date
+
+from django.db import connection
+from django.urls import reverse
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.core.management import call_command
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from accounts.factories import CustomerUserFactory, PersonnelUserFactory
+from loans.enums import LoanStatus, DelinquencyBucket
+from loans.factories import LoanFactory
+from loans.delinquency import update_delinquencies
+from loans.models import AmortizationSchedule, LoanDelinquency, DelinquencyRun
+
+
+def create_loan(*due_dates, status=LoanStatus.ACTIVE):
+    loan = LoanFactory(customer=CustomerUserFactory(), status=status)
+    AmortizationSchedule.objects.bulk_create(
+        AmortizationSchedule(
+            loan=loan,
+            payment_number=str(number),
+            payment_date=payment_date,
+            principal_amount=Decimal('90.00'),
+            interest_amount=Decimal('10.00'),
+            total_payment=Decimal('100.00'),
+            remaining_balance=Decimal('1000.00'),
+        )
+        for number, payment_date in enumerate(due_dates, start=1)
+    )
+    return loan
+
+
+class DelinquencyTests(TestCase):
+    def setUp(self):
+        self.loan = create_loan(date(2025, 1, 31), date(2025, 2, 28), date(2025, 3, 31))
+
+    def test_first_run(self):
+        """Test a loan with installments past their due date is tracked with its days past due"""
+        run = update_delinquencies(as_of=date(2025, 3, 1))
+        self.assertEqual((run.newly_overdue, run.delinquent_loans, run.cured_loans), (2, 1, 0))
+
+        delinquency = LoanDelinquency.objects.get(loan=self.loan)
+        self.assertEqual(delinquency.oldest_due_date, date(2025, 1, 31))
+        self.assertEqual(delinquency.overdue_installments, 2)
+        self.assertEqual(delinquency.overdue_amount, Decimal('200.00'))
+        self.assertEqual(delinquency.days_past_due, 29)
+        self.assertEqual(delinquency.bucket, DelinquencyBucket.DAYS_1_30)
+
+    def test_incremental_run(self):
+        """Test a run reads only the installments fallen due since the previous one and moves the bucket"""
+        update_delinquencies(as_of=date(2025, 3, 1))
+        run = update_delinquencies(as_of=date(2025, 4, 15))
+        self.assertEqual(run.newly_overdue, 1)
+
+        delinquency = LoanDelinquency.objects.get(loan=self.loan)
+        self.assertEqual((delinquency.overdue_installments, delinquency.days_past_due), (3, 74))
+        self.assertEqual(delinquency.bucket, DelinquencyBucket.DAYS_61_90)
+
+    def test_back_dated_run(self):
+        """Test a run after a back-dated one reads again the installments fallen due since its date"""
+        loan = create_loan(date(2025, 2, 1), date(2025, 3, 1))
+        update_delinquencies(as_of=date(2025, 3, 15))
+        update_delinquencies(as_of=date(2025, 1, 20))
+        self.assertFalse(LoanDelinquency.objects.filter(loan=loan).exists())
+
+        run = update_delinquencies(as_of=date(2025, 3, 16))
+        self.assertEqual(run.newly_overdue, 4)
+        self.assertEqual(LoanDelinquency.objects.get(loan=loan).overdue_installments, 2)
+
+    def test_cured_loan(self):
+        """Test a loan paid up since the previous run is dropped"""
+        update_delinquencies(as_of=date(2025, 3, 1))
+        AmortizationSchedule.objects.filter(loan=self.loan, payment_date__lt=date(2025, 3, 1)).update(is_paid=True)
+
+        run = update_delinquencies(as_of=date(2025, 3, 2))
+        self.assertEqual((run.delinquent_loans, run.cured_loans), (0, 1))
+        self.assertFalse(LoanDelinquency.objects.exists())
+
+    def test_closed_loans_ignored(self):
+        """Test only loans being repaid are delinquent"""
+        create_loan(date(2025, 1, 31), status=LoanStatus.REJECTED)
+        self.assertEqual(update_delinquencies(as_of=date(2025, 3, 1)).delinquent_loans, 1)
+
+    def test_command(self):
+        """Test the command runs as of the given date"""
+        output = StringIO()
+        call_command('update_delinquencies', '--date', '2025-03-01', stdout=output)
+        self.assertIn('1 delinquent loans as of 2025-03-01, 2 installments newly overdue', output.getvalue())
+
+
+class LoanDelinquencyViewSetTests(APITestCase):
+    def setUp(self):
+        self.loans = [create_loan(date(2025, 3, day)) for day in (1, 2, 3)]
+        self.old_loan = create_loan(date(2024, 12, 1))
+        update_delinquencies(as_of=date(2025, 3, 10))
+        self.url = reverse('loans:delinquency-list')
+        self.client.force_authenticate(user=PersonnelUserFactory())
+
+    def test_keyset_pages(self):
+        """Test personnel page through the delinquent loans, most overdue first"""
+        loan_ids = []
+        url = f'{self.url}?page_size=3'
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            loan_ids += [delinquency['loan'] for delinquency in response.data['results']]
+            url = response.data['next']
+        self.assertEqual(loan_ids, [self.old_loan.id, *(loan.id for loan in self.loans)])
+
+    def test_keyset_pages_shared_due_date(self):
+        """Test loans sharing a due date are paged by their id, forwards and back, without an offset"""
+        same_day = [create_loan(date(2025, 2, 1)) for _ in range(7)]
+        # Fallen due before the last run, read by a first run again
+        DelinquencyRun.objects.all().delete()
+        update_delinquencies(as_of=date(2025, 3, 10))
+        expected = [self.old_loan.id, *(loan.id for loan in same_day), *(loan.id for loan in self.loans)]
+
+        pages, url = [], f'{self.url}?page_size=3'
+        while url:
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.get(url)
+            self.assertFalse(any('OFFSET' in query['sql'] for query in queries.captured_queries))
+            pages.append([delinquency['loan'] for delinquency in response.data['results']])
+            previous, url = response.data['previous'], response.data['next']
+        self.assertEqual(sum(pages, []), expected)
+
+        back = []
+        while previous:
+            response = self.client.get(previous)
+            back.insert(0, [delinquency['loan'] for delinquency in response.data['results']])
+            previous = response.data['previous']
+        self.assertEqual(back, pages[:-1])
+
+    def test_bucket_filter(self):
+        """Test the list is filtered by days past due bucket"""
+        response = self.client.get(self.url, {'bucket': DelinquencyBucket.DAYS_90_PLUS})
+        self.assertEqual([delinquency['loan'] for delinquency in response.data['results']], [self.old_loan.id])
+        self.assertEqual(self.client.get(self.url, {'bucket': 9}).status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_customer_forbidden(self):
+        """Test customers cannot list delinquent loans"""
+        self.client.force_authenticate(user=self.loans[0].customer)
+        self.assertEqual(self.client.get(self.url).status_code, status.HTTP_403_FORBIDDEN)
@@ -0,0 +1,92 @@
+from decimal import Decimal
+from datetime import date
+
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from accounts.factories import CustomerUserFactory
+from loans.enums import LoanStatus
+from loans.factories import LoanTypeFactory, LoanFactory
+from loans.models import Loan
+
+
+class DirtyFieldsTests(TestCase):
+    def setUp(self):
+        self.loan_type = LoanTypeFactory(interest_rate=10.0)
+        self.loan = LoanFactory(
+            customer=CustomerUserFactory(),
+            loan_type=self.loan_type,
+            amount=Decimal('6000.00'),
+            duration_months=12,
+            status=LoanStatus.PENDING,
+            start_at=date(2025, 1, 1)
+        )
+
+    def test_dirty_fields(self):
+        """Test only the fields assigned a new value are reported as dirty"""
+        loan = Loan.objects.get(pk=self.loan.pk)
+        self.assertEqual(loan.get_dirty_fields(), set())
+
+        loan.amount = Decimal('6000.00')
+        loan.duration_months = 24
+        self.assertEqual(loan.get_dirty_fields(), {'duration_months'})
+        self.assertTrue(loan.has_changed('duration_months'))
+        self.assertFalse(loan.has_changed('amount'))
+
+        loan.save()
+        self.assertEqual(loan.get_dirty_fields(), set())
+
+    def test_save_writes_changed_columns(self):
+        """Test a save updates the changed columns and update_at only"""
+        loan = Loan.objects.get(pk=self.loan.pk)
+        loan.duration_months = 24
+        with CaptureQueriesContext(connection) as context:
+            loan.save()
+
+        self.assertEqual(len(context), 1)
+        sql = context.captured_queries[0]['sql']
+        self.assertIn('"duration_months"', sql)
+        self.assertIn('"update_at"', sql)
+        self.assertNotIn('"amount"', sql)
+        self.assertNotIn('"status"', sql)
+
+        loan.refresh_from_db()
+        self.assertEqual(loan.duration_months, 24)
+
+    def test_clean_save_skipped(self):
+        """Test saving an unchanged instance runs no query"""
+        loan = Loan.objects.get(pk=self.loan.pk)
+        with self.assertNumQueries(0):
+            loan.save()
+
+    def test_deferred_fields(self):
+        """Test an instance loaded with only() writes the fields set afterwards"""
+        loan = Loan.objects.only('id').get(pk=self.loan.pk)
+        loan.status = LoanStatus.REJECTED
+        self.assertEqual(loan.get_dirty_fields(), {'status'})
+
+        # Reading a deferred field loads it unchanged
+        self.assertEqual(loan.amount, Decimal('6000.00'))
+        self.assertEqual(loan.get_dirty_fields(), {'status'})
+
+        loan.save()
+        self.assertEqual(Loan.objects.get(pk=self.loan.pk).status, LoanStatus.REJECTED)
+
+    def test_schedule_generated_on_approval_only(self):
+        """Test saving an approved loan without a status change generates no schedule"""
+        Loan.objects.filter(pk=self.loan.pk).update(status=LoanStatus.APPROVED)
+        loan = Loan.objects.get(pk=self.loan.pk)
+        self.assertFalse(loan.changed_to('status', LoanStatus.APPROVED))
+
+        loan.duration_months = 24
+        with self.captureOnCommitCallbacks(execute=True):
+            loan.save()
+        self.assertFalse(loan.amortizations.exists())
+
+        created = LoanFactory(customer=CustomerUserFactory(), loan_type=self.loan_type, status=LoanStatus.PENDING)
+        created.status = LoanStatus.APPROVED
+        self.assertTrue(created.changed_to('status', LoanStatus.APPROVED))
+        with self.captureOnCommitCallbacks(execute=True):
+            created.save()
+        self.assertTrue(created.amortizations.exists())
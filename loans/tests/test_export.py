@@ -0,0 +1,123 @@
+import os
+import csv
+import json
+import tracemalloc
+from decimal import Decimal
+from datetime import date, timedelta
+
+from django.urls import reverse
+from django.test import TestCase
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from accounts.factories import PersonnelUserFactory, ProviderUserFactory, CustomerUserFactory
+from loans.enums import LoanStatus
+from loans.models import AmortizationSchedule
+from loans.factories import LoanFactory
+from loans.api.views import ExportViewSet
+
+
+def create_schedules(loan, rows):
+    start = date(2025, 1, 1)
+    AmortizationSchedule.objects.bulk_create(
+        (
+            AmortizationSchedule(
+                loan=loan,
+                payment_number=str(number),
+                payment_date=start + timedelta(days=number),
+                principal_amount=Decimal('100.00'),
+                interest_amount=Decimal('10.50'),
+                total_payment=Decimal('110.50'),
+                remaining_balance=Decimal('99999.99'),
+                is_paid=False
+            )
+            for number in range(1, rows + 1)
+        ),
+        batch_size=5000
+    )
+
+
+class ExportViewSetTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.loan = LoanFactory(customer=CustomerUserFactory(), status=LoanStatus.ACTIVE)
+        create_schedules(self.loan, rows=5)
+
+        self.loans_url = reverse('loans:export-loans')
+        self.amortizations_url = reverse('loans:export-amortizations')
+        self.client.force_authenticate(user=PersonnelUserFactory())
+
+    def test_export_amortizations_csv(self):
+        """Test the CSV export streams a header and one line per schedule"""
+        response = self.client.get(self.amortizations_url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.streaming)
+        self.assertEqual(response['Content-Type'], 'text/csv')
+
+        rows = list(csv.reader(b''.join(response.streaming_content).decode().splitlines()))
+        self.assertEqual(rows[0][:3], ['id', 'payment_number', 'payment_date'])
+        self.assertEqual(len(rows), 6)
+        self.assertEqual(rows[1][1:4], ['1', '2025-01-02', '100.00'])
+
+    def test_export_loans_ndjson(self):
+        """Test the NDJSON export matches the API representation"""
+        self.client.force_authenticate(user=ProviderUserFactory())
+        response = self.client.get(self.loans_url, {'output': 'ndjson'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        lines = b''.join(response.streaming_content).splitlines()
+        self.assertEqual(len(lines), 1)
+        self.assertEqual(json.loads(lines[0])['id'], self.loan.id)
+        self.assertEqual(json.loads(lines[0])['amount'], f'{self.loan.amount:.2f}')
+
+    def test_export_unknown_format(self):
+        """Test unknown export formats are rejected"""
+        response = self.client.get(self.loans_url, {'output': 'xlsx'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_export_customer_denied(self):
+        """Test customers cannot export the loan book"""
+        self.client.force_authenticate(user=self.loan.customer)
+        response = self.client.get(self.loans_url)
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+
+class ExportMemoryTests(TestCase):
+    # Set EXPORT_MEMORY_ROWS=1000000 to run the check against a million rows
+    rows = int(os.environ.get('EXPORT_MEMORY_ROWS', 20000))
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.loan = LoanFactory(customer=CustomerUserFactory(), status=LoanStatus.ACTIVE)
+        create_schedules(cls.loan, rows=cls.rows)
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(user=PersonnelUserFactory())
+
+    def measure_peak(self, max_rows):
+        response = self.client.get(reverse('loans:export-amortizations'), {'output': 'ndjson'})
+        tracemalloc.start()
+        try:
+            streamed = 0
+            for chunk in response.streaming_content:
+                streamed += chunk.count(b'\n')
+                if streamed >= max_rows:
+                    break
+            return streamed, tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+            response.close()
+
+    def test_memory_stays_flat(self):
+        """Test streaming every row peaks at about the memory of the first chunks"""
+        head_rows = ExportViewSet.chunk_size * 3
+        streamed, head_peak = self.measure_peak(max_rows=head_rows)
+        self.assertEqual(streamed, head_rows)
+
+        streamed, full_peak = self.measure_peak(max_rows=self.rows)
+        self.assertEqual(streamed, self.rows)
+
+        # A buffered export grows linearly with the row count (~300 bytes per row)
+        self.assertLess(full_peak, head_peak * 1.5 + 512 * 1024)
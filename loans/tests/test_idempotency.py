@@ -0,0 +1,147 @@
+from io import StringIO
+from decimal import Decimal
+from datetime import date, timedelta
+
+from django.urls import reverse
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from django.core.management import call_command
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from accounts.factories import CustomerUserFactory, PersonnelUserFactory, ProviderUserFactory
+from loans.enums import LoanStatus
+from loans.models import Loan, IdempotencyKey
+from loans.factories import LoanFundTypeFactory, LoanFundFactory, LoanTypeFactory, LoanFactory
+
+
+class IdempotencyKeyTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.customer = CustomerUserFactory()
+        self.loan_type = LoanTypeFactory(
+            personnel=PersonnelUserFactory(),
+            min_amount=Decimal('1000.00'),
+            max_amount=Decimal('50000.00'),
+            min_duration_months=6,
+            max_duration_months=60
+        )
+        LoanFundFactory(
+            provider=ProviderUserFactory(),
+            loan_type=LoanFundTypeFactory(),
+            amount=Decimal('100000.00')
+        )
+
+        self.url = reverse('loans:loan-list')
+        self.data = {
+            'loan_type': self.loan_type.id,
+            'amount': '5000.00',
+            'duration_months': 12,
+            'start_at': date.today().isoformat()
+        }
+        self.client.force_authenticate(user=self.customer)
+
+    def post(self, data=None, key='retry-1'):
+        return self.client.post(self.url, data or self.data, format='json', HTTP_IDEMPOTENCY_KEY=key)
+
+    def test_retry_replays_stored_response(self):
+        """Test a retried request returns the first response without creating twice"""
+        first = self.post()
+        self.assertEqual(first.status_code, status.HTTP_201_CREATED)
+
+        # Only the key lookup runs for a replay, the view and its validation are skipped
+        with self.assertNumQueries(1):
+            retry = self.post()
+        self.assertEqual(retry.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(retry.content, first.content)
+        self.assertEqual(retry['Idempotent-Replayed'], 'true')
+        self.assertEqual(Loan.objects.count(), 1)
+
+    def test_key_reused_with_other_payload(self):
+        """Test a key cannot be reused for a different request"""
+        self.post()
+        response = self.post({**self.data, 'amount': '6000.00'})
+        self.assertEqual(response.status_code, status.HTTP_422_UNPROCESSABLE_ENTITY)
+        self.assertEqual(Loan.objects.count(), 1)
+
+    def test_key_in_progress(self):
+        """Test a retry racing the first request is rejected"""
+        self.post()
+        IdempotencyKey.objects.update(status_code=None)
+        response = self.post()
+        self.assertEqual(response.status_code, status.HTTP_409_CONFLICT)
+        self.assertEqual(Loan.objects.count(), 1)
+
+    def test_stale_key_taken_over(self):
+        """Test a retry takes over a key left unanswered past its lease, by a worker that died mid-request"""
+        self.post()
+        IdempotencyKey.objects.update(status_code=None, create_at=timezone.now() - timedelta(minutes=5))
+        response = self.post()
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertNotIn('Idempotent-Replayed', response)
+
+        record = IdempotencyKey.objects.get()
+        self.assertEqual(record.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(self.post()['Idempotent-Replayed'], 'true')
+
+    def test_keys_scoped_per_user(self):
+        """Test the same key from another customer runs the request"""
+        self.post()
+        self.client.force_authenticate(user=CustomerUserFactory())
+        response = self.post()
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertNotIn('Idempotent-Replayed', response)
+        self.assertEqual(Loan.objects.count(), 2)
+
+    def test_validation_errors_are_replayed(self):
+        """Test client errors are stored like successful responses"""
+        data = {**self.data, 'amount': '999999.00'}
+        self.assertEqual(self.post(data).status_code, status.HTTP_400_BAD_REQUEST)
+        retry = self.post(data)
+        self.assertEqual(retry.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(retry['Idempotent-Replayed'], 'true')
+
+    def test_expired_key_runs_again(self):
+        """Test a key past its timeout no longer replays"""
+        self.post()
+        IdempotencyKey.objects.update(expires_at=timezone.now() - timedelta(seconds=1))
+        response = self.post()
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertNotIn('Idempotent-Replayed', response)
+        self.assertEqual(IdempotencyKey.objects.count(), 1)
+
+    def test_without_key(self):
+        """Test requests without the header are not stored"""
+        self.client.post(self.url, self.data, format='json')
+        self.assertFalse(IdempotencyKey.objects.exists())
+
+    def test_pay_replayed(self):
+        """Test paying an installment twice with one key pays it once"""
+        loan = LoanFactory(customer=self.customer, loan_type=self.loan_type, status=LoanStatus.PENDING,
+                           start_at=date.today())
+        loan.status = LoanStatus.APPROVED
+        with self.captureOnCommitCallbacks(execute=True):
+            loan.save()
+        schedule = loan.amortizations.get(payment_number='1')
+        url = reverse('loans:amortization-pay', kwargs={'pk': schedule.pk})
+
+        data = {'transaction_id': 'TRX-1'}
+        first = self.client.post(url, data, format='json', HTTP_IDEMPOTENCY_KEY='pay-1')
+        retry = self.client.post(url, data, format='json', HTTP_IDEMPOTENCY_KEY='pay-1')
+        self.assertEqual(first.status_code, status.HTTP_200_OK)
+        self.assertEqual(retry.content, first.content)
+
+    @override_settings(IDEMPOTENCY_KEY_PURGE_BATCH=2)
+    def test_purge_is_bounded(self):
+        """Test a request purges at most a batch of expired keys"""
+        expired = timezone.now() - timedelta(seconds=1)
+        IdempotencyKey.objects.bulk_create(
+            IdempotencyKey(user=self.customer, key=f'old-{number}', fingerprint='', expires_at=expired)
+            for number in range(5)
+        )
+        self.post()
+        self.assertEqual(IdempotencyKey.objects.filter(expires_at__lte=timezone.now()).count(), 3)
+
+        call_command('purge_idempotency_keys', '--batch-size', '2', stdout=StringIO())
+        self.assertEqual(IdempotencyKey.objects.count(), 1)
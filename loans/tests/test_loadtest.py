@@ -0,0 +1,74 @@
+import tempfile
+from io import StringIO
+from decimal import Decimal
+
+from django.test import TestCase, override_settings
+from django.core.management import call_command
+from django.core.management.base import CommandError
+
+from core.testing import get_authorization
+from loans.enums import LoanStatus
+from loans.loadtest import (ClientTransport, LoanScenario, Recorder, compare_reports, get_latency_stats,
+                            seed_load_test)
+from loans.models import Loan, AmortizationSchedule
+
+
+@override_settings(PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'])
+class LoadTestTests(TestCase):
+    def test_scenario(self):
+        """Test a scenario applies, approves and pays a loan, timing every endpoint"""
+        customers, personnel, loan_type_id = seed_load_test(customers=2, password='secret',
+                                                            amount=Decimal('5000.00'), installments=12)
+        self.assertEqual(len(customers), 2)
+
+        client = ClientTransport()
+
+        def transport(*args):
+            # Run the schedule generation and the status updates the commit would trigger
+            with self.captureOnCommitCallbacks(execute=True):
+                return client(*args)
+
+        recorder = Recorder()
+        LoanScenario(transport, recorder, get_authorization(customers[0], 'secret'),
+                     get_authorization(personnel, 'secret'), loan_type_id, Decimal('5000.00'), 12).run()
+
+        loan = Loan.objects.get()
+        self.assertEqual(loan.status, LoanStatus.COMPLETED)
+        self.assertFalse(AmortizationSchedule.objects.filter(is_paid=False).exists())
+
+        report = recorder.build_report()
+        self.assertEqual(report['endpoints']['POST /api/loans/amortization/{id}/pay/']['count'], 12)
+        self.assertEqual(report['endpoints']['POST /api/loans/review/{id}/approve/']['count'], 1)
+        self.assertFalse(any(stats['errors'] for stats in report['endpoints'].values()))
+
+    def test_latency_stats(self):
+        """Test percentiles, errors and histogram buckets of an endpoint"""
+        stats = get_latency_stats([index / 1000 for index in range(1, 101)], errors=3, elapsed=2)
+        self.assertEqual((stats['count'], stats['errors'], stats['throughput']), (100, 3, 50))
+        self.assertEqual((stats['p50'], stats['p95'], stats['p99'], stats['max']), (50.5, 95.05, 99.01, 100))
+        self.assertEqual(sum(count for _, count in stats['histogram']), 100)
+        self.assertEqual(stats['histogram'][:3], [[1, 1], [2, 1], [5, 3]])
+
+    def test_compare_reports(self):
+        """Test reports are compared metric by metric on their shared endpoints"""
+        baseline = {'endpoints': {'GET /api/loans/': {'throughput': 100, 'p50': 10, 'p95': 20, 'p99': 40,
+                                                      'errors': 0}}}
+        report = {'endpoints': {'GET /api/loans/': {'throughput': 80, 'p50': 15, 'p95': 20, 'p99': 30, 'errors': 2},
+                                'scenario': {'throughput': 1, 'p50': 1, 'p95': 1, 'p99': 1, 'errors': 0}}}
+        rows = compare_reports(baseline, report)
+        self.assertEqual(rows, [
+            ('GET /api/loans/', 'throughput', 100, 80, -0.2),
+            ('GET /api/loans/', 'p50', 10, 15, 0.5),
+            ('GET /api/loans/', 'p95', 20, 20, 0.0),
+            ('GET /api/loans/', 'p99', 40, 30, -0.25),
+            ('GET /api/loans/', 'errors', 0, 2, None),
+        ])
+
+    def test_command_errors(self):
+        """Test invalid options and baselines are command errors"""
+        with tempfile.NamedTemporaryFile('w', suffix='.json') as baseline:
+            baseline.write('not json')
+            baseline.flush()
+            for args in (['--users', '0'], ['--rate', '-1'], ['--amount', 'lots'], ['--compare', baseline.name]):
+                with self.assertRaises(CommandError):
+                    call_command('loadtest', *args, stdout=StringIO())
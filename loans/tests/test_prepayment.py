@@ -0,0 +1,144 @@
+from decimal import Decimal
+from datetime import date
+
+from django.db.models import Sum
+from django.urls import reverse
+from django.test import TestCase
+from django.core.cache import cache
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from accounts.factories import CustomerUserFactory
+from loans.enums import LoanStatus, PrepaymentMode
+from loans.factories import LoanTypeFactory, LoanFactory
+from loans.models import Prepayment
+from loans.utils import iter_amortization_rows, get_customer_dashboard_cache_key
+
+
+class LoanPrepaymentTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.customer = CustomerUserFactory()
+        self.loan = LoanFactory(
+            customer=self.customer,
+            loan_type=LoanTypeFactory(interest_rate=12.0),
+            amount=Decimal('12000.00'),
+            duration_months=12,
+            status=LoanStatus.PENDING,
+            start_at=date(2025, 1, 1)
+        )
+        self.loan.status = LoanStatus.APPROVED
+        with self.captureOnCommitCallbacks(execute=True):
+            self.loan.save()
+
+        # The first two installments are already paid
+        self.loan.amortizations.filter(payment_number__in=['1', '2']).update(is_paid=True)
+        self.paid = {
+            schedule.id: schedule.update_at for schedule in self.loan.amortizations.filter(is_paid=True)
+        }
+
+        self.url = reverse('loans:loan-prepay', kwargs={'pk': self.loan.pk})
+        self.client.force_authenticate(user=self.customer)
+
+    def outstanding(self):
+        return self.loan.amortizations.filter(is_paid=False).aggregate(total=Sum('principal_amount'))['total']
+
+    def test_prepay_keep_term(self):
+        """Test keeping the term lowers every remaining installment"""
+        before = self.outstanding()
+        response = self.client.post(self.url, {'amount': '3000.00', 'transaction_id': 'TX-1'}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data), 10)
+
+        self.assertEqual(self.outstanding(), before - Decimal('3000.00'))
+        payments = {item['total_payment'] for item in response.data}
+        self.assertEqual(len(payments), 1)
+        self.assertLess(Decimal(payments.pop()), Decimal('1066.19'))
+        self.assertEqual(response.data[-1]['remaining_balance'], '0.00')
+
+        prepayment = Prepayment.objects.get(loan=self.loan)
+        self.assertEqual((prepayment.amount, prepayment.transaction_id), (Decimal('3000.00'), 'TX-1'))
+
+    def test_prepay_keep_payment(self):
+        """Test keeping the payment shortens the loan and drops the extra installments"""
+        response = self.client.post(self.url, {'amount': '3000.00', 'mode': PrepaymentMode.KEEP_PAYMENT,
+                                                'transaction_id': 'TX-1'},
+                                    format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertLess(len(response.data), 10)
+        self.assertEqual(response.data[0]['total_payment'], '1066.19')
+
+        self.loan.refresh_from_db()
+        self.assertEqual(self.loan.amortizations.count(), self.loan.duration_months)
+        self.assertEqual(self.loan.amortizations.filter(is_paid=False).count(), len(response.data))
+
+    def test_prepay_invalidates_dashboard_on_commit(self):
+        """Test the cached dashboard is dropped once the prepayment commits, not while it is written"""
+        cache_key = get_customer_dashboard_cache_key(self.customer.id)
+        cache.set(cache_key, {'unpaid_installments': 10})
+        with self.captureOnCommitCallbacks() as callbacks:
+            response = self.client.post(self.url, {'amount': '3000.00', 'transaction_id': 'TX-1'}, format='json')
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertIsNotNone(cache.get(cache_key))
+
+        for callback in callbacks:
+            callback()
+        self.assertIsNone(cache.get(cache_key))
+
+    def test_prepay_leaves_paid_rows(self):
+        """Test paid installments are never rewritten"""
+        self.client.post(self.url, {'amount': '1000.00', 'transaction_id': 'TX-1'}, format='json')
+        for schedule in self.loan.amortizations.filter(is_paid=True):
+            self.assertEqual(schedule.update_at, self.paid[schedule.id])
+
+    def test_prepay_constant_queries(self):
+        """Test the tail is updated in bulk rather than row by row"""
+        with self.assertNumQueries(11):
+            self.client.post(self.url, {'amount': '1000.00', 'transaction_id': 'TX-1'}, format='json')
+
+    def test_prepay_full_balance(self):
+        """Test prepaying the whole outstanding principal is rejected"""
+        response = self.client.post(self.url, {'amount': str(self.outstanding()), 'transaction_id': 'TX-1'},
+                                    format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_prepay_without_transaction_id(self):
+        """Test a prepayment without a transaction id is rejected and changes nothing"""
+        before = self.outstanding()
+        response = self.client.post(self.url, {'amount': '1000.00'}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('transaction_id', response.data)
+        self.assertEqual(self.outstanding(), before)
+        self.assertFalse(Prepayment.objects.exists())
+
+    def test_prepay_used_transaction_id(self):
+        """Test a transaction id already used by a prepayment or an installment is rejected"""
+        self.loan.amortizations.filter(payment_number='1').update(transaction_id='TX-PAID')
+        response = self.client.post(self.url, {'amount': '1000.00', 'transaction_id': 'TX-1'}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        before = self.outstanding()
+        for transaction_id in ('TX-1', 'TX-PAID'):
+            response = self.client.post(self.url, {'amount': '1000.00', 'transaction_id': transaction_id},
+                                        format='json')
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(self.outstanding(), before)
+        self.assertEqual(Prepayment.objects.count(), 1)
+
+    def test_prepay_pending_loan(self):
+        """Test loans that are not being repaid cannot be prepaid"""
+        loan = LoanFactory(customer=self.customer, status=LoanStatus.PENDING)
+        response = self.client.post(reverse('loans:loan-prepay', kwargs={'pk': loan.pk}),
+                                    {'amount': '10.00', 'transaction_id': 'TX-1'}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_rows_match_full_schedule(self):
+        """Test the shared row generator reproduces the approval schedule"""
+        rows = list(iter_amortization_rows(Decimal('12000.00'), Decimal('0.01'), total_periods=12))
+        schedules = self.loan.amortizations.order_by('payment_date')
+        self.assertEqual(rows, [
+            (schedule.principal_amount, schedule.interest_amount, schedule.total_payment,
+             schedule.remaining_balance)
+            for schedule in schedules
+        ])
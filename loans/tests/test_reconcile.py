@@ -0,0 +1,145 @@
+import os
+import csv
+import tempfile
+from io import StringIO
+from decimal import Decimal
+from datetime import date, timedelta
+from unittest.mock import patch
+
+from django.test import TestCase
+from django.core.management import call_command
+from django.core.management.base import CommandError
+
+from accounts.factories import CustomerUserFactory
+from loans.enums import LoanStatus
+from loans.factories import LoanTypeFactory, LoanFactory
+from loans.managers import AmortizationScheduleManager
+from loans.reconciliation import MismatchReason
+
+
+class ReconcileStatementTests(TestCase):
+    def setUp(self):
+        self.customer = CustomerUserFactory()
+        self.loan = LoanFactory(
+            customer=self.customer,
+            loan_type=LoanTypeFactory(interest_rate=10.0),
+            amount=Decimal('6000.00'),
+            duration_months=3,
+            status=LoanStatus.PENDING,
+            start_at=date(2025, 1, 1)
+        )
+        self.loan.status = LoanStatus.APPROVED
+        with self.captureOnCommitCallbacks(execute=True):
+            self.loan.save()
+        self.schedules = list(self.loan.amortizations.order_by('payment_number'))
+
+    def write_statement(self, lines):
+        handle, path = tempfile.mkstemp(suffix='.csv')
+        with os.fdopen(handle, 'w', newline='') as statement:
+            writer = csv.writer(statement)
+            writer.writerow(['date', 'amount', 'reference', 'transaction_id'])
+            writer.writerows(lines)
+        self.addCleanup(os.remove, path)
+        return path
+
+    def line(self, schedule, transaction_id, days=0, reference=None):
+        payment_date = schedule.payment_date + timedelta(days=days)
+        return [payment_date.isoformat(), str(schedule.total_payment), reference or self.customer.username,
+                transaction_id]
+
+    def reconcile(self, lines, *args):
+        out, err = StringIO(), StringIO()
+        call_command('reconcile_statement', self.write_statement(lines), *args, stdout=out, stderr=err)
+        return list(csv.DictReader(StringIO(out.getvalue()))), err.getvalue()
+
+    def test_reconcile_pays_matching_lines(self):
+        """Test matching lines pay the installments and complete the loan"""
+        lines = [self.line(schedule, f'BANK-{number}', days=2) for number, schedule in enumerate(self.schedules)]
+        report, summary = self.reconcile(lines, '--batch-size', '2')
+
+        self.assertEqual(report, [])
+        self.assertIn('3 lines, 3 matched, 0 mismatched', summary)
+        self.loan.refresh_from_db()
+        self.assertEqual(self.loan.status, LoanStatus.COMPLETED)
+        self.assertEqual(self.loan.amortizations.get(payment_number='1').transaction_id, 'BANK-0')
+
+    def test_reconcile_reports_mismatches(self):
+        """Test every unmatched line is reported with its reason"""
+        first = self.schedules[0]
+        lines = [
+            self.line(first, 'BANK-1'),
+            self.line(first, 'BANK-1'),
+            self.line(first, 'BANK-2', reference='nobody'),
+            self.line(self.schedules[1], 'BANK-3', days=20),
+            ['not-a-date', '1', self.customer.username, 'BANK-4'],
+        ]
+        report, _ = self.reconcile(lines)
+
+        self.assertEqual([row['reason'] for row in report], [
+            MismatchReason.INVALID_LINE,
+            MismatchReason.DUPLICATE_TRANSACTION,
+            MismatchReason.UNKNOWN_REFERENCE,
+            MismatchReason.NO_MATCH,
+        ])
+        self.assertEqual(report[1]['line'], '3')
+        self.assertEqual(self.loan.amortizations.filter(is_paid=True).count(), 1)
+
+    def test_reconcile_out_of_order(self):
+        """Test a line matching an installment while an earlier one is unpaid is reported, not paid"""
+        second = self.schedules[1]
+        # Within the tolerance of the second installment only, the first one stays unpaid
+        report, summary = self.reconcile([self.line(second, 'BANK-2', days=-3)], '--tolerance-days', '5')
+
+        self.assertEqual([row['reason'] for row in report], [MismatchReason.OUT_OF_ORDER])
+        self.assertIn('0 matched, 1 mismatched', summary)
+        self.assertFalse(self.loan.amortizations.filter(is_paid=True).exists())
+
+        # Once the earlier installment is matched by a previous line, the same line pays
+        report, _ = self.reconcile([self.line(self.schedules[0], 'BANK-1'), self.line(second, 'BANK-2')])
+        self.assertEqual(report, [])
+        self.assertEqual(self.loan.amortizations.filter(is_paid=True).count(), 2)
+
+    def test_reconcile_after_conflict(self):
+        """Test a batch rolled back by a conflict leaves its transaction ids and installments to the next lines"""
+        pay_schedules = AmortizationScheduleManager.pay_schedules
+        calls = []
+
+        def conflicting_pay_schedules(manager, payments):
+            calls.append(payments)
+            # The first batch finds a row paid meanwhile and rolls back
+            return 0 if len(calls) == 1 else pay_schedules(manager, payments=payments)
+
+        lines = [
+            self.line(self.schedules[0], 'BANK-1'),
+            self.line(self.schedules[0], 'BANK-1'),
+            self.line(self.schedules[1], 'BANK-2'),
+        ]
+        with patch.object(AmortizationScheduleManager, 'pay_schedules', conflicting_pay_schedules):
+            report, summary = self.reconcile(lines, '--batch-size', '1')
+
+        self.assertEqual([(row['line'], row['reason']) for row in report], [('2', MismatchReason.CONFLICT)])
+        self.assertIn('3 lines, 2 matched, 1 mismatched', summary)
+        paid = self.loan.amortizations.filter(is_paid=True).order_by('payment_date')
+        self.assertEqual(list(paid.values_list('transaction_id', flat=True)), ['BANK-1', 'BANK-2'])
+
+    def test_reconcile_dry_run(self):
+        """Test a dry run reports without paying anything"""
+        _, summary = self.reconcile([self.line(self.schedules[0], 'BANK-1')], '--dry-run')
+        self.assertIn('1 matched', summary)
+        self.assertFalse(self.loan.amortizations.filter(is_paid=True).exists())
+
+    def test_reconcile_constant_queries(self):
+        """Test each batch costs the same number of queries regardless of its size"""
+        path = self.write_statement([self.line(schedule, f'BANK-{schedule.id}') for schedule in self.schedules])
+        # used ids, known references, candidates, unpaid installments, savepoint, pay, complete, release
+        with self.assertNumQueries(8):
+            call_command('reconcile_statement', path, stdout=StringIO(), stderr=StringIO())
+
+    def test_reconcile_missing_columns(self):
+        """Test statements without the expected header are rejected"""
+        handle, path = tempfile.mkstemp(suffix='.csv')
+        with os.fdopen(handle, 'w') as statement:
+            statement.write('date,amount\n2025-01-01,10\n')
+        self.addCleanup(os.remove, path)
+        with self.assertRaises(CommandError):
+            call_command('reconcile_statement', path, stdout=StringIO(), stderr=StringIO())
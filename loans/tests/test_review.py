@@ -0,0 +1,67 @@
+from decimal import Decimal
+from datetime import date
+from unittest import mock
+
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from accounts.factories import CustomerUserFactory, PersonnelUserFactory
+from loans.enums import LoanStatus
+from loans.factories import LoanTypeFactory, LoanFactory
+from loans.models import Loan
+
+
+class LoanReviewViewSetTests(APITestCase):
+    def setUp(self):
+        self.personnel = PersonnelUserFactory()
+        self.customer = CustomerUserFactory()
+        self.loan = LoanFactory(
+            customer=self.customer,
+            loan_type=LoanTypeFactory(interest_rate=10.0),
+            amount=Decimal('6000.00'),
+            duration_months=12,
+            status=LoanStatus.PENDING,
+            start_at=date(2025, 1, 1)
+        )
+        self.approve_url = reverse('loans:loan_review-approve', kwargs={'pk': self.loan.pk})
+        self.client.force_authenticate(user=self.personnel)
+
+    def test_list_pending_loans(self):
+        """Test personnel list the pending loans of every customer"""
+        LoanFactory(customer=CustomerUserFactory(), status=LoanStatus.APPROVED)
+        response = self.client.get(reverse('loans:loan_review-list'))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([loan['id'] for loan in response.data['results']], [self.loan.id])
+
+    def test_approve_loan(self):
+        """Test approving a pending loan generates its schedule"""
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(self.approve_url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['status'], LoanStatus.APPROVED)
+        self.assertEqual(self.loan.amortizations.count(), 12)
+
+        # The loan left the review queue
+        response = self.client.post(self.approve_url)
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_reject_loan(self):
+        """Test rejecting a pending loan"""
+        response = self.client.post(reverse('loans:loan_review-reject', kwargs={'pk': self.loan.pk}))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(Loan.objects.get(pk=self.loan.pk).status, LoanStatus.REJECTED)
+
+    def test_concurrent_review(self):
+        """Test a review losing to another one is a conflict"""
+        with mock.patch.object(Loan, 'transition', return_value=False):
+            response = self.client.post(self.approve_url)
+        self.assertEqual(response.status_code, status.HTTP_409_CONFLICT)
+
+    def test_customer_cannot_review(self):
+        """Test customers are not allowed to list or review loans"""
+        self.client.force_authenticate(user=self.customer)
+        self.assertEqual(self.client.get(reverse('loans:loan_review-list')).status_code,
+                         status.HTTP_403_FORBIDDEN)
+        self.assertEqual(self.client.post(self.approve_url).status_code, status.HTTP_403_FORBIDDEN)
+        self.assertEqual(Loan.objects.get(pk=self.loan.pk).status, LoanStatus.PENDING)
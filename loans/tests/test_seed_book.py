@@ -0,0 +1,62 @@
+from io import StringIO
+
+from django.db import models
+from django.test import TestCase
+from django.core.management import call_command
+from django.core.management.base import CommandError
+
+from accounts.enums import UserRole
+from accounts.models import User
+from loans.enums import LoanStatus
+from loans.models import LoanFundType, LoanFund, LoanType, Loan, AmortizationSchedule
+
+
+class SeedBookTests(TestCase):
+    def seed(self, *args):
+        out = StringIO()
+        call_command('seed_book', *args, stdout=out)
+        return out.getvalue()
+
+    def test_seed_book(self):
+        """Test every table is filled and each loan carries a full schedule"""
+        output = self.seed('--customers', '4', '--loans', '12', '--providers', '2', '--personnel', '1',
+                           '--fund-types', '2', '--funds', '3', '--loan-types', '2', '--statuses', 'active=1',
+                           '--progress', '0.5=1', '--seed', '7')
+
+        self.assertEqual(User.objects.filter(role=UserRole.LOAN_CUSTOMER).count(), 4)
+        self.assertEqual(User.objects.filter(role=UserRole.LOAN_PROVIDER).count(), 2)
+        self.assertEqual(User.objects.filter(role=UserRole.LOAN_PERSONNEL).count(), 1)
+        self.assertTrue(User.objects.first().check_password('defaultpassword'))
+        self.assertEqual((LoanFundType.objects.count(), LoanFund.objects.count(), LoanType.objects.count()),
+                         (2, 3, 2))
+
+        loans = Loan.objects.annotate(
+            schedules=models.Count('amortizations'),
+            paid=models.Count('amortizations', filter=models.Q(amortizations__is_paid=True)),
+            principal=models.Sum('amortizations__principal_amount')
+        )
+        self.assertEqual(len(loans), 12)
+        for loan in loans:
+            self.assertEqual(loan.status, LoanStatus.ACTIVE)
+            self.assertEqual(loan.schedules, loan.duration_months)
+            self.assertEqual(loan.paid, loan.duration_months // 2)
+            self.assertEqual(loan.principal, loan.amount)
+        self.assertIn(f'{AmortizationSchedule.objects.count()} schedules', output)
+
+    def test_seed_book_statuses(self):
+        """Test completed loans are fully paid and pending loans have no schedule"""
+        self.seed('--customers', '2', '--loans', '10', '--statuses', 'completed=1,pending=1', '--seed', '3')
+
+        completed = Loan.objects.filter(status=LoanStatus.COMPLETED)
+        pending = Loan.objects.filter(status=LoanStatus.PENDING)
+        self.assertEqual(completed.count() + pending.count(), 10)
+        self.assertFalse(AmortizationSchedule.objects.filter(loan__in=pending).exists())
+        self.assertFalse(AmortizationSchedule.objects.filter(is_paid=False).exists())
+        self.assertFalse(AmortizationSchedule.objects.filter(is_paid=True, transaction_id=None).exists())
+
+    def test_seed_book_errors(self):
+        """Test malformed distributions and counts are command errors"""
+        for args in (['--statuses', 'open=1'], ['--statuses', 'approved'], ['--progress', '2=1'],
+                     ['--customers', '0']):
+            with self.subTest(args=args), self.assertRaises(CommandError):
+                self.seed('--customers', '1', '--loans', '1', *args)
@@ -508,9 +508,8 @@ class PermissionsTest(APITestCase):
         self.assertEqual(response.status_code, status.HTTP_200_OK)
 
         # Should be able to access own amortization schedules
-        # TODO: resolve this issue
-        # response = self.client.get(reverse('loans:amortization-list'))
-        # self.assertEqual(response.status_code, status.HTTP_200_OK)
+        response = self.client.get(reverse('loans:amortization-list'))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
 
         # Should not be able to access loan funds (provider resource)
         response = self.client.get(reverse('loans:fund-list'))
@@ -121,7 +121,8 @@ class LoanSignalsTest(TestCase):
 
         # Update loan status to APPROVED to trigger signal
         self.loan.status = LoanStatus.APPROVED
-        self.loan.save()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.loan.save()
 
         # Check if amortization schedules were created
         schedules = AmortizationSchedule.objects.filter(loan=self.loan)
@@ -140,7 +141,8 @@ class LoanSignalsTest(TestCase):
         """Test that loan status is updated when all amortizations are paid"""
         # First approve the loan to create amortization schedules
         self.loan.status = LoanStatus.APPROVED
-        self.loan.save()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.loan.save()
 
         # Get all schedules
         schedules = AmortizationSchedule.objects.filter(loan=self.loan).order_by('payment_number')
@@ -149,7 +151,8 @@ class LoanSignalsTest(TestCase):
         for schedule in schedules:
             schedule.is_paid = True
             schedule.transaction_id = f"TRX{schedule.payment_number}"
-            schedule.save()
+            with self.captureOnCommitCallbacks(execute=True):
+                schedule.save()
 
         # Loan status should still be APPROVED
         self.loan.refresh_from_db()
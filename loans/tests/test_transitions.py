@@ -0,0 +1,91 @@
+from decimal import Decimal
+from datetime import date
+from types import SimpleNamespace
+from unittest.mock import patch
+
+from django.db import connection
+from django.contrib import admin
+from django.test import TestCase, RequestFactory
+
+from accounts.factories import CustomerUserFactory
+from loans.admin import LoanModelAdmin
+from loans.enums import LoanStatus
+from loans.events import loan_status_changed
+from loans.factories import LoanTypeFactory, LoanFactory
+from loans.models import Loan
+
+
+class LoanTransitionTests(TestCase):
+    def setUp(self):
+        self.loan = LoanFactory(
+            customer=CustomerUserFactory(),
+            loan_type=LoanTypeFactory(interest_rate=10.0),
+            amount=Decimal('6000.00'),
+            duration_months=12,
+            status=LoanStatus.PENDING,
+            start_at=date(2025, 1, 1)
+        )
+        self.events = []
+        loan_status_changed.connect(self.record_event, sender=Loan)
+        self.addCleanup(loan_status_changed.disconnect, self.record_event, sender=Loan)
+
+    def record_event(self, sender, loan_ids, status, **kwargs):
+        self.events.append((loan_ids, status))
+
+    def test_allowed_transition(self):
+        """Test an allowed transition runs one UPDATE, emits its event and generates the schedule"""
+        with self.captureOnCommitCallbacks(execute=True):
+            with self.assertNumQueries(1):
+                self.assertTrue(self.loan.transition(to=LoanStatus.APPROVED))
+
+        self.assertEqual(self.loan.status, LoanStatus.APPROVED)
+        self.assertEqual(self.loan.get_dirty_fields(), set())
+        self.assertEqual(self.events, [([self.loan.id], LoanStatus.APPROVED)])
+        self.assertEqual(Loan.objects.get(pk=self.loan.pk).status, LoanStatus.APPROVED)
+        self.assertEqual(self.loan.amortizations.count(), 12)
+
+    def test_refused_transition(self):
+        """Test a transition missing from the table changes nothing"""
+        self.assertFalse(self.loan.transition(to=LoanStatus.COMPLETED))
+        self.assertEqual(self.loan.status, LoanStatus.PENDING)
+        self.assertEqual(Loan.objects.get(pk=self.loan.pk).status, LoanStatus.PENDING)
+        self.assertEqual(self.events, [])
+
+    def test_concurrent_transition(self):
+        """Test only the first of two transitions from the same status wins"""
+        other = Loan.objects.get(pk=self.loan.pk)
+        self.assertTrue(self.loan.transition(to=LoanStatus.REJECTED))
+        self.assertFalse(other.transition(to=LoanStatus.APPROVED))
+        self.assertEqual(Loan.objects.get(pk=self.loan.pk).status, LoanStatus.REJECTED)
+
+    def test_bulk_transition(self):
+        """Test the manager moves several loans in one UPDATE and returns those it moved"""
+        rejected = LoanFactory(customer=self.loan.customer, status=LoanStatus.REJECTED)
+        with self.assertNumQueries(1):
+            moved_ids = Loan.objects.transition(loan_ids=[self.loan.id, rejected.id], to=LoanStatus.APPROVED)
+        self.assertEqual(moved_ids, [self.loan.id])
+        self.assertEqual(Loan.objects.get(pk=rejected.pk).status, LoanStatus.REJECTED)
+
+    def test_bulk_transition_without_returning(self):
+        """Test databases without UPDATE ... RETURNING lock the movable loans, then update them"""
+        rejected = LoanFactory(customer=self.loan.customer, status=LoanStatus.REJECTED)
+        with patch.object(connection.features, 'can_return_columns_from_insert', False):
+            moved_ids = Loan.objects.transition(loan_ids=[self.loan.id, rejected.id], to=LoanStatus.APPROVED)
+            self.assertEqual(Loan.objects.transition(loan_ids=[self.loan.id], to=LoanStatus.PENDING), [])
+        self.assertEqual(moved_ids, [self.loan.id])
+        self.assertEqual(self.events, [([self.loan.id], LoanStatus.APPROVED)])
+        self.assertEqual(Loan.objects.get(pk=self.loan.pk).status, LoanStatus.APPROVED)
+        self.assertEqual(Loan.objects.get(pk=rejected.pk).status, LoanStatus.REJECTED)
+
+    def test_admin_status_change(self):
+        """Test the admin changes the status through a transition"""
+        loan = Loan.objects.get(pk=self.loan.pk)
+        loan.status = LoanStatus.APPROVED
+        loan.duration_months = 24
+        form = SimpleNamespace(changed_data=['status', 'duration_months'], initial={'status': LoanStatus.PENDING})
+
+        LoanModelAdmin(Loan, admin.site).save_model(RequestFactory().post('/'), loan, form, change=True)
+        loan.refresh_from_db()
+        self.assertEqual(loan.status, LoanStatus.APPROVED)
+        self.assertEqual(loan.duration_months, 24)
+        self.assertEqual(self.events, [([loan.id], LoanStatus.APPROVED)])
@@ -0,0 +1,74 @@
+from decimal import Decimal
+from datetime import date
+
+from django.urls import reverse
+from django.test import TestCase
+
+from rest_framework.test import APIClient
+from rest_framework.renderers import JSONRenderer
+
+from accounts.factories import CustomerUserFactory, PersonnelUserFactory
+from core.api.values import ValuesPlan
+from loans.enums import LoanStatus
+from loans.models import Loan, AmortizationSchedule
+from loans.factories import LoanTypeFactory, LoanFactory
+from loans.api.serializers import LoanSerializer, AmortizationScheduleSerializer, CustomerDashboardSerializer
+
+
+class ValuesPlanTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.customer = CustomerUserFactory()
+        self.loan_type = LoanTypeFactory(personnel=PersonnelUserFactory(), interest_rate=7.5)
+        self.loan = LoanFactory(
+            customer=self.customer,
+            loan_type=self.loan_type,
+            amount=Decimal('8000.00'),
+            duration_months=24,
+            status=LoanStatus.PENDING,
+            start_at=date(2025, 3, 31)
+        )
+        self.loan.status = LoanStatus.APPROVED
+        with self.captureOnCommitCallbacks(execute=True):
+            self.loan.save()
+
+        # Nullable columns must round-trip as well
+        LoanFactory(customer=self.customer, loan_type=self.loan_type, start_at=None)
+
+        self.client.force_authenticate(user=self.customer)
+
+    def assertSameOutput(self, serializer_class, queryset):
+        plan = ValuesPlan.for_serializer(serializer_class)
+        expected = JSONRenderer().render(serializer_class(queryset, many=True).data)
+        actual = JSONRenderer().render(plan.to_representation(queryset.values_list(*plan.columns)))
+        self.assertEqual(actual, expected)
+
+    def test_amortization_plan_is_byte_identical(self):
+        """Test the amortization plan renders the same bytes as the serializer"""
+        self.assertSameOutput(AmortizationScheduleSerializer, AmortizationSchedule.objects.all())
+
+    def test_loan_plan_is_byte_identical(self):
+        """Test the loan plan renders the same bytes as the serializer"""
+        self.assertSameOutput(LoanSerializer, Loan.objects.all())
+
+    def test_unsupported_serializer_has_no_plan(self):
+        """Test serializers with nested fields fall back to the regular list"""
+        self.assertIsNone(ValuesPlan.for_serializer(CustomerDashboardSerializer))
+
+    def test_list_endpoint_uses_plan(self):
+        """Test the list endpoint output matches the serializer page"""
+        response = self.client.get(reverse('loans:amortization-list'), {'page': 2})
+        expected = AmortizationScheduleSerializer(AmortizationSchedule.objects.all()[10:20], many=True).data
+        self.assertEqual(response.content, JSONRenderer().render({
+            'count': 24,
+            'next': 'http://testserver/api/loans/amortization/?page=3',
+            'previous': 'http://testserver/api/loans/amortization/',
+            'results': expected,
+        }))
+
+    def test_expanded_list_skips_plan(self):
+        """Test expanded loan lists still go through the flex serializer"""
+        response = self.client.get(reverse('loans:loan-list'), {'expand': 'amortizations'})
+        self.assertEqual(response.status_code, 200)
+        loan = next(item for item in response.data['results'] if item['id'] == self.loan.id)
+        self.assertEqual(len(loan['amortizations']), 24)
@@ -1,4 +1,5 @@
 import random
+import msgpack
 from decimal import Decimal
 from datetime import date
 
@@ -347,7 +348,8 @@ class LoanViewSetTests(TestCase):
         """Test expanding amortizations in loan detail response"""
         # Change status to APPROVED and add amortization schedules
         self.loan.status = LoanStatus.APPROVED
-        self.loan.save()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.loan.save()
 
         # Manually trigger the signal (in test environment)
         from loans.signals import create_amortization_schedule
@@ -420,9 +422,9 @@ class AmortizationScheduleViewSetTests(TestCase):
 
     def test_amortization_list(self):
         """Test retrieving a list of amortization schedules"""
-        # TODO: resolve this
-        # response = self.client.get(self.list_url)
-        # self.assertEqual(response.status_code, status.HTTP_200_OK)
+        response = self.client.get(self.list_url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['count'], self.loan.duration_months)
 
     def test_amortization_detail(self):
         """Test retrieving a single amortization schedule"""
@@ -473,14 +475,49 @@ class AmortizationScheduleViewSetTests(TestCase):
     def test_complete_loan_after_all_payments(self):
         """Test loan status changes to COMPLETED after all amortizations are paid"""
         # Pay all amortizations
-        for i, amortization in enumerate(self.loan.amortizations.order_by('payment_number').all()):
+        for i, amortization in enumerate(self.loan.amortizations.order_by('payment_date', 'id').all()):
             pay_url = reverse('loans:amortization-pay', kwargs={'pk': amortization.pk})
             data = {
                 'transaction_id': f'TR{i + 1000}'
             }
-            response = self.client.post(pay_url, data)
+            with self.captureOnCommitCallbacks(execute=True):
+                response = self.client.post(pay_url, data)
             self.assertEqual(response.status_code, status.HTTP_200_OK)
 
         # Check if loan status is updated to COMPLETED
         self.loan.refresh_from_db()
         self.assertEqual(self.loan.status, LoanStatus.COMPLETED)
+
+
+class MessagePackNegotiationTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.customer_user = CustomerUserFactory()
+        self.loan = LoanFactory(customer=self.customer_user, status=LoanStatus.PENDING)
+        LoanFundFactory(amount=Decimal('1000000.00'))
+        self.list_url = reverse('loans:loan-list')
+        self.client.force_authenticate(user=self.customer_user)
+
+    def test_msgpack_response(self):
+        """Test clients can ask for msgpack instead of JSON"""
+        json_response = self.client.get(self.list_url)
+        response = self.client.get(self.list_url, HTTP_ACCEPT='application/msgpack')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response['Content-Type'], 'application/msgpack')
+        self.assertEqual(msgpack.unpackb(response.content), json_response.json())
+
+    def test_msgpack_request(self):
+        """Test mutating endpoints accept msgpack bodies"""
+        data = {
+            'loan_type': self.loan.loan_type.id,
+            'amount': str(self.loan.loan_type.min_amount),
+            'duration_months': self.loan.loan_type.min_duration_months,
+        }
+        response = self.client.patch(
+            reverse('loans:loan-detail', kwargs={'pk': self.loan.pk}),
+            msgpack.packb(data),
+            content_type='application/msgpack'
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.loan.refresh_from_db()
+        self.assertEqual(self.loan.amount, self.loan.loan_type.min_amount)
@@ -1,6 +1,12 @@
 from decimal import Decimal
+from functools import partial
 
-from loans.models import LoanFund, Loan
+from django.db import models, transaction
+from django.core.cache import cache
+from django.utils import timezone
+
+from loans.enums import LoanStatus, PrepaymentMode
+from loans.models import LoanFund, Loan, AmortizationSchedule
 
 
 def get_current_balance() -> Decimal:
@@ -15,3 +21,140 @@ def calculate_loan_monthly_payment(loan_amount, monthly_interest_rate, total_per
     numerator =  (loan_amount * monthly_interest_rate * (1 + monthly_interest_rate) ** total_periods)
     denominator = ((1 + monthly_interest_rate) ** total_periods - 1)
     return numerator / denominator
+
+
+def get_monthly_interest_rate(loan) -> Decimal:
+    return Decimal(loan.loan_type.interest_rate) / 100 / 12
+
+
+def iter_amortization_rows(balance, monthly_interest_rate, total_periods=None, monthly_payment=None):
+    """
+    Yield ``(principal, interest, payment, remaining_balance)`` for each period repaying
+    ``balance``. Either ``total_periods`` is kept and the payment derived, or
+    ``monthly_payment`` is kept and the schedule runs until the balance is repaid.
+    """
+    if monthly_payment is None:
+        if monthly_interest_rate:
+            monthly_payment = calculate_loan_monthly_payment(balance, monthly_interest_rate, total_periods)
+        else:
+            monthly_payment = balance / total_periods
+    elif monthly_payment <= balance * monthly_interest_rate:
+        raise ValueError('The monthly payment does not cover the interest.')
+
+    period = 0
+    remaining_balance = balance
+    repaid = Decimal(0)
+    while True:
+        period += 1
+        interest = remaining_balance * monthly_interest_rate
+        principal = monthly_payment - interest
+        payment = monthly_payment
+        remaining_balance -= principal
+
+        # Handle final payment rounding, the rounded principals add up to the balance exactly
+        last = period == total_periods if total_periods else remaining_balance <= 0
+        if last:
+            principal = balance - repaid
+            remaining_balance = Decimal(0)
+            if total_periods is None:
+                payment = principal + interest
+
+        principal = principal.quantize(Decimal('0.01'))
+        repaid += principal
+        yield (
+            principal,
+            interest.quantize(Decimal('0.01')),
+            payment.quantize(Decimal('0.01')),
+            remaining_balance.quantize(Decimal('0.01'))
+        )
+        if last:
+            return
+
+
+def recompute_schedule_tail(loan, prepayment, mode=PrepaymentMode.KEEP_TERM) -> list:
+    """
+    Apply a principal ``prepayment`` by recomputing only the unpaid installments of
+    ``loan``, updated in bulk. Keeping the payment drops the installments no longer
+    needed and shortens the loan. Must run inside a transaction.
+    """
+    tail = list(
+        AmortizationSchedule.objects.select_for_update().filter(
+            loan=loan,
+            is_paid=False
+        ).order_by('payment_date', 'id')
+    )
+    balance = sum(schedule.principal_amount for schedule in tail) - prepayment
+    if balance <= 0:
+        raise ValueError('The prepayment must be lower than the outstanding principal.')
+
+    monthly_interest_rate = get_monthly_interest_rate(loan)
+    if mode == PrepaymentMode.KEEP_PAYMENT:
+        rows = iter_amortization_rows(balance, monthly_interest_rate, monthly_payment=tail[0].total_payment)
+    else:
+        rows = iter_amortization_rows(balance, monthly_interest_rate, total_periods=len(tail))
+
+    now = timezone.now()
+    updated = []
+    for schedule, (principal, interest, payment, remaining_balance) in zip(tail, rows):
+        schedule.principal_amount = principal
+        schedule.interest_amount = interest
+        schedule.total_payment = payment
+        schedule.remaining_balance = remaining_balance
+        schedule.update_at = now
+        updated.append(schedule)
+
+    AmortizationSchedule.objects.update_schedules(
+        updated,
+        fields=['principal_amount', 'interest_amount', 'total_payment', 'remaining_balance', 'update_at']
+    )
+
+    dropped = [schedule.id for schedule in tail[len(updated):]]
+    if dropped:
+        AmortizationSchedule.objects.filter(id__in=dropped).delete()
+        Loan.objects.filter(id=loan.id).update(
+            duration_months=loan.duration_months - len(dropped),
+            update_at=now
+        )
+        loan.duration_months -= len(dropped)
+
+    # Bulk writes bypass the signals, drop the cached dashboard once they are visible to other readers
+    transaction.on_commit(partial(invalidate_customer_dashboard, loan.customer_id))
+    return updated
+
+
+def get_customer_dashboard_cache_key(customer_id) -> str:
+    return f'loans:dashboard:{customer_id}'
+
+
+def invalidate_customer_dashboard(*customer_ids) -> None:
+    keys = [get_customer_dashboard_cache_key(customer_id) for customer_id in customer_ids if customer_id is not None]
+    if keys:
+        cache.delete_many(keys)
+
+
+LOAN_BOOK_SUMMARY_CACHE_KEY = 'loans:metrics:book'
+
+
+def get_loan_book_summary() -> dict:
+    """
+    Figures of the whole loan book: loans by status, outstanding principal of the running
+    loans and available balance
+    """
+    loans = dict(Loan.objects.order_by().values_list('status').annotate(count=models.Count('id')))
+    outstanding = AmortizationSchedule.objects.filter(
+        is_paid=False,
+        loan__status__in=(LoanStatus.APPROVED, LoanStatus.ACTIVE)
+    ).aggregate(total=models.Sum('principal_amount'))['total']
+    return {
+        'loans': {status: loans.get(status, 0) for status in LoanStatus},
+        'outstanding_principal': outstanding or Decimal('0'),
+        'available_balance': get_current_balance(),
+        'refreshed_at': timezone.now(),
+    }
+
+
+def refresh_loan_book_summary() -> dict:
+    # Kept until the next refresh, scrapes only read it
+    summary = get_loan_book_summary()
+    cache.set(LOAN_BOOK_SUMMARY_CACHE_KEY, summary, None)
+    return summary